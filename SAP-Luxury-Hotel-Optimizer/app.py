@@ -1,195 +1,431 @@
-from flask import Flask, render_template, request, jsonify
-import json
+from flask import Flask, render_template, request, jsonify, g
+import base64
+import cProfile
+import io
+import itertools
 import os
+import pstats
 import random
+import time
 from datetime import datetime, timedelta
-from mock.sap_mock import SAPMockGenerator
-from genai.pricing import PricingEngine
-from genai.staffing import StaffingEngine
+from genai.rng import stream_for
+from services.cache import ResponseCache, SQLiteSharedStore, TTLCache
+from services.metrics import REGISTRY, REQUEST_SECONDS, REQUESTS_TOTAL, record_stage
+from services.reload import AppState, DataReloader
+from services.serialization import FastJSONProvider, compact_pricing, compact_staffing, compressor_from_env
+from services.serving import ComputeTimeout, ComputePool, PoolSaturated, serve, serving_config
+from services.streaming import STREAM_MIMETYPES, encode_stream, last_event_position, stream_format
+from store.bootstrap import StartupReport, build_repository, load_data, prepare_data
+from store.forecasts import ForecastStore
 
 app = Flask(__name__)
 
-# Initialize and generate mock data if it doesn't exist or is empty
-data_dir = os.path.join(os.path.dirname(__file__), 'data')
-os.makedirs(data_dir, exist_ok=True)
-
-# Check if hotels.json exists AND has data
-hotels_file = os.path.join(data_dir, 'hotels.json')
-hotels_empty = True
-
-if os.path.exists(hotels_file) and os.path.getsize(hotels_file) > 2:
-    # File exists and has more content than just "[]"
-    with open(hotels_file) as f:
-        hotels_data = json.load(f)
-        if hotels_data and len(hotels_data) > 0:
-            hotels_empty = False
-
-# Generate data if needed
-if hotels_empty:
-    print("Generating mock hotel data...")
-    generator = SAPMockGenerator()
-    generator.generate_hotels(300)  # Generate 300 hotel properties
-    generator.generate_bookings()
-    generator.generate_events()
-    generator.generate_competitors()
-    generator.export_to_json(data_dir)
-    print("Mock data generation complete!")
+# jsonify() goes through the fastest installed JSON backend (orjson, ujson, then stdlib)
+app.json = FastJSONProvider(app, os.environ.get('HOTEL_OPTIMIZER_JSON_BACKEND'))
+
+# gzip/brotli for larger responses, negotiated from Accept-Encoding
+compressor = compressor_from_env()
+
+data_dir = os.environ.get('HOTEL_OPTIMIZER_DATA_DIR', os.path.join(os.path.dirname(__file__), 'data'))
+
+# "json" (default), "columnar" for the memory-mapped bookings/competitors export,
+# or "sqlite" to query bookings, events and competitors from data/hotels.db
+data_format = os.environ.get('HOTEL_OPTIMIZER_DATA_FORMAT', 'json')
+
+startup_report = StartupReport()
+
+# Only the dev server prepares data. Imported workers (e.g. gunicorn) take the
+# read-only path below and never write data files at boot; run
+# `python -m store.bootstrap` once before starting them.
+if __name__ == '__main__':
+    prepare_data(data_dir, data_format, report=startup_report)
 
 # Load mock data
-try:
-    with open(os.path.join(data_dir, 'hotels.json')) as f:
-        hotels = json.load(f)
-except Exception as e:
-    print(f"Error loading hotels.json: {e}")
-    hotels = []
-
-try:
-    with open(os.path.join(data_dir, 'bookings.json')) as f:
-        bookings = json.load(f)
-except Exception as e:
-    print(f"Error loading bookings.json: {e}")
-    bookings = []
-
-try:
-    with open(os.path.join(data_dir, 'events.json')) as f:
-        events = json.load(f)
-except Exception as e:
-    print(f"Error loading events.json: {e}")
-    events = []
-
-try:
-    with open(os.path.join(data_dir, 'competitors.json')) as f:
-        competitors = json.load(f)
-except Exception as e:
-    print(f"Error loading competitors.json: {e}")
-    competitors = []
-
-# Fix location matching - ensure some hotels have the same locations as events
-if hotels and events:
-    # Get unique event locations
-    event_locations = set(event['location'] for event in events)
-    
-    # Assign some event locations to hotels to ensure matches
-    for i, location in enumerate(event_locations):
-        if i < len(hotels):
-            hotels[i]['location'] = location
+dataset = load_data(data_dir, data_format, report=startup_report)
+
+# Build shared lookup indexes once, then hand them to both engines
+with startup_report.phase('build_indexes'):
+    initial_state = AppState(build_repository(dataset))
+print(startup_report.summary())
+
+# Response cache for the pricing and staffing APIs. Set
+# HOTEL_OPTIMIZER_SHARED_CACHE to a SQLite file path to share entries across workers.
+cache_size = int(os.environ.get('HOTEL_OPTIMIZER_CACHE_SIZE', 1024))
+cache_ttl = float(os.environ.get('HOTEL_OPTIMIZER_CACHE_TTL', 300))
+shared_cache_path = os.environ.get('HOTEL_OPTIMIZER_SHARED_CACHE')
+response_cache = ResponseCache(
+    TTLCache(maxsize=cache_size, ttl=cache_ttl),
+    SQLiteSharedStore(shared_cache_path, ttl=cache_ttl) if shared_cache_path else None,
+    version=dataset['version']
+)
+
+# Rendered HTML pages, keyed by data version like the response cache.
+# HOTEL_OPTIMIZER_CACHE_SIZE=0 turns it off too unless a page cache size is given.
+page_cache = ResponseCache(
+    TTLCache(maxsize=int(os.environ.get('HOTEL_OPTIMIZER_PAGE_CACHE_SIZE', 64 if cache_size > 0 else 0)), ttl=3600),
+    version=dataset['version']
+)
+
+def invalidate_caches(state):
+    """Drop cached responses and pages computed from older data"""
+    response_cache.invalidate(state.version)
+    page_cache.invalidate(state.version)
+
+# Current data snapshot. Handlers read reloader.state once per request and use
+# that snapshot throughout; reloads swap in a new one and invalidate the caches.
+reloader = DataReloader(data_dir, data_format, initial_state, on_swap=invalidate_caches)
+
+# Optionally watch the data directory for delta files and changed data
+watch_interval = float(os.environ.get('HOTEL_OPTIMIZER_WATCH_INTERVAL', 0))
+if watch_interval > 0:
+    reloader.watch(watch_interval)
+
+# Results of the nightly forecast job (python -m jobs.nightly_forecast)
+forecast_store = ForecastStore(data_dir)
+
+# Engine work runs on a bounded pool; concurrent identical requests share one
+# computation. HOTEL_OPTIMIZER_COMPUTE_WORKERS=0 computes inline instead.
+compute_pool = ComputePool(
+    workers=int(os.environ.get('HOTEL_OPTIMIZER_COMPUTE_WORKERS', 4)),
+    max_pending=int(os.environ.get('HOTEL_OPTIMIZER_MAX_PENDING', 64)),
+    timeout=float(os.environ.get('HOTEL_OPTIMIZER_COMPUTE_TIMEOUT', 30))
+)
+
+# Per-request cProfile summaries (?profile=1 or X-Profile: 1) are opt-in
+profiling_enabled = os.environ.get('HOTEL_OPTIMIZER_PROFILING') == '1'
+
+def collect_cache_metrics():
+    """Expose response cache counters at scrape time"""
+    local = response_cache.local.stats()
+    yield ("hotel_optimizer_cache_events_total", "Response cache lookups and evictions", "counter", {
+        (("result", "hit"),): local['hits'],
+        (("result", "miss"),): local['misses'],
+        (("result", "eviction"),): local['evictions'],
+        (("result", "expiration"),): local['expirations']
+    })
+    yield ("hotel_optimizer_cache_entries", "Entries in the in-process response cache", "gauge", {(): local['size']})
+
+def collect_pool_metrics():
+    """Expose compute pool counters at scrape time"""
+    pool = compute_pool.stats()
+    yield ("hotel_optimizer_compute_requests_total", "Engine computations by outcome", "counter", {
+        (("result", "submitted"),): pool['submitted'],
+        (("result", "coalesced"),): pool['coalesced'],
+        (("result", "rejected"),): pool['rejected'],
+        (("result", "timeout"),): pool['timeouts']
+    })
+    yield ("hotel_optimizer_compute_pending", "Engine computations queued or running", "gauge", {(): pool['pending']})
+
+def collect_forecast_metrics():
+    """Expose incremental forecast cell counters at scrape time"""
+    cells = reloader.state.forecast_counters.as_dict()['cells']
+    yield ("hotel_optimizer_forecast_cells_total", "Materialized forecast cells by engine and outcome", "counter", {
+        (("engine", engine), ("result", result)): count
+        for engine, counts in cells.items() for result, count in counts.items()
+    })
+
+REGISTRY.register_collector(collect_cache_metrics)
+REGISTRY.register_collector(collect_pool_metrics)
+REGISTRY.register_collector(collect_forecast_metrics)
+
+def compute_cached(state, namespace, parts, compute):
+    """Serve from the response cache under state's version, otherwise compute on the pool"""
+    key = response_cache.make_key(namespace, *parts, version=state.version)
+    return response_cache.get_or_compute(namespace, parts, lambda: compute_pool.run(key, compute),
+                                         version=state.version)
+
+@app.before_request
+def start_request_instrumentation():
+    """Start the request timer and, if asked for, the profiler"""
+    g.request_started = time.perf_counter()
+    wants_profile = request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+    if profiling_enabled and wants_profile:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_instrumentation(response):
+    """Record request metrics and return the profile summary when profiling"""
+    endpoint = request.endpoint or 'unknown'
+    if 'request_started' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    REQUESTS_TOTAL.inc(endpoint=endpoint, status=response.status_code)
     
-    # Save updated hotels data
-    with open(os.path.join(data_dir, 'hotels.json'), 'w') as f:
-        json.dump(hotels, f, indent=2)
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
     
-    print(f"Updated {len(event_locations)} hotels to match event locations")
+    profiler.disable()
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(30)
+    profiled = app.response_class(summary.getvalue(), mimetype='text/plain')
+    profiled.headers['X-Profiled-Status'] = str(response.status_code)
+    return profiled
+
+# Runs after the caching headers below, so ETags are computed on the uncompressed body
+# and a 304 already carries the Vary and weak ETag the compressed 200 would
+@app.after_request
+def compress_response(response):
+    """Compress responses when the client accepts it"""
+    if compressor is None:
+        return response
+    return compressor.apply(request, response)
 
-# Initialize engines
-pricing_engine = PricingEngine(bookings, competitors, events)
-staffing_engine = StaffingEngine(bookings, hotels, events)
+# Registered after the instrumentation hook so it runs before it
+@app.after_request
+def add_http_caching_headers(response):
+    """Let clients and proxies reuse deterministic API responses"""
+    # Streamed responses are not buffered, so they get no ETag
+    if (request.method == 'GET' and request.path.startswith('/api/') and response.status_code == 200
+            and not response.is_streamed):
+        response.cache_control.public = True
+        response.cache_control.max_age = int(cache_ttl)
+        response.add_etag()
+        if compressor is not None:
+            compressor.negotiate(request, response)
+        response.make_conditional(request)
+    return response
 
 @app.route('/')
 def index():
     """Main dashboard page"""
-    # Get counts for dashboard
-    countries = set(hotel['country'] for hotel in hotels)
-    total_rooms = sum(hotel['rooms'] for hotel in hotels)
+    repository = reloader.state.repository
+    hotels = repository.hotels
+    # Totals are precomputed per data version
+    stats = repository.portfolio_stats
     
     # Get sample hotels for display
     sample_hotels = random.sample(hotels, min(10, len(hotels)))
     
     return render_template('index.html', 
                           hotels=sample_hotels,
-                          hotel_count=len(hotels),
-                          country_count=len(countries),
-                          total_rooms=total_rooms)
+                          hotel_count=stats.hotel_count,
+                          country_count=stats.country_count,
+                          total_rooms=stats.total_rooms,
+                          top_countries=stats.by_country[:8])
 
 @app.route('/pricing')
 def pricing_page():
     """Dynamic pricing optimization page"""
+    repository = reloader.state.repository
+    hotels = repository.hotels
+    
     # Get hotel_id from query param or use first hotel
     hotel_id = request.args.get('hotel_id', hotels[0]['hotel_id'] if hotels else None)
     
     # Get hotel details
-    hotel = next((h for h in hotels if h['hotel_id'] == hotel_id), None)
+    hotel = repository.get_hotel_details(hotel_id)
     
     if not hotel:
         return "Hotel not found", 404
         
-    return render_template('pricing.html', 
-                          hotel=hotel,
-                          hotels=hotels)
+    # The hotel selector loads its options lazily from /api/hotels
+    return render_template('pricing.html', hotel=hotel)
 
 @app.route('/staffing')
 def staffing_page():
     """Staffing optimization page"""
+    repository = reloader.state.repository
+    hotels = repository.hotels
+    
     # Get hotel_id from query param or use first hotel
     hotel_id = request.args.get('hotel_id', hotels[0]['hotel_id'] if hotels else None)
     
     # Get hotel details
-    hotel = next((h for h in hotels if h['hotel_id'] == hotel_id), None)
+    hotel = repository.get_hotel_details(hotel_id)
     
     if not hotel:
         return "Hotel not found", 404
         
-    return render_template('staffing.html', 
-                          hotel=hotel,
-                          hotels=hotels)
+    # The hotel selector loads its options lazily from /api/hotels
+    return render_template('staffing.html', hotel=hotel)
 
 @app.route('/hotels-with-events')
 def hotels_with_events():
     """Shows all hotels that have events in the next 7 days"""
-    hotels_with_events = []
-    
-    for hotel in hotels:
-        nearby_events = [e for e in events if e['location'] == hotel['location']]
-        if nearby_events:
-            # Count events in the next 7 days
-            today = datetime.now()
-            upcoming_dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-            upcoming_events = [e for e in nearby_events if e['date'] in upcoming_dates]
-            
-            if upcoming_events:
-                hotels_with_events.append({
-                    'hotel': hotel,
-                    'event_count': len(upcoming_events),
-                    'events': upcoming_events
-                })
-    
-    return render_template('hotels_with_events.html', 
-                          hotels_with_events=hotels_with_events)
+    state = reloader.state
+    repository = state.repository
+    
+    # Events in the next 7 days from the event calendar, matched to the hotels near each one
+    today = datetime.now()
+    start = today.strftime("%Y-%m-%d")
+    end = (today + timedelta(days=7)).strftime("%Y-%m-%d")
+    
+    def render():
+        upcoming_by_location = repository.event_calendar.events_between(start, end)
+        
+        events_by_hotel = {}
+        for upcoming_events in upcoming_by_location.values():
+            for event in upcoming_events:
+                for hotel in repository.hotels_near(event):
+                    events_by_hotel.setdefault(hotel['hotel_id'], (hotel, []))[1].append(event)
+        
+        hotels_with_events = []
+        for hotel, upcoming_events in events_by_hotel.values():
+            upcoming_events.sort(key=lambda e: e['date'])
+            hotels_with_events.append({
+                'hotel': hotel,
+                'event_count': len(upcoming_events),
+                'events': upcoming_events
+            })
+        
+        # Keep the portfolio order of the hotel list
+        hotels_with_events.sort(key=lambda item: repository.hotel_position(item['hotel']['hotel_id']))
+        
+        return render_template('hotels_with_events.html', 
+                              hotels_with_events=hotels_with_events)
+    
+    # The page only changes with the data version and the day
+    return page_cache.get_or_compute("hotels_with_events", [start], render, version=state.version)
+
+# Page size bounds for /api/hotels
+HOTEL_PAGE_DEFAULT = 50
+HOTEL_PAGE_MAX = 200
+
+def encode_cursor(position, hotel_id):
+    return base64.urlsafe_b64encode(f"{position}:{hotel_id}".encode()).decode()
+
+def decode_cursor(cursor, repository):
+    """Position to resume after; the hotel id guards against cursors from before a reload."""
+    try:
+        position, hotel_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        position = int(position)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    hotels = repository.hotels
+    if not 0 <= position < len(hotels) or hotels[position]['hotel_id'] != hotel_id:
+        raise ValueError("Stale cursor, restart from the first page")
+    return position
+
+def wants_compact():
+    """?compact=1 returns forecast lists as columns and drops repeated values"""
+    return request.args.get('compact') == '1'
+
+def float_arg(args, name):
+    """Query parameter as a float, or None if absent"""
+    if not args.get(name):
+        return None
+    try:
+        return float(args[name])
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+
+def int_arg(args, name, default):
+    """Query parameter as an int, or default if absent"""
+    if not args.get(name):
+        return default
+    try:
+        return int(args[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+def hotel_filters(args):
+    """Hotel filters shared by the listing and streaming endpoints; raises ValueError on bad values"""
+    return {
+        'country': args.get('country'),
+        'location': args.get('location'),
+        'prefix': args.get('q', '').strip(),
+        'min_rating': float_arg(args, 'min_rating'),
+        'max_rating': float_arg(args, 'max_rating')
+    }
+
+def iter_hotels(repository, filters, after=-1):
+    """Yield (position, hotel) for every matching hotel, one index page at a time"""
+    while True:
+        page, last_position = repository.search_hotels(after=after, limit=HOTEL_PAGE_MAX, **filters)
+        for hotel in page:
+            yield repository.hotel_position(hotel['hotel_id']), hotel
+        if last_position is None:
+            return
+        after = last_position
+
+@app.route('/api/hotels')
+def list_hotels():
+    """API endpoint to page through hotels matching country, location, min_rating, max_rating and q"""
+    repository = reloader.state.repository
+    args = request.args
+    
+    try:
+        limit = min(int_arg(args, 'limit', HOTEL_PAGE_DEFAULT), HOTEL_PAGE_MAX)
+        filters = hotel_filters(args)
+        after = decode_cursor(args['cursor'], repository) if args.get('cursor') else -1
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+    
+    page, last_position = repository.search_hotels(after=after, limit=limit, **filters)
+    
+    next_cursor = None
+    if last_position is not None:
+        next_cursor = encode_cursor(last_position, repository.hotels[last_position]['hotel_id'])
+    
+    return jsonify({
+        "hotels": [{key: h[key] for key in ("hotel_id", "name", "location", "country", "rating", "rooms")} for h in page],
+        "count": len(page),
+        "next_cursor": next_cursor
+    })
 
 @app.route('/api/pricing/<hotel_id>')
 def get_pricing(hotel_id):
     """API endpoint to get dynamic pricing data"""
+    state = reloader.state
+    
     # Find hotel details
-    hotel = next((h for h in hotels if h['hotel_id'] == hotel_id), None)
+    hotel = state.repository.get_hotel_details(hotel_id)
     
     if not hotel:
         return jsonify({"error": "Hotel not found"}), 404
     
+    # Forecasts are cached per (hotel, day) until the data changes
+    today = datetime.now().strftime("%Y-%m-%d")
+    response = compute_cached(state, "pricing", (hotel_id, today), lambda: build_pricing(state.repository, hotel))
+    
+    stage_started = time.perf_counter()
+    if wants_compact():
+        response = compact_pricing(response)
+    serialized = jsonify(response)
+    record_stage("pricing_api", "serialize", stage_started)
+    return serialized
+
+def build_pricing(repository, hotel):
+    """Compute the pricing response for a hotel from a repository snapshot"""
+    hotel_id = hotel['hotel_id']
+    
+    stage_started = time.perf_counter()
+    
     # Get hotel's booking data
-    hotel_bookings = [b for b in bookings if b['hotel_id'] == hotel_id]
+    hotel_bookings = repository.get_hotel_bookings(hotel_id)
+    stage_started = record_stage("pricing_api", "get_hotel_bookings", stage_started)
+    
+    # Get events within the event radius
+    nearby_events = repository.events_within(hotel)
+    stage_started = record_stage("pricing_api", "get_nearby_events", stage_started)
+    
+    # Get next 7 days for forecast
+    today = datetime.now()
+    forecast_dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
     
-    # Get nearby events
-    nearby_events = [e for e in events if e['location'] == hotel['location']]
+    # Seeded per (hotel, day) so identical requests return identical prices
+    rng = stream_for(hotel_id, forecast_dates[0], "pricing_api")
     
     # Calculate pricing factors
-    season_factor = random.uniform(0.9, 1.3)
-    demand_factor = random.uniform(0.85, 1.4)
+    season_factor = rng.uniform(0.9, 1.3)
+    demand_factor = rng.uniform(0.85, 1.4)
     event_factor = 1.2 if nearby_events else 1.0
-    competitor_factor = random.uniform(0.9, 1.1)
+    competitor_factor = rng.uniform(0.9, 1.1)
     luxury_factor = 1.0 + (hotel['rating'] - 3.0) * 0.15
     
     # Calculate dynamic price
     base_price = round(100 + (hotel['rating'] * 40), 2)
     dynamic_price = round(base_price * season_factor * demand_factor * event_factor * competitor_factor * luxury_factor, 2)
-    
-    # Get next 7 days for forecast
-    today = datetime.now()
-    forecast_dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    stage_started = record_stage("pricing_api", "factors", stage_started)
     
     # Generate price forecast with slight variations
     price_forecast = []
     for date in forecast_dates:
         # Add some daily variation
-        daily_factor = random.uniform(0.95, 1.05)
+        daily_factor = rng.uniform(0.95, 1.05)
         # Check if event on this date
         date_event_factor = 1.25 if any(e['date'] == date for e in nearby_events) else 1.0
         
@@ -199,6 +435,10 @@ def get_pricing(hotel_id):
             "price": price,
             "has_event": date_event_factor > 1.0
         })
+    stage_started = record_stage("pricing_api", "forecast_loop", stage_started)
+    
+    explanation = generate_pricing_explanation(hotel, season_factor, demand_factor, event_factor, competitor_factor)
+    record_stage("pricing_api", "generate_pricing_explanation", stage_started)
     
     response = {
         "hotel_id": hotel_id,
@@ -217,28 +457,206 @@ def get_pricing(hotel_id):
         },
         "price_forecast": price_forecast,
         "nearby_events": [{"name": e["name"], "date": e["date"]} for e in nearby_events[:3]],
-        "explanation": generate_pricing_explanation(hotel, season_factor, demand_factor, event_factor, competitor_factor)
+        "explanation": explanation
     }
     
-    return jsonify(response)
+    return response
 
 @app.route('/api/staffing/<hotel_id>')
 def get_staffing(hotel_id):
     """API endpoint to get staffing recommendations"""
+    state = reloader.state
+    
     # Find hotel details
-    hotel = next((h for h in hotels if h['hotel_id'] == hotel_id), None)
+    hotel = state.repository.get_hotel_details(hotel_id)
     
     if not hotel:
         return jsonify({"error": "Hotel not found"}), 404
     
-    # Get forecast data from staffing engine
-    staffing_data = staffing_engine.calculate_staffing(hotel_id)
+    # Materialized staffing forecast, kept up to date across deltas, cached per (hotel, day)
+    today = datetime.now().strftime("%Y-%m-%d")
+    staffing_data = compute_cached(state, "staffing", (hotel_id, today),
+                                   lambda: state.current_forecasts().staffing(hotel_id))
+    
+    stage_started = time.perf_counter()
+    if wants_compact():
+        staffing_data = compact_staffing(staffing_data)
+    serialized = jsonify(staffing_data)
+    record_stage("staffing_api", "serialize", stage_started)
+    return serialized
+
+def stream_hotel_results(kind, state, compute, compact):
+    """Stream compute(hotel) for every hotel matching the /api/hotels filters, as NDJSON or SSE"""
+    try:
+        filters = hotel_filters(request.args)
+        fmt = stream_format(request)
+        after = last_event_position(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    compact_results = wants_compact()
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    def results():
+        for position, hotel in iter_hotels(state.repository, filters, after):
+            # On the compute pool under the per-hotel endpoint's key, so its limits apply and identical work is shared
+            key = response_cache.make_key(kind, hotel['hotel_id'], today, version=state.version)
+            result = compute_pool.run(key, lambda: compute(hotel))
+            yield position, compact(result) if compact_results else result
     
-    return jsonify(staffing_data)
+    # The first result is computed before responding, so a busy pool still answers 503 or 504
+    stream = results()
+    first = next(stream, None)
+    items = itertools.chain([first] if first is not None else [], stream)
+    response = app.response_class(encode_stream(items, fmt, kind, app.json.dumps,
+                                                errors=(PoolSaturated, ComputeTimeout)),
+                                  mimetype=STREAM_MIMETYPES[fmt])
+    response.cache_control.no_cache = True
+    # Ask proxies such as nginx to pass results through as they are produced
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['X-Data-Version'] = state.version
+    return response
+
+@app.route('/api/pricing/stream')
+def stream_pricing():
+    """API endpoint to stream pricing for every matching hotel"""
+    state = reloader.state
+    return stream_hotel_results("pricing", state, lambda hotel: build_pricing(state.repository, hotel),
+                                compact_pricing)
+
+@app.route('/api/staffing/stream')
+def stream_staffing():
+    """API endpoint to stream staffing recommendations for every matching hotel"""
+    state = reloader.state
+    return stream_hotel_results("staffing", state, lambda hotel: state.current_forecasts().staffing(hotel['hotel_id']),
+                                compact_staffing)
+
+@app.route('/api/forecast/<hotel_id>')
+def get_precomputed_forecast(hotel_id):
+    """API endpoint to get the nightly precomputed price and staffing forecast"""
+    state = reloader.state
+    forecast = forecast_store.current()
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    # Only serve today's run computed from the data currently loaded, else the incremental forecast
+    if forecast is not None and forecast.data_version == state.version and forecast.run_date == today:
+        result, source = forecast.get(hotel_id), "nightly"
+    else:
+        result, source = state.current_forecasts().forecast(hotel_id), "incremental"
+    if result is None:
+        return jsonify({"error": "Hotel not found"}), 404
+    
+    response = jsonify(result)
+    response.headers['X-Forecast-Source'] = source
+    return response
+
+# Largest explicit hotel_ids list a staffing batch accepts; omit hotel_ids for the whole portfolio
+STAFFING_BATCH_MAX = 1000
+
+@app.route('/api/staffing/batch', methods=['POST'])
+def get_staffing_batch():
+    """API endpoint to get staffing recommendations for many hotels at once"""
+    payload = request.get_json(silent=True) or {}
+    hotel_ids = payload.get('hotel_ids')
+    
+    if hotel_ids is not None and not (isinstance(hotel_ids, list)
+                                      and all(isinstance(hotel_id, str) for hotel_id in hotel_ids)):
+        return jsonify({"error": "hotel_ids must be a list of strings"}), 400
+    if hotel_ids is not None and len(hotel_ids) > STAFFING_BATCH_MAX:
+        return jsonify({"error": f"hotel_ids must hold at most {STAFFING_BATCH_MAX} ids"}), 400
+    
+    # Omitting hotel_ids computes the whole portfolio; identical concurrent batches share the work
+    state = reloader.state
+    batch_key = response_cache.make_key("staffing_batch", *(hotel_ids or ["*"]), version=state.version)
+    results = compute_pool.run(batch_key, lambda: state.staffing_engine.calculate_staffing_batch(hotel_ids))
+    not_found = [hotel_id for hotel_id, data in results.items() if data is None]
+    found = {hotel_id: data for hotel_id, data in results.items() if data is not None}
+    
+    response = {"count": len(found)}
+    if wants_compact():
+        # Values shared by every hotel (hourly_rates) are sent once at the top level
+        found = {hotel_id: compact_staffing(data, shared=response) for hotel_id, data in found.items()}
+    response.update(results=found, not_found=not_found)
+    
+    stage_started = time.perf_counter()
+    serialized = jsonify(response)
+    record_stage("staffing_api", "serialize_batch", stage_started)
+    return serialized
+
+def scenario_params():
+    """Read a scenario request from the JSON body (POST) or the query string (GET)."""
+    from genai.scenarios import (ADJUSTABLE, DEFAULT_PERCENTILES, DEFAULT_SAMPLES, MAX_SAMPLES,
+                                 parse_adjustments, parse_uncertainty)
+    if request.method == 'POST':
+        payload = request.get_json(silent=True) or {}
+        adjustments = payload.get('adjustments', {})
+        uncertainty = payload.get('uncertainty', {})
+        percentiles = payload.get('percentiles', DEFAULT_PERCENTILES)
+    else:
+        payload = request.args
+        adjustments = {name: payload[name] for name in ADJUSTABLE if name in payload}
+        uncertainty = {}
+        percentiles = payload['percentiles'].split(',') if payload.get('percentiles') else DEFAULT_PERCENTILES
+    
+    if not isinstance(adjustments, dict) or not isinstance(uncertainty, dict):
+        raise ValueError("adjustments and uncertainty must be objects")
+    if not isinstance(percentiles, (list, tuple)) or not percentiles:
+        raise ValueError("percentiles must be a non-empty list")
+    try:
+        samples = int(payload.get('samples', DEFAULT_SAMPLES))
+        percentiles = [float(p) for p in percentiles]
+    except (TypeError, ValueError):
+        raise ValueError("samples and percentiles must be numbers") from None
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+    
+    date_str = payload.get('date') or datetime.now().strftime("%Y-%m-%d")
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError("date must be YYYY-MM-DD") from None
+    
+    return {
+        "samples": samples,
+        "adjustments": parse_adjustments(adjustments),
+        "uncertainty": parse_uncertainty(uncertainty),
+        "percentiles": percentiles,
+        "date_str": date_str
+    }
+
+@app.route('/api/scenarios/<hotel_id>', methods=['GET', 'POST'])
+def get_scenarios(hotel_id):
+    """API endpoint to get price and labor cost percentiles over sampled what-if scenarios"""
+    state = reloader.state
+    hotel = state.repository.get_hotel_details(hotel_id)
+    
+    if not hotel:
+        return jsonify({"error": "Hotel not found"}), 404
+    
+    try:
+        params = scenario_params()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def compute():
+        # NumPy is only needed for scenario simulation
+        from genai.scenarios import simulate_scenarios
+        simulation = simulate_scenarios(state.pricing_engine, state.staffing_engine, hotel, params["samples"],
+                                        params["adjustments"], params["uncertainty"], params["date_str"])
+        return simulation.summary(params["percentiles"])
+    
+    # Draws are seeded per (hotel, start date), so identical requests give identical results
+    parts = (hotel_id, params["date_str"], params["samples"], sorted(params["adjustments"].items()),
+             sorted(params["uncertainty"].items()), params["percentiles"])
+    return jsonify(compute_cached(state, "scenarios", parts, compute))
 
 @app.route('/debug/locations')
 def debug_locations():
     """Debug endpoint to check location matching"""
+    repository = reloader.state.repository
+    hotels, events = repository.hotels, repository.events
+    
     hotel_locations = set(hotel['location'] for hotel in hotels)
     event_locations = set(event['location'] for event in events)
     matching_locations = hotel_locations.intersection(event_locations)
@@ -256,6 +674,76 @@ def debug_locations():
         'upcoming_dates': upcoming_dates
     })
 
+@app.route('/debug/startup')
+def debug_startup():
+    """Debug endpoint to check startup phase timings"""
+    return jsonify(startup_report.as_dict())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: per-stage engine timings, request latency and cache counters"""
+    return app.response_class(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/cache')
+def debug_cache():
+    """Debug endpoint to check response and page cache hit/miss/eviction counters"""
+    return jsonify(dict(response_cache.stats(), pages=page_cache.stats()))
+
+@app.route('/debug/pool')
+def debug_pool():
+    """Debug endpoint to check compute pool load and coalescing counters"""
+    return jsonify(compute_pool.stats())
+
+@app.route('/debug/forecasts')
+def debug_forecasts():
+    """Debug endpoint to check the published nightly forecast run and incremental recomputation"""
+    state = reloader.state
+    stats = forecast_store.stats()
+    stats['current_data_version'] = state.version
+    stats['incremental'] = state.current_forecasts().stats()
+    return jsonify(stats)
+
+@app.route('/debug/indexes')
+def debug_indexes():
+    """Debug endpoint to check data index sizes and build time"""
+    return jsonify(reloader.state.repository.index_stats())
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """API endpoint to apply a posted delta, or with an empty body to poll the data directory"""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({"error": "body must be a JSON object"}), 400
+    delta_bookings = payload.get('bookings', [])
+    delta_events = payload.get('events', [])
+    delta_competitors = payload.get('competitors', [])
+    
+    if not all(isinstance(rows, list) for rows in (delta_bookings, delta_events, delta_competitors)):
+        return jsonify({"error": "bookings, events and competitors must be lists"}), 400
+    
+    if delta_bookings or delta_events or delta_competitors:
+        try:
+            state = reloader.apply_delta(delta_bookings, delta_events, delta_competitors)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        result = {"full_reload": False, "bookings": len(delta_bookings), "events": len(delta_events),
+                  "competitors": len(delta_competitors), "version": state.version}
+    else:
+        try:
+            result = reloader.poll()
+        except (ValueError, OSError) as e:
+            return jsonify({"error": f"Reload failed: {e}"}), 400
+        if result["delta_files_failed"]:
+            names = ", ".join(result["delta_files_failed"])
+            return jsonify(dict(result, error=f"Delta files could not be applied: {names}")), 400
+    
+    return jsonify(result)
+
+@app.route('/debug/reload')
+def debug_reload():
+    """Debug endpoint to check the data version and reload counters"""
+    return jsonify(reloader.stats())
+
 def generate_pricing_explanation(hotel, season_factor, demand_factor, event_factor, competitor_factor):
     """Generate human-readable explanation for pricing decisions"""
     explanation = f"The recommended rate for {hotel['name']} is based on several factors: "
@@ -290,5 +778,22 @@ def generate_pricing_explanation(hotel, season_factor, demand_factor, event_fact
     
     return explanation
 
+@app.errorhandler(PoolSaturated)
+def handle_pool_saturated(error):
+    """Shed load when too many computations are pending"""
+    response = jsonify({"error": "Server busy, retry shortly"})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.errorhandler(ComputeTimeout)
+def handle_compute_timeout(error):
+    """A computation took longer than HOTEL_OPTIMIZER_COMPUTE_TIMEOUT"""
+    return jsonify({"error": "Computation timed out"}), 504
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # HOTEL_OPTIMIZER_SERVER=production serves with a multi-threaded server instead of the dev server
+    if os.environ.get('HOTEL_OPTIMIZER_SERVER') == 'production':
+        serve(app, **serving_config())
+    else:
+        app.run(debug=True)
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def measure(name, func, args_list, iterations):
+    """Time func over iterations calls, cycling through args_list."""
+    # Warm up once so imports and lazy indexes are not counted
+    func(*args_list[0])
+    
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        args = args_list[i % len(args_list)]
+        call_started = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+    
+    # One extra traced call for the Python allocation peak
+    tracemalloc.start()
+    func(*args_list[0])
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    latencies.sort()
+    return {
+        "case": name,
+        "iterations": iterations,
+        "mean_ms": round(total / iterations * 1000, 4),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+        "throughput_per_sec": round(iterations / total, 2),
+        "peak_alloc_kb": round(peak_bytes / 1024, 1)
+    }
+
+def generate_dataset(data_dir, hotel_count, seed):
+    """Generate a reproducible mock dataset through SAPMockGenerator."""
+    from faker import Faker
+    from mock.sap_mock import SAPMockGenerator
+    from store.bootstrap import prepare_data
+    
+    random.seed(seed)
+    Faker.seed(seed)
+    generator = SAPMockGenerator()
+    generator.generate_hotels(hotel_count)
+    generator.generate_bookings()
+    generator.generate_events()
+    generator.generate_competitors()
+    generator.export_to_json(data_dir)
+    # Aligns hotel locations with events, as for the real app
+    prepare_data(data_dir)
+
+def run_worker(iterations):
+    """Run inside the child process: import the app and time each entry point."""
+    import_started = time.perf_counter()
+    import app as app_module
+    import_seconds = time.perf_counter() - import_started
+    
+    client = app_module.app.test_client()
+    state = app_module.reloader.state
+    pricing_engine = state.pricing_engine
+    staffing_engine = state.staffing_engine
+    hotels = state.repository.hotels
+    sample = [(h["hotel_id"], h["rating"]) for h in hotels[:50]]
+    hotel_ids = [(hotel_id,) for hotel_id, _ in sample]
+    
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, url
+    
+    cases = [
+        ("PricingEngine.calculate_price", pricing_engine.calculate_price, sample),
+        ("PricingEngine.generate_price_forecast", pricing_engine.generate_price_forecast, sample),
+        ("StaffingEngine.calculate_staffing", staffing_engine.calculate_staffing, hotel_ids),
+        ("GET /api/pricing/<hotel_id>", get, [(f"/api/pricing/{h}",) for h, in hotel_ids]),
+        ("GET /api/staffing/<hotel_id>", get, [(f"/api/staffing/{h}",) for h, in hotel_ids]),
+        ("GET /hotels-with-events", get, [("/hotels-with-events",)])
+    ]
+    results = [measure(name, func, args, iterations) for name, func, args in cases]
+    
+    if os.environ.get("HOTEL_OPTIMIZER_CACHE_SIZE") == "0":
+        # Cache-off numbers are only meaningful if nothing was served from a cache
+        caches = client.get("/debug/cache").get_json()
+        hits = {name: stats["hits"] for name, stats in
+                (("local", caches["local"]), ("shared", caches.get("shared")), ("pages", caches["pages"]["local"]))
+                if stats}
+        assert not any(hits.values()), f"cache hits with the cache off: {hits}"
+        materialized = client.get("/debug/forecasts").get_json()["incremental"]["materialized_hotels"]
+        assert not any(materialized.values()), f"forecast memo in use with the cache off: {materialized}"
+    
+    print(json.dumps({
+        "hotels": len(hotels),
+        "bookings": len(state.repository.bookings),
+        "events": len(state.repository.events),
+        "import_ms": round(import_seconds * 1000, 2),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "cases": results
+    }))
+
+def run_scale(hotel_count, iterations, seed, with_cache):
+    """Generate a dataset of hotel_count hotels and benchmark it in a child process."""
+    with tempfile.TemporaryDirectory(prefix="hotel-bench-") as data_dir:
+        generate_dataset(data_dir, hotel_count, seed)
+        
+        env = dict(os.environ, HOTEL_OPTIMIZER_DATA_DIR=data_dir)
+        if not with_cache:
+            # Measure computation, not cache hits: no response cache and no forecast memo
+            env["HOTEL_OPTIMIZER_CACHE_SIZE"] = "0"
+            env["HOTEL_OPTIMIZER_FORECAST_MEMO_SIZE"] = "0"
+            env.pop("HOTEL_OPTIMIZER_SHARED_CACHE", None)
+        completed = subprocess.run(
+            [sys.executable, "-m", "bench.run_benchmarks", "--worker", "--iterations", str(iterations)],
+            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+        )
+    # The app prints startup lines; the result is the last line
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["scale"] = hotel_count
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current, threshold):
+    """Return (scale, case, old p50, new p50) for cases slower by more than threshold."""
+    old = {(s["scale"], c["case"]): c for s in previous["scales"] for c in s["cases"]}
+    regressions = []
+    for scale in current["scales"]:
+        for case in scale["cases"]:
+            before = old.get((scale["scale"], case["case"]))
+            if before and before["p50_ms"] > 0 and case["p50_ms"] > before["p50_ms"] * (1 + threshold):
+                regressions.append((scale["scale"], case["case"], before["p50_ms"], case["p50_ms"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark pricing/staffing engines and routes, one child process per scale",
+        epilog="e.g. --scales 100,300,1000 --output bench.json, then --compare bench.json --output bench-new.json"
+    )
+    parser.add_argument("--scales", default="100,300,1000", help="comma-separated hotel counts")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--with-cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--compare", help="previous results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown (0.10 = 10%%)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args.iterations)
+        return 0
+    
+    scales = []
+    for hotel_count in (int(s) for s in args.scales.split(",")):
+        print(f"Benchmarking {hotel_count} hotels...")
+        result = run_scale(hotel_count, args.iterations, args.seed, args.with_cache)
+        for case in result["cases"]:
+            print(f"  {case['case']:<40} p50 {case['p50_ms']:>9.3f} ms  p99 {case['p99_ms']:>9.3f} ms  "
+                  f"{case['throughput_per_sec']:>10.1f}/s")
+        scales.append(result)
+    
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "with_cache": args.with_cache
+        },
+        "scales": scales
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for scale, case, before, after in regressions:
+            print(f"REGRESSION {scale} hotels {case}: p50 {before:.3f} ms -> {after:.3f} ms")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
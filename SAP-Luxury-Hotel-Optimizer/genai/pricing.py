@@ -1,5 +1,10 @@
 import random
+import time
 from datetime import datetime, timedelta
+from genai.rng import DEFAULT_SEED, stream_for, stream_seed
+from services.metrics import record_stage
+from store.geo import day_range
+from store.repository import HotelRepository
 
 class PricingEngine:
     """
@@ -7,28 +12,39 @@ class PricingEngine:
     implemented using SAP's AI technologies for hotel room pricing optimization.
     """
     
-    def __init__(self, bookings, competitors, events):
+    def __init__(self, bookings, competitors, events, repository=None, seed=DEFAULT_SEED):
         self.bookings = bookings
         self.competitors = competitors
         self.events = events
+        self.seed = seed
+        # Indexed lookups shared with the staffing engine and the Flask routes
+        self.repository = repository or HotelRepository([], bookings, events, competitors)
         
     def get_hotel_bookings(self, hotel_id):
         """Get all bookings for a specific hotel."""
-        return [b for b in self.bookings if b["hotel_id"] == hotel_id]
+        return self.repository.get_hotel_bookings(hotel_id)
+    
+    def get_booking_stats(self, hotel_id):
+        """Get precomputed booking aggregates for a hotel."""
+        return self.repository.get_booking_stats(hotel_id)
     
     def get_competitor_price(self, hotel_id):
         """Get competitor price for a specific hotel."""
-        competitor = next((c for c in self.competitors if c["hotel_id"] == hotel_id), None)
-        return competitor["competitor_price"] if competitor else None
+        return self.repository.get_competitor_price(hotel_id)
     
     def get_nearby_events(self, location, date=None):
         """Get events near a specific location and optionally on a specific date."""
-        nearby_events = [e for e in self.events if e["location"] == location]
-        if date:
-            nearby_events = [e for e in nearby_events if e["date"] == date]
-        return nearby_events
+        return self.repository.get_nearby_events(location, date)
+    
+    def events_near_hotel(self, hotel, date=None):
+        """Get events within the event radius of a hotel and optionally on a specific date."""
+        return self.repository.events_within(hotel, date_range=day_range(date) if date else None)
     
-    def calculate_season_factor(self, date_str=None):
+    def rng_for(self, hotel_id, date_str, purpose):
+        """Get the deterministic random stream for a (hotel, date, purpose)."""
+        return stream_for(hotel_id, date_str, purpose, seed=self.seed)
+    
+    def calculate_season_factor(self, date_str=None, rng=random):
         """Calculate season factor based on current date."""
         if not date_str:
             date = datetime.now()
@@ -37,24 +53,24 @@ class PricingEngine:
             
         # Summer months get higher rates
         if date.month in [6, 7, 8]:
-            return random.uniform(1.15, 1.3)
+            return rng.uniform(1.15, 1.3)
         # Winter holidays also get higher rates
         elif date.month == 12 and date.day >= 15:
-            return random.uniform(1.2, 1.35)
+            return rng.uniform(1.2, 1.35)
         # Spring and fall are shoulder seasons
         elif date.month in [4, 5, 9, 10]:
-            return random.uniform(1.0, 1.15)
+            return rng.uniform(1.0, 1.15)
         # Winter (non-holiday) gets lower rates
         else:
-            return random.uniform(0.85, 1.0)
+            return rng.uniform(0.85, 1.0)
     
-    def calculate_demand_factor(self, hotel_bookings):
-        """Calculate demand factor based on current bookings."""
-        if not hotel_bookings:
+    def calculate_demand_factor(self, booking_stats):
+        """Calculate demand factor based on the hotel's precomputed booking aggregates."""
+        if not booking_stats or not booking_stats.count:
             return 1.0
             
         # Simple demand calculation - more bookings = higher factor
-        avg_bookings = sum(b["bookings"] for b in hotel_bookings) / len(hotel_bookings)
+        avg_bookings = booking_stats.average
         
         # Scale to a factor between 0.8 and 1.5
         return 0.8 + min(avg_bookings / 50, 0.7)
@@ -65,12 +81,12 @@ class PricingEngine:
             return 1.0
             
         # Sum up the expected attendance
-        total_attendance = sum(e["expected_attendance"] for e in nearby_events)
+        total_attendance = sum(e.expected_attendance for e in nearby_events)
         
         # Scale to a factor between 1.0 and 1.5
         return 1.0 + min(total_attendance / 10000, 0.5)
     
-    def calculate_competitor_factor(self, hotel_id, base_price):
+    def calculate_competitor_factor(self, hotel_id, base_price, rng=random):
         """Calculate competitor factor based on nearby hotel rates."""
         competitor_price = self.get_competitor_price(hotel_id)
         
@@ -83,39 +99,42 @@ class PricingEngine:
         # If competitors are more expensive, we can raise prices
         # If competitors are cheaper, we might need to lower prices
         if ratio > 1.1:
-            return random.uniform(1.05, 1.15)
+            return rng.uniform(1.05, 1.15)
         elif ratio < 0.9:
-            return random.uniform(0.9, 0.98)
+            return rng.uniform(0.9, 0.98)
         else:
-            return random.uniform(0.95, 1.05)
+            return rng.uniform(0.95, 1.05)
     
     def calculate_price(self, hotel_id, hotel_rating=4.0, date_str=None):
         """Calculate optimized dynamic price for a hotel room."""
+        stage_started = time.perf_counter()
+        
         # Get relevant data
-        hotel_bookings = self.get_hotel_bookings(hotel_id)
+        booking_stats = self.get_booking_stats(hotel_id)
+        stage_started = record_stage("pricing", "get_booking_stats", stage_started)
         
         # Calculate base price based on hotel rating
         base_price = 100 + (hotel_rating * 40)
         
+        # Random draws come from the (hotel, date) stream so results are reproducible
+        rng = self.rng_for(hotel_id, date_str or datetime.now().strftime("%Y-%m-%d"), "price")
+        
         # Calculate pricing factors
-        season_factor = self.calculate_season_factor(date_str)
-        demand_factor = self.calculate_demand_factor(hotel_bookings)
+        season_factor = self.calculate_season_factor(date_str, rng)
+        demand_factor = self.calculate_demand_factor(booking_stats)
+        stage_started = record_stage("pricing", "season_demand", stage_started)
         
-        # Get hotel location from a booking (assuming all bookings have same location)
-        hotel_location = None
-        if hotel_bookings:
-            hotel_data = next((h for h in self.bookings if h["hotel_id"] == hotel_id), None)
-            if hotel_data:
-                # This is a simplification - in real data we'd have location in the hotel object
-                hotel_location = "Sample Location"
+        # Without hotel data there is no location to find events around
+        hotel = self.repository.get_hotel_details(hotel_id)
         
         # Calculate event and competitor factors
         event_factor = 1.0
-        if hotel_location:
-            nearby_events = self.get_nearby_events(hotel_location, date_str)
+        if hotel:
+            nearby_events = self.events_near_hotel(hotel, date_str)
+            stage_started = record_stage("pricing", "get_nearby_events", stage_started)
             event_factor = self.calculate_event_factor(nearby_events)
             
-        competitor_factor = self.calculate_competitor_factor(hotel_id, base_price)
+        competitor_factor = self.calculate_competitor_factor(hotel_id, base_price, rng)
         
         # Calculate luxury factor based on hotel rating
         luxury_factor = 1.0 + (hotel_rating - 3.0) * 0.15
@@ -131,28 +150,47 @@ class PricingEngine:
             "competitor_factor": round(competitor_factor, 2),
             "luxury_factor": round(luxury_factor, 2)
         }
+        record_stage("pricing", "factors", stage_started)
         
         return round(dynamic_price, 2), pricing_factors
     
-    def generate_price_forecast(self, hotel_id, hotel_rating=4.0, days=7):
-        """Generate price forecast for the next X days."""
+    def generate_price_forecast(self, hotel_id, hotel_rating=4.0, days=7, start_date=None):
+        """Generate price forecast for the next X days, starting today or at start_date."""
         forecast = []
-        today = datetime.now()
+        today = start_date or datetime.now()
+        stage_started = time.perf_counter()
         
         for i in range(days):
             date = today + timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Add some randomness for each day
-            variation = random.uniform(0.95, 1.05)
-            
-            price, factors = self.calculate_price(hotel_id, hotel_rating, date_str)
-            price = price * variation
-            
-            forecast.append({
-                "date": date_str,
-                "price": round(price, 2),
-                "factors": factors
-            })
+            forecast.append(self.forecast_day(hotel_id, hotel_rating, date.strftime("%Y-%m-%d")))
+        record_stage("pricing", "forecast_loop", stage_started)
             
         return forecast
+    
+    def forecast_day(self, hotel_id, hotel_rating, date_str):
+        """One day of the price forecast; depends only on that hotel and date."""
+        # Add some randomness for each day
+        variation = self.rng_for(hotel_id, date_str, "variation").uniform(0.95, 1.05)
+        
+        price, factors = self.calculate_price(hotel_id, hotel_rating, date_str)
+        price = price * variation
+        
+        return {
+            "date": date_str,
+            "price": round(price, 2),
+            "factors": factors
+        }
+    
+    def generate_price_forecast_matrix(self, hotel_ids, days=90, seed=None):
+        """
+        Generate a price forecast for many hotels at once, e.g. the whole chain
+        for 90 or 365 days. Returns a PriceForecastMatrix with a compact
+        (hotels, days) price matrix computed with NumPy. Without an explicit
+        seed the draws are seeded from the engine seed and today's date.
+        """
+        # NumPy is only needed for the vectorized mode
+        from genai.vectorized import compute_price_matrix
+        if seed is None:
+            # Same engine seed and day give the same matrix
+            seed = stream_seed("matrix", datetime.now().strftime("%Y-%m-%d"), days, seed=self.seed)
+        return compute_price_matrix(self, hotel_ids, days, seed)
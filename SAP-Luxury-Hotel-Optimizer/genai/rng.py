@@ -0,0 +1,20 @@
+import hashlib
+import os
+import random
+
+# Global seed for every forecast stream; change it to get a different but
+# equally reproducible set of forecasts.
+DEFAULT_SEED = int(os.environ.get("HOTEL_OPTIMIZER_SEED", 0))
+
+def stream_seed(*parts, seed=DEFAULT_SEED):
+    """Derive a stable 64-bit seed from the global seed and key parts."""
+    key = ":".join(str(p) for p in (seed,) + parts)
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+def stream_for(*parts, seed=DEFAULT_SEED):
+    """
+    Return an independent random stream for a key such as (hotel_id, date).
+    The same key always yields the same sequence, in any process, so
+    identical requests produce identical forecasts.
+    """
+    return random.Random(stream_seed(*parts, seed=seed))
@@ -0,0 +1,194 @@
+from datetime import datetime
+import numpy as np
+from genai.rng import stream_seed
+from genai.vectorized import HOURLY_RATE_VECTOR, MINIMUM_STAFF, base_staffing_matrix, season_bounds
+from store.geo import day_range
+
+DEFAULT_SAMPLES = 10000
+MAX_SAMPLES = 100000
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Inputs a scenario can scale, e.g. {"attendance": "+50%"}
+ADJUSTABLE = ("attendance", "demand", "competitor_price", "season")
+
+# Relative standard deviation of the uncertain inputs; season and daily
+# variation are drawn from the engines' own ranges
+DEFAULT_UNCERTAINTY = {"demand": 0.15, "competitor_price": 0.1}
+
+def parse_multiplier(name, value):
+    """
+    Read an adjustment as a multiplier: a number (1.5) or a relative change
+    as a string ("+50%", "-20%"). Raises ValueError for anything else.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            multiplier = 1.0 + float(text[:-1]) / 100 if text.endswith("%") else float(text)
+        except ValueError:
+            raise ValueError(f"{name} must be a multiplier or a change such as +50%") from None
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        multiplier = float(value)
+    else:
+        raise ValueError(f"{name} must be a multiplier or a change such as +50%")
+    if not multiplier >= 0 or multiplier == float("inf"):
+        raise ValueError(f"{name} must not go below zero")
+    return multiplier
+
+def parse_adjustments(adjustments):
+    """Validate {input: change} and return {input: multiplier}."""
+    unknown = sorted(set(adjustments) - set(ADJUSTABLE))
+    if unknown:
+        raise ValueError(f"Unknown adjustment {unknown[0]!r}; expected one of {', '.join(ADJUSTABLE)}")
+    return {name: parse_multiplier(name, value) for name, value in sorted(adjustments.items())}
+
+def parse_uncertainty(uncertainty):
+    """Validate {input: relative standard deviation}, filled in from the defaults."""
+    unknown = sorted(set(uncertainty) - set(DEFAULT_UNCERTAINTY))
+    if unknown:
+        raise ValueError(f"Unknown uncertainty {unknown[0]!r}; expected one of {', '.join(DEFAULT_UNCERTAINTY)}")
+    result = dict(DEFAULT_UNCERTAINTY)
+    for name, value in uncertainty.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+            raise ValueError(f"uncertainty of {name} must be between 0 and 1")
+        result[name] = float(value)
+    return result
+
+def percentile_key(p):
+    return f"p{p:g}"
+
+class ScenarioSimulation:
+    """
+    Sampled outcomes of one hotel's 7-day forecast: a (samples, days)
+    matrix of dynamic prices and one of daily labor costs.
+    """
+    
+    def __init__(self, hotel, dates, prices, daily_cost, adjustments, uncertainty):
+        self.hotel = hotel
+        self.dates = dates
+        self.prices = prices
+        self.daily_cost = daily_cost
+        self.adjustments = adjustments
+        self.uncertainty = uncertainty
+    
+    @property
+    def samples(self):
+        return len(self.prices)
+    
+    @property
+    def total_weekly_cost(self):
+        """Labor cost per sample over the forecast window."""
+        return self.daily_cost.sum(axis=1)
+    
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        """Mean and percentiles of the daily dynamic price and of the weekly labor cost."""
+        keys = [percentile_key(p) for p in percentiles]
+        price_mean = self.prices.mean(axis=0).tolist()
+        price_percentiles = np.percentile(self.prices, percentiles, axis=0).tolist()
+        weekly_cost = self.total_weekly_cost
+        cost_percentiles = np.percentile(weekly_cost, percentiles).tolist()
+        
+        return {
+            "hotel_id": self.hotel.hotel_id,
+            "hotel_name": self.hotel.name,
+            "start_date": self.dates[0],
+            "samples": self.samples,
+            "adjustments": self.adjustments,
+            "uncertainty": self.uncertainty,
+            "dynamic_price": [{
+                "date": date_str,
+                "mean": round(price_mean[d], 2),
+                "percentiles": {key: round(row[d], 2) for key, row in zip(keys, price_percentiles)}
+            } for d, date_str in enumerate(self.dates)],
+            "total_weekly_cost": {
+                "mean": round(float(weekly_cost.mean()), 2),
+                "std": round(float(weekly_cost.std()), 2),
+                "percentiles": {key: round(value, 2) for key, value in zip(keys, cost_percentiles)}
+            }
+        }
+
+def simulate_scenarios(pricing_engine, staffing_engine, hotel, samples=DEFAULT_SAMPLES,
+                       adjustments=None, uncertainty=None, date_str=None):
+    """
+    Sample the 7-day price and staffing forecast of one hotel many times.
+    Every factor of PricingEngine.calculate_price and
+    StaffingEngine.build_staffing_day is evaluated over a samples axis:
+    
+    season        drawn from the engine's seasonal range per (sample, day)
+    demand        average bookings scaled by a normal shock per sample; it
+                  drives both the demand and the occupancy factor
+    competitor    competitor price scaled by a normal shock per sample,
+                  then drawn from the engine's band for the resulting ratio
+    events        expected attendance of the events near the hotel
+    
+    adjustments ({input: multiplier}) scale the inputs before sampling. All
+    draws are made in one batched call from a stream seeded by hotel and
+    start date, so a what-if is compared with the baseline on the same
+    draws and only the adjustment moves the result.
+    """
+    adjustments = adjustments or {}
+    uncertainty = dict(DEFAULT_UNCERTAINTY, **(uncertainty or {}))
+    context = staffing_engine.build_forecast_context(date_str)
+    dates = context["dates"]
+    n_days = len(dates)
+    
+    rng = np.random.default_rng(stream_seed(hotel.hotel_id, dates[0], "scenarios", seed=pricing_engine.seed))
+    shocks = rng.standard_normal((2, samples))
+    uniforms = rng.random((3, samples, n_days))
+    
+    # Demand: average bookings per sample, neutral without bookings
+    booking_stats = pricing_engine.get_booking_stats(hotel.hotel_id)
+    if booking_stats and booking_stats.count:
+        avg_bookings = (booking_stats.average * adjustments.get("demand", 1.0)
+                        * np.maximum(0.0, 1.0 + uncertainty["demand"] * shocks[0]))
+        demand = 0.8 + np.minimum(avg_bookings / 50, 0.7)
+        occupancy = 0.7 + 0.6 * np.minimum(1.0, avg_bookings / hotel.rooms) if hotel.rooms else np.ones(samples)
+    else:
+        demand = np.ones(samples)
+        occupancy = np.ones(samples)
+    
+    # Events: attendance per day from one query for the window
+    attendance = np.zeros(n_days)
+    has_events = np.zeros(n_days, dtype=bool)
+    date_index = {date_str: d for d, date_str in enumerate(dates)}
+    for e in pricing_engine.repository.events_within(hotel, date_range=(dates[0], day_range(dates[-1])[1])):
+        attendance[date_index[e.date]] += e.expected_attendance
+        has_events[date_index[e.date]] = True
+    attendance *= adjustments.get("attendance", 1.0)
+    price_event = np.where(has_events, 1.0 + np.minimum(attendance / 10000, 0.5), 1.0)
+    staff_event = np.where(has_events, 1.15 + np.minimum(attendance / 15000, 0.35), 1.0)
+    
+    # Season: the engine's range for each date
+    low, high = season_bounds([datetime.strptime(d, "%Y-%m-%d") for d in dates])
+    season = (low + (high - low) * uniforms[0]) * adjustments.get("season", 1.0)
+    
+    # Competitor: band from the sampled price ratio, neutral without a competitor price
+    base_price = 100 + (hotel.rating * 40)
+    competitor_price = pricing_engine.get_competitor_price(hotel.hotel_id) or 0.0
+    sampled_price = (competitor_price * adjustments.get("competitor_price", 1.0)
+                     * np.maximum(0.0, 1.0 + uncertainty["competitor_price"] * shocks[1]))
+    ratio = sampled_price / base_price
+    comp_low = np.select([ratio > 1.1, ratio < 0.9], [1.05, 0.9], 0.95)
+    comp_high = np.select([ratio > 1.1, ratio < 0.9], [1.15, 0.98], 1.05)
+    competitor = comp_low[:, None] + (comp_high - comp_low)[:, None] * uniforms[1]
+    competitor = np.where(sampled_price[:, None] > 0, competitor, 1.0)
+    
+    luxury = 1.0 + (hotel.rating - 3.0) * 0.15
+    prices = np.round(base_price * season * demand[:, None] * price_event * competitor * luxury, 2)
+    
+    # Staffing: the factors of build_staffing_day over (samples, days, departments)
+    base = base_staffing_matrix([hotel.rooms])[0]
+    occ = occupancy[:, None]
+    wkd = np.array(context["weekend_factors"], dtype=np.float64)
+    variation = 0.9 + 0.2 * uniforms[2]
+    factors = np.stack([
+        occ * wkd * staff_event * 1.05,
+        (occ * variation) * 1.1,
+        np.broadcast_to(staff_event * wkd * 1.2, (samples, n_days)),
+        occ * wkd * staff_event * 1.2,
+        np.full((samples, n_days), context["seasonal_factor"] * 0.95)
+    ], axis=2)
+    staff = np.maximum(MINIMUM_STAFF, np.rint(base * factors))
+    daily_cost = (staff * HOURLY_RATE_VECTOR * 8).sum(axis=2)
+    
+    return ScenarioSimulation(hotel, dates, prices, daily_cost, adjustments, uncertainty)
@@ -1,5 +1,19 @@
-import random
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
+from genai.rng import DEFAULT_SEED, stream_for
+from services.metrics import record_stage
+from store.geo import day_range, place_key
+from store.repository import HotelRepository
+
+# Dummy hourly rates per department used for the labor cost roll-up
+HOURLY_RATES = {
+    "front_desk": 18,
+    "housekeeping": 15,
+    "concierge": 22,
+    "restaurant": 17,
+    "maintenance": 20
+}
 
 class StaffingEngine:
     """
@@ -7,25 +21,37 @@ class StaffingEngine:
     typically be implemented using SAP's AI technologies.
     """
     
-    def __init__(self, bookings, hotels, events):
+    def __init__(self, bookings, hotels, events, repository=None, seed=DEFAULT_SEED):
         self.bookings = bookings
         self.hotels = hotels
         self.events = events
+        self.seed = seed
+        # Indexed lookups shared with the pricing engine and the Flask routes
+        self.repository = repository or HotelRepository(hotels, bookings, events, [])
         
     def get_hotel_details(self, hotel_id):
         """Get details for a specific hotel."""
-        return next((h for h in self.hotels if h["hotel_id"] == hotel_id), None)
+        return self.repository.get_hotel_details(hotel_id)
         
     def get_hotel_bookings(self, hotel_id):
         """Get all bookings for a specific hotel."""
-        return [b for b in self.bookings if b["hotel_id"] == hotel_id]
+        return self.repository.get_hotel_bookings(hotel_id)
+    
+    def get_booking_stats(self, hotel_id):
+        """Get precomputed booking aggregates for a hotel."""
+        return self.repository.get_booking_stats(hotel_id)
     
     def get_nearby_events(self, location, date=None):
         """Get events near a specific location and optionally on a specific date."""
-        nearby_events = [e for e in self.events if e["location"] == location]
-        if date:
-            nearby_events = [e for e in nearby_events if e["date"] == date]
-        return nearby_events
+        return self.repository.get_nearby_events(location, date)
+    
+    def events_near_hotel(self, hotel, date=None):
+        """Get events within the event radius of a hotel and optionally on a specific date."""
+        return self.repository.events_within(hotel, date_range=day_range(date) if date else None)
+    
+    def rng_for(self, hotel_id, date_str):
+        """Get the deterministic random stream for a (hotel, date)."""
+        return stream_for(hotel_id, date_str, "staffing", seed=self.seed)
     
     def calculate_base_staffing(self, hotel):
         """Calculate base staffing needs based on hotel size."""
@@ -55,13 +81,13 @@ class StaffingEngine:
             "maintenance": maintenance
         }
     
-    def calculate_occupancy_factor(self, hotel_bookings, hotel_rooms):
-        """Calculate occupancy factor based on bookings."""
-        if not hotel_bookings or not hotel_rooms:
+    def calculate_occupancy_factor(self, booking_stats, hotel_rooms):
+        """Calculate occupancy factor based on the hotel's precomputed booking aggregates."""
+        if not booking_stats or not booking_stats.count or not hotel_rooms:
             return 1.0
             
         # Average bookings
-        avg_bookings = sum(b["bookings"] for b in hotel_bookings) / len(hotel_bookings)
+        avg_bookings = booking_stats.average
         
         # Occupancy percentage
         occupancy = min(1.0, avg_bookings / hotel_rooms)
@@ -75,7 +101,7 @@ class StaffingEngine:
             return 1.0
             
         # Calculate based on total expected attendance
-        total_attendance = sum(e["expected_attendance"] for e in nearby_events)
+        total_attendance = sum(e.expected_attendance for e in nearby_events)
         
         # Give events much more weight in staffing decisions
         # Increase from 1.0-1.3 range to 1.15-1.5 range
@@ -93,6 +119,53 @@ class StaffingEngine:
             return 1.15
         return 1.0
     
+    def calculate_seasonal_factor(self, date_str=None):
+        """Calculate seasonal factor - more staff in high season."""
+        if not date_str:
+            date = datetime.now()
+        else:
+            date = datetime.strptime(date_str, "%Y-%m-%d")
+            
+        if date.month in [6, 7, 8, 12]:  # Summer and December
+            return 1.1
+        return 1.0
+    
+    def build_forecast_context(self, date_str=None):
+        """
+        Precompute everything that does not depend on the hotel: forecast dates,
+        weekend factors and the seasonal factor. Event factors are filled in
+        lazily per place (location and coordinates) so hotels at the same place
+        reuse them. The forecast starts at date_str when given, otherwise today.
+        """
+        today = datetime.strptime(date_str, "%Y-%m-%d") if date_str else datetime.now()
+        dates = [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+        return {
+            "dates": dates,
+            "weekend_factors": [self.calculate_weekend_factor(d) for d in dates],
+            "seasonal_factor": self.calculate_seasonal_factor(date_str),
+            "place_events": {}
+        }
+    
+    def get_event_days(self, hotel, context):
+        """Get (event_factor, event_names) for each forecast day near a hotel."""
+        cache = context["place_events"]
+        key = place_key(hotel)
+        if key not in cache:
+            # One query for the whole forecast window, split by day
+            dates = context["dates"]
+            by_date = defaultdict(list)
+            for e in self.repository.events_within(hotel, date_range=(dates[0], day_range(dates[-1])[1])):
+                by_date[e.date].append(e)
+            cache[key] = [self.summarize_event_day(by_date.get(date_str, [])) for date_str in dates]
+        return cache[key]
+    
+    def get_event_day(self, hotel, date_str):
+        """Get (event_factor, event_names) for one day near a hotel."""
+        return self.summarize_event_day(self.events_near_hotel(hotel, date_str))
+    
+    def summarize_event_day(self, nearby_events):
+        return self.calculate_event_staffing_factor(nearby_events), [e.name for e in nearby_events]
+    
     def calculate_staffing(self, hotel_id, date_str=None):
         """Calculate optimized staffing levels for a hotel."""
         # Get hotel details
@@ -100,109 +173,155 @@ class StaffingEngine:
         if not hotel:
             return None
             
+        return self.build_staffing(hotel, self.build_forecast_context(date_str))
+    
+    def calculate_staffing_batch(self, hotel_ids=None, date_str=None, vectorized=False):
+        """
+        Calculate staffing for many hotels in one pass. Forecast dates, weekend
+        and seasonal factors are computed once, and event factors once per
+        place. Unknown hotel ids map to None. Defaults to every hotel.
+        
+        With vectorized=True the forecast is computed with NumPy array
+        operations; results are identical to the scalar path.
+        """
+        if hotel_ids is None:
+            hotel_ids = [h.hotel_id for h in self.repository.hotels]
+            
+        if vectorized:
+            results = dict.fromkeys(hotel_ids)
+            hotels = [h for h in map(self.get_hotel_details, results) if h]
+            if hotels:
+                results.update(self.calculate_staffing_tensor(hotels, date_str).to_dicts())
+            return results
+            
+        context = self.build_forecast_context(date_str)
+        results = {}
+        for hotel_id in hotel_ids:
+            hotel = self.get_hotel_details(hotel_id)
+            results[hotel_id] = self.build_staffing(hotel, context) if hotel else None
+        return results
+    
+    def calculate_staffing_tensor(self, hotels, date_str=None):
+        """Compute a (hotels, days, departments) StaffingTensor for hotel dicts."""
+        # NumPy is only needed for the vectorized mode
+        from genai.vectorized import compute_staffing_tensor
+        return compute_staffing_tensor(self, hotels, date_str)
+    
+    def build_staffing(self, hotel, context):
+        """Build the staffing forecast for one hotel from a shared forecast context."""
+        hotel_id = hotel["hotel_id"]
+        stage_started = time.perf_counter()
+        
         # Get relevant data
-        hotel_bookings = self.get_hotel_bookings(hotel_id)
+        booking_stats = self.get_booking_stats(hotel_id)
+        stage_started = record_stage("staffing", "get_booking_stats", stage_started)
         
         # Base staffing needs
         base_staffing = self.calculate_base_staffing(hotel)
         
         # Calculate staffing factors
-        occupancy_factor = self.calculate_occupancy_factor(hotel_bookings, hotel["rooms"])
-        weekend_factor = self.calculate_weekend_factor(date_str)
-        
-        # Event factor depends on hotel location
-        event_factor = 1.0
-        nearby_events = self.get_nearby_events(hotel["location"], date_str)
-        event_factor = self.calculate_event_staffing_factor(nearby_events)
-        
-        # Seasonal factor - more staff in high season
-        seasonal_factor = 1.0
-        if not date_str:
-            date = datetime.now()
-        else:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            
-        if date.month in [6, 7, 8, 12]:  # Summer and December
-            seasonal_factor = 1.1
+        occupancy_factor = self.calculate_occupancy_factor(booking_stats, hotel["rooms"])
+        seasonal_factor = context["seasonal_factor"]
+        stage_started = record_stage("staffing", "factors", stage_started)
+        event_days = self.get_event_days(hotel, context)
+        stage_started = record_stage("staffing", "get_nearby_events", stage_started)
         
         # Generate staffing forecast for next 7 days
         forecast = []
-        today = datetime.now()
         
-        for i in range(7):
-            date = today + timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Update factors for each day
-            weekend_factor = self.calculate_weekend_factor(date_str)
-            nearby_events = self.get_nearby_events(hotel["location"], date_str)
-            event_factor = self.calculate_event_staffing_factor(nearby_events)
-            
-            # Daily variation in occupancy
-            daily_occupancy = occupancy_factor * random.uniform(0.9, 1.1)
-            
-            # Calculate staff for each department with slight random variation
-            daily_staffing = {}
-            for dept, base in base_staffing.items():
-                # Different departments are affected differently by factors
-                if dept == "front_desk":
-                    factor = occupancy_factor * weekend_factor * event_factor * 1.05
-                elif dept == "housekeeping":
-                    factor = daily_occupancy * 1.1
-                elif dept == "concierge":
-                    factor = event_factor * weekend_factor * 1.2  # Increased from 1.1
-                elif dept == "restaurant":
-                    factor = occupancy_factor * weekend_factor * event_factor * 1.2  # Added multiplier
-                else:  # maintenance
-                    factor = seasonal_factor * 0.95
-                    
-                # Calculate staff needed
-                staff = round(base * factor)
+        for i, date_str in enumerate(context["dates"]):
+            forecast.append(self.build_staffing_day(hotel, date_str, base_staffing, occupancy_factor,
+                                                    context["weekend_factors"][i], seasonal_factor, event_days[i]))
+        record_stage("staffing", "forecast_loop", stage_started)
+        
+        # The summary factors are those of the last forecast day
+        return self.summarize_staffing(hotel, forecast, occupancy_factor, event_days[-1][0],
+                                       context["weekend_factors"][-1], seasonal_factor)
+    
+    def rebuild_staffing_days(self, hotel, staffing, dates, context):
+        """
+        Recompute only the given days of a staffing forecast that was built
+        from the same context, then re-derive the totals and explanation.
+        The other days are reused as they are.
+        """
+        booking_stats = self.get_booking_stats(hotel["hotel_id"])
+        base_staffing = self.calculate_base_staffing(hotel)
+        occupancy_factor = self.calculate_occupancy_factor(booking_stats, hotel["rooms"])
+        seasonal_factor = context["seasonal_factor"]
+        
+        forecast = list(staffing["forecast"])
+        for i, date_str in enumerate(context["dates"]):
+            if date_str in dates:
+                forecast[i] = self.build_staffing_day(hotel, date_str, base_staffing, occupancy_factor,
+                                                      context["weekend_factors"][i], seasonal_factor,
+                                                      self.get_event_day(hotel, date_str))
+        
+        last_event_factor = self.get_event_day(hotel, context["dates"][-1])[0]
+        return self.summarize_staffing(hotel, forecast, occupancy_factor, last_event_factor,
+                                       context["weekend_factors"][-1], seasonal_factor)
+    
+    def build_staffing_day(self, hotel, date_str, base_staffing, occupancy_factor, weekend_factor,
+                           seasonal_factor, event_day):
+        """One day of a hotel's staffing forecast, including its labor cost."""
+        event_factor, day_events = event_day
+        
+        # Daily variation in occupancy
+        daily_occupancy = occupancy_factor * self.rng_for(hotel["hotel_id"], date_str).uniform(0.9, 1.1)
+        
+        # Calculate staff for each department with slight random variation
+        daily_staffing = {}
+        for dept, base in base_staffing.items():
+            # Different departments are affected differently by factors
+            if dept == "front_desk":
+                factor = occupancy_factor * weekend_factor * event_factor * 1.05
+            elif dept == "housekeeping":
+                factor = daily_occupancy * 1.1
+            elif dept == "concierge":
+                factor = event_factor * weekend_factor * 1.2  # Increased from 1.1
+            elif dept == "restaurant":
+                factor = occupancy_factor * weekend_factor * event_factor * 1.2  # Added multiplier
+            else:  # maintenance
+                factor = seasonal_factor * 0.95
                 
-                # Ensure minimum staffing
-                if dept == "front_desk":
-                    staff = max(2, staff)
-                elif dept == "housekeeping":
-                    staff = max(5, staff)
-                elif dept == "maintenance":
-                    staff = max(2, staff)
-                    
-                daily_staffing[dept] = staff
+            # Calculate staff needed
+            staff = round(base * factor)
             
-            # Are there events on this day?
-            day_events = [e["name"] for e in nearby_events]
-            
-            forecast.append({
-                "date": date_str,
-                "staffing": daily_staffing,
-                "total_staff": sum(daily_staffing.values()),
-                "events": day_events
-            })
+            # Ensure minimum staffing
+            if dept == "front_desk":
+                staff = max(2, staff)
+            elif dept == "housekeeping":
+                staff = max(5, staff)
+            elif dept == "maintenance":
+                staff = max(2, staff)
+                
+            daily_staffing[dept] = staff
         
-        # Create staffing explanation
-        explanation = generate_staffing_explanation(hotel, occupancy_factor, event_factor, weekend_factor)
+        # Labor cost with dummy hourly rates and 8-hour shifts
+        daily_cost = sum(staff * HOURLY_RATES[dept] * 8 for dept, staff in daily_staffing.items())
         
-        # Calculate total costs with dummy hourly rates
-        hourly_rates = {
-            "front_desk": 18,
-            "housekeeping": 15,
-            "concierge": 22,
-            "restaurant": 17,
-            "maintenance": 20
+        return {
+            "date": date_str,
+            "staffing": daily_staffing,
+            "total_staff": sum(daily_staffing.values()),
+            "events": list(day_events),
+            "daily_cost": daily_cost
         }
+    
+    def summarize_staffing(self, hotel, forecast, occupancy_factor, event_factor, weekend_factor, seasonal_factor):
+        """Assemble the staffing response from its forecast days."""
+        stage_started = time.perf_counter()
+        
+        # Create staffing explanation
+        explanation = generate_staffing_explanation(hotel, occupancy_factor, event_factor, weekend_factor)
+        stage_started = record_stage("staffing", "generate_staffing_explanation", stage_started)
         
-        total_weekly_cost = 0
-        for day in forecast:
-            daily_cost = 0
-            for dept, staff in day["staffing"].items():
-                dept_cost = staff * hourly_rates[dept] * 8  # 8-hour shifts
-                daily_cost += dept_cost
-            day["daily_cost"] = daily_cost
-            total_weekly_cost += daily_cost
+        hourly_rates = dict(HOURLY_RATES)
+        total_weekly_cost = sum(day["daily_cost"] for day in forecast)
+        record_stage("staffing", "cost_rollup", stage_started)
             
         # Return comprehensive staffing data
         return {
-            "hotel_id": hotel_id,
+            "hotel_id": hotel["hotel_id"],
             "hotel_name": hotel["name"],
             "location": hotel["location"], 
             "rooms": hotel["rooms"],
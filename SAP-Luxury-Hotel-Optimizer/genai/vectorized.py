@@ -0,0 +1,276 @@
+from datetime import datetime, timedelta
+import numpy as np
+from genai.staffing import HOURLY_RATES, generate_staffing_explanation
+from store.geo import place_key
+
+# Department order of the last tensor axis
+DEPARTMENTS = ["front_desk", "housekeeping", "concierge", "restaurant", "maintenance"]
+
+# Per-department minimum staffing (concierge and restaurant have none)
+MINIMUM_STAFF = np.array([2, 5, 0, 0, 2], dtype=np.float64)
+
+HOURLY_RATE_VECTOR = np.array([HOURLY_RATES[d] for d in DEPARTMENTS], dtype=np.int64)
+
+class StaffingTensor:
+    """
+    Array-backed staffing forecast for many hotels. Staff counts are held in a
+    (hotels, days, departments) tensor so portfolio-wide totals can be taken
+    without building per-hotel dicts.
+    """
+    
+    def __init__(self, hotels, dates, staff, daily_cost, occupancy_factor,
+                 event_factor, weekend_factor, seasonal_factor, day_events):
+        self.hotels = hotels
+        self.dates = dates
+        self.staff = staff
+        self.daily_cost = daily_cost
+        self.occupancy_factor = occupancy_factor
+        self.event_factor = event_factor
+        self.weekend_factor = weekend_factor
+        self.seasonal_factor = seasonal_factor
+        self.day_events = day_events
+        
+    @property
+    def total_weekly_cost(self):
+        """Labor cost per hotel over the forecast window."""
+        return self.daily_cost.sum(axis=1)
+    
+    def to_dicts(self):
+        """Materialize the same per-hotel dicts as StaffingEngine.calculate_staffing."""
+        results = {}
+        staff = self.staff.tolist()
+        daily_cost = self.daily_cost.tolist()
+        weekly_cost = self.total_weekly_cost.tolist()
+        last_weekend = float(self.weekend_factor[-1])
+        
+        for h, hotel in enumerate(self.hotels):
+            occupancy_factor = float(self.occupancy_factor[h])
+            event_factor = float(self.event_factor[h, -1])
+            
+            forecast = []
+            for d, date_str in enumerate(self.dates):
+                daily_staffing = dict(zip(DEPARTMENTS, staff[h][d]))
+                forecast.append({
+                    "date": date_str,
+                    "staffing": daily_staffing,
+                    "total_staff": sum(staff[h][d]),
+                    "events": list(self.day_events[h][d]),
+                    "daily_cost": daily_cost[h][d]
+                })
+                
+            results[hotel.hotel_id] = {
+                "hotel_id": hotel.hotel_id,
+                "hotel_name": hotel.name,
+                "location": hotel.location,
+                "rooms": hotel.rooms,
+                "staffing_factors": {
+                    "occupancy_factor": round(occupancy_factor, 2),
+                    "event_factor": round(event_factor, 2),
+                    "weekend_factor": round(last_weekend, 2),
+                    "seasonal_factor": round(self.seasonal_factor, 2)
+                },
+                "forecast": forecast,
+                "total_weekly_cost": weekly_cost[h],
+                "hourly_rates": dict(HOURLY_RATES),
+                "explanation": generate_staffing_explanation(hotel, occupancy_factor, event_factor, last_weekend)
+            }
+        return results
+
+def base_staffing_matrix(rooms):
+    """Vectorized StaffingEngine.calculate_base_staffing: (hotels,) -> (hotels, departments)."""
+    rooms = np.asarray(rooms, dtype=np.float64)
+    # np.rint rounds half to even, exactly like the built-in round()
+    return np.stack([
+        np.maximum(2, np.rint(rooms / 100) + 1),
+        np.maximum(5, np.rint(rooms / 15)),
+        np.maximum(1, np.rint(rooms / 150)),
+        np.maximum(4, np.rint(rooms / 50)),
+        np.maximum(2, np.rint(rooms / 125))
+    ], axis=1)
+
+def occupancy_factor_vector(booking_counts, booking_totals, rooms):
+    """Vectorized StaffingEngine.calculate_occupancy_factor."""
+    counts = np.asarray(booking_counts, dtype=np.float64)
+    totals = np.asarray(booking_totals, dtype=np.float64)
+    rooms = np.asarray(rooms, dtype=np.float64)
+    
+    has_data = (counts > 0) & (rooms > 0)
+    avg_bookings = totals / np.where(counts > 0, counts, 1.0)
+    occupancy = np.minimum(1.0, avg_bookings / np.where(rooms > 0, rooms, 1.0))
+    return np.where(has_data, 0.7 + (0.6 * occupancy), 1.0)
+
+def compute_staffing_tensor(engine, hotels, date_str=None):
+    """
+    Compute the 7-day staffing forecast for a list of hotel dicts as array
+    operations over a (hotels, days, departments) tensor.
+    
+    Daily occupancy variation is drawn from the same per-(hotel, date)
+    streams as the scalar path, so both give identical results.
+    """
+    context = engine.build_forecast_context(date_str)
+    dates = context["dates"]
+    n_hotels, n_days = len(hotels), len(dates)
+    
+    rooms = np.array([h.rooms for h in hotels], dtype=np.float64)
+    base = base_staffing_matrix(rooms)
+    
+    # Occupancy factor per hotel from booking counts and totals
+    counts = np.zeros(n_hotels)
+    totals = np.zeros(n_hotels)
+    for i, hotel in enumerate(hotels):
+        booking_stats = engine.get_booking_stats(hotel.hotel_id)
+        if booking_stats:
+            counts[i], totals[i] = booking_stats.count, booking_stats.total
+    occupancy = occupancy_factor_vector(counts, totals, rooms)
+    
+    # Event factors are computed once per place (cached in the context) and gathered per hotel
+    event_days = [engine.get_event_days(hotel, context) for hotel in hotels]
+    event = np.array([[f for f, _ in days] for days in event_days], dtype=np.float64).reshape(n_hotels, n_days)
+    day_events = [[names for _, names in days] for days in event_days]
+    
+    weekend = np.array(context["weekend_factors"], dtype=np.float64)
+    seasonal = context["seasonal_factor"]
+    
+    # Same per-(hotel, date) streams as the scalar loop
+    variation = np.array([[engine.rng_for(h.hotel_id, d).uniform(0.9, 1.1) for d in dates] for h in hotels],
+                         dtype=np.float64).reshape(n_hotels, n_days)
+    
+    occ = occupancy[:, None]
+    wkd = weekend[None, :]
+    # Multiplication order matches the scalar expressions term for term
+    factors = np.stack([
+        occ * wkd * event * 1.05,
+        (occ * variation) * 1.1,
+        event * wkd * 1.2,
+        occ * wkd * event * 1.2,
+        np.full((n_hotels, n_days), seasonal * 0.95)
+    ], axis=2)
+    
+    staff = np.maximum(MINIMUM_STAFF, np.rint(base[:, None, :] * factors)).astype(np.int64)
+    
+    # Cost roll-up: 8-hour shifts at the department hourly rate
+    daily_cost = (staff * HOURLY_RATE_VECTOR * 8).sum(axis=2)
+    
+    return StaffingTensor(hotels, dates, staff, daily_cost, occupancy, event,
+                          weekend, seasonal, day_events)
+
+class PriceForecastMatrix:
+    """
+    Compact multi-hotel, multi-day price forecast. Prices are a float32
+    (hotels, days) matrix rounded to cents; the pricing factors are kept
+    alongside as arrays for inspection.
+    """
+    
+    def __init__(self, hotel_ids, dates, prices, season_factor, demand_factor,
+                 event_factor, competitor_factor, luxury_factor):
+        self.hotel_ids = hotel_ids
+        self.dates = dates
+        self.prices = prices
+        self.season_factor = season_factor
+        self.demand_factor = demand_factor
+        self.event_factor = event_factor
+        self.competitor_factor = competitor_factor
+        self.luxury_factor = luxury_factor
+        self._row = {hotel_id: i for i, hotel_id in enumerate(hotel_ids)}
+        
+    def forecast_for(self, hotel_id):
+        """Return one hotel's forecast in the generate_price_forecast format."""
+        h = self._row[hotel_id]
+        forecast = []
+        for d, date_str in enumerate(self.dates):
+            forecast.append({
+                "date": date_str,
+                "price": round(float(self.prices[h, d]), 2),
+                "factors": {
+                    "season_factor": round(float(self.season_factor[h, d]), 2),
+                    "demand_factor": round(float(self.demand_factor[h]), 2),
+                    "event_factor": round(float(self.event_factor[h, d]), 2),
+                    "competitor_factor": round(float(self.competitor_factor[h, d]), 2),
+                    "luxury_factor": round(float(self.luxury_factor[h]), 2)
+                }
+            })
+        return forecast
+
+def season_bounds(dates):
+    """Per-date (low, high) bounds of PricingEngine.calculate_season_factor."""
+    low = np.empty(len(dates))
+    high = np.empty(len(dates))
+    for i, date in enumerate(dates):
+        if date.month in [6, 7, 8]:
+            low[i], high[i] = 1.15, 1.3
+        elif date.month == 12 and date.day >= 15:
+            low[i], high[i] = 1.2, 1.35
+        elif date.month in [4, 5, 9, 10]:
+            low[i], high[i] = 1.0, 1.15
+        else:
+            low[i], high[i] = 0.85, 1.0
+    return low, high
+
+def compute_price_matrix(engine, hotel_ids, days=90, seed=None, start_date=None):
+    """
+    Compute a price forecast for many hotels over a horizon of days with
+    NumPy. Every factor of PricingEngine.calculate_price is evaluated as an
+    array and all random draws come from one batched generator call.
+    """
+    rng = np.random.default_rng(seed)
+    start = start_date or datetime.now()
+    dates = [start + timedelta(days=i) for i in range(days)]
+    date_strs = [d.strftime("%Y-%m-%d") for d in dates]
+    date_index = {d: i for i, d in enumerate(date_strs)}
+    n_hotels = len(hotel_ids)
+    
+    ratings = np.empty(n_hotels)
+    booking_counts = np.zeros(n_hotels)
+    booking_totals = np.zeros(n_hotels)
+    competitor_prices = np.zeros(n_hotels)
+    places = {}
+    place_index = np.full(n_hotels, -1, dtype=np.int64)
+    
+    for i, hotel_id in enumerate(hotel_ids):
+        hotel = engine.repository.get_hotel_details(hotel_id)
+        ratings[i] = hotel.rating if hotel else 4.0
+        booking_stats = engine.get_booking_stats(hotel_id)
+        if booking_stats:
+            booking_counts[i], booking_totals[i] = booking_stats.count, booking_stats.total
+        competitor_prices[i] = engine.get_competitor_price(hotel_id) or 0.0
+        if hotel:
+            # Hotels at the same place (location and coordinates) share their events row
+            place_index[i] = places.setdefault(place_key(hotel), (len(places), hotel))[0]
+    
+    base_price = 100 + (ratings * 40)
+    luxury = 1.0 + (ratings - 3.0) * 0.15
+    
+    # Demand: average bookings scaled to 0.8-1.5, neutral without bookings
+    avg_bookings = booking_totals / np.where(booking_counts > 0, booking_counts, 1.0)
+    demand = np.where(booking_counts > 0, 0.8 + np.minimum(avg_bookings / 50, 0.7), 1.0)
+    
+    # Events: fill (place, day) cells from the events near each place within the horizon
+    horizon = (date_strs[0], (start + timedelta(days=days)).strftime("%Y-%m-%d"))
+    place_event_factor = np.ones((len(places) + 1, days))
+    for row, hotel in places.values():
+        attendance = np.zeros(days)
+        for e in engine.repository.events_within(hotel, date_range=horizon):
+            attendance[date_index[e.date]] += e.expected_attendance
+        place_event_factor[row] = np.where(attendance > 0, 1.0 + np.minimum(attendance / 10000, 0.5), 1.0)
+    # Unknown hotels point at the trailing all-ones row
+    event = place_event_factor[place_index]
+    
+    # One batched draw for season, competitor and daily variation
+    uniforms = rng.random((3, n_hotels, days))
+    
+    low, high = season_bounds(dates)
+    season = low + (high - low) * uniforms[0]
+    
+    ratio = competitor_prices / base_price
+    comp_low = np.select([ratio > 1.1, ratio < 0.9], [1.05, 0.9], 0.95)
+    comp_high = np.select([ratio > 1.1, ratio < 0.9], [1.15, 0.98], 1.05)
+    competitor = comp_low[:, None] + (comp_high - comp_low)[:, None] * uniforms[1]
+    competitor = np.where(competitor_prices[:, None] > 0, competitor, 1.0)
+    
+    variation = 0.95 + 0.1 * uniforms[2]
+    
+    dynamic_price = np.round(base_price[:, None] * season * demand[:, None] * event * competitor * luxury[:, None], 2)
+    prices = np.round(dynamic_price * variation, 2).astype(np.float32)
+    
+    return PriceForecastMatrix(list(hotel_ids), date_strs, prices, season, demand,
+                               event, competitor, luxury)
@@ -0,0 +1,137 @@
+import argparse
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+# Engines built once per worker process, keyed by data directory
+_worker_state = {}
+
+def worker_state(data_dir):
+    """
+    Load the data and build the engines once per worker process. Bookings
+    and competitors come from the memory-mapped columnar export, so every
+    worker shares the same page-cache pages instead of unpickling its own
+    copy of the booking list.
+    """
+    if data_dir not in _worker_state:
+        from services.reload import AppState
+        from store.bootstrap import build_repository, load_data
+        _worker_state[data_dir] = AppState(build_repository(load_data(data_dir, "columnar")))
+    return _worker_state[data_dir]
+
+def forecast_shard(spec):
+    """
+    Forecast hotels [first, last) and write them straight into the run's
+    preallocated arrays. Runs in a worker process; only the spec and a small
+    report cross the process boundary. Every draw comes from the engines'
+    per-(hotel, date) streams, so results do not depend on the sharding.
+    """
+    from store.forecasts import open_forecast_arrays
+    started = time.perf_counter()
+    state = worker_state(spec["data_dir"])
+    hotels = state.repository.hotels[spec["first"]:spec["last"]]
+    start_date = datetime.strptime(spec["run_date"], "%Y-%m-%d")
+    arrays = open_forecast_arrays(spec["run_dir"], mode="r+")
+    
+    for offset, hotel in enumerate(hotels):
+        forecast = state.pricing_engine.generate_price_forecast(hotel.hotel_id, hotel.rating,
+                                                                spec["days"], start_date)
+        arrays["prices"][spec["first"] + offset] = [day["price"] for day in forecast]
+    
+    if hotels:
+        tensor = state.staffing_engine.calculate_staffing_tensor(hotels, spec["run_date"])
+        arrays["staffing"][spec["first"]:spec["last"]] = tensor.staff
+        arrays["staffing_cost"][spec["first"]:spec["last"]] = tensor.daily_cost
+    
+    for array in arrays.values():
+        array.flush()
+    return {"hotels": len(hotels), "seconds": time.perf_counter() - started}
+
+def run_nightly_forecast(data_dir, days=30, workers=None, shard_size=None, run_date=None):
+    """
+    Produce the pricing and staffing forecast for every hotel, sharded over a
+    process pool, and publish it under data_dir/forecasts for the API to
+    serve. Builds the columnar export first if it is missing. Returns a
+    report with hotel count, shards, elapsed time and hotels per second.
+    """
+    from genai.vectorized import DEPARTMENTS
+    from store.bootstrap import data_version, prepare_data, read_json
+    from store.forecasts import allocate_forecast, publish_forecast
+    
+    started = time.perf_counter()
+    prepare_data(data_dir, "columnar")
+    
+    run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+    start = datetime.strptime(run_date, "%Y-%m-%d")
+    price_dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    # The staffing forecast is always the 7-day window of StaffingEngine
+    staffing_dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    
+    hotels = read_json(data_dir, "hotels")
+    hotel_ids = [h["hotel_id"] for h in hotels]
+    workers = workers or os.cpu_count() or 1
+    # A few shards per worker keeps the pool busy when shards take uneven time
+    shard_size = shard_size or max(1, -(-len(hotels) // (workers * 4)))
+    
+    # Unique even for two runs started in the same second
+    run_id = f"{run_date}-{datetime.now().strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    run_dir = allocate_forecast(data_dir, run_id, hotel_ids, days, len(staffing_dates), DEPARTMENTS)
+    
+    specs = [{
+        "data_dir": data_dir,
+        "run_dir": run_dir,
+        "run_date": run_date,
+        "days": days,
+        "first": first,
+        "last": min(first + shard_size, len(hotels))
+    } for first in range(0, len(hotels), shard_size)]
+    
+    done = 0
+    
+    def record(shard_report):
+        nonlocal done
+        done += shard_report["hotels"]
+        elapsed = time.perf_counter() - started
+        print(f"{done}/{len(hotels)} hotels, {done / elapsed:,.0f} hotels/sec")
+    
+    if workers == 1:
+        for spec in specs:
+            record(forecast_shard(spec))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard_report in pool.map(forecast_shard, specs):
+                record(shard_report)
+    
+    elapsed = time.perf_counter() - started
+    report = {
+        "hotels": len(hotels),
+        "shards": len(specs),
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "hotels_per_sec": round(len(hotels) / elapsed) if elapsed else 0
+    }
+    publish_forecast(data_dir, run_id, dict(
+        report,
+        run_date=run_date,
+        data_version=data_version(data_dir),
+        departments=DEPARTMENTS,
+        price_dates=price_dates,
+        staffing_dates=staffing_dates,
+        created_at=datetime.now().isoformat(timespec="seconds")
+    ))
+    return dict(report, run_id=run_id)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the chain-wide pricing and staffing forecast")
+    parser.add_argument("data_dir", nargs="?", default="data")
+    parser.add_argument("--days", type=int, default=30, help="pricing forecast horizon in days")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--shard-size", type=int, default=None, help="hotels per shard")
+    parser.add_argument("--date", default=None, help="forecast start date, YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+    
+    report = run_nightly_forecast(args.data_dir, args.days, args.workers, args.shard_size, args.date)
+    print(f"Forecast {report['run_id']}: {report['hotels']} hotels in {report['seconds']} s "
+          f"({report['hotels_per_sec']:,} hotels/sec, {report['workers']} workers)")
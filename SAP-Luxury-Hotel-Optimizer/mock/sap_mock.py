@@ -1,10 +1,33 @@
+import argparse
 import json
+import math
+import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from store.geo import KM_PER_DEGREE
 
 fake = Faker()
 
+# Hotels and events are scattered within this distance of their city's centre
+CITY_RADIUS_KM = 5
+
+def city_centre(city):
+    """Stable (latitude, longitude) for a city name, the same in every run and shard."""
+    rng = random.Random(f"city:{city}")
+    return rng.uniform(-55, 70), rng.uniform(-180, 180)
+
+def coordinates_in(city, rng=random, radius_km=CITY_RADIUS_KM):
+    """Random coordinates within radius_km of a city's centre."""
+    latitude, longitude = city_centre(city)
+    distance = radius_km * math.sqrt(rng.random())
+    bearing = rng.uniform(0, 2 * math.pi)
+    latitude += distance * math.cos(bearing) / KM_PER_DEGREE
+    longitude += distance * math.sin(bearing) / (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    return {"latitude": round(latitude, 5), "longitude": round((longitude + 180) % 360 - 180, 5)}
+
 class SAPMockGenerator:
     def __init__(self):
         self.hotels = []
@@ -16,13 +39,16 @@ class SAPMockGenerator:
         """Generate mock hotel properties."""
         countries = ["USA", "France", "Germany", "Japan", "Australia"]
         for i in range(count):
+            name = f"{fake.company()} Hotel"
+            city = fake.city()
             hotel = {
                 "hotel_id": f"HOTEL{i+1:04d}",
-                "name": f"{fake.company()} Hotel",
-                "location": fake.city(),
+                "name": name,
+                "location": city,
                 "country": random.choice(countries),
                 "rooms": random.randint(50, 500),
-                "rating": round(random.uniform(3.0, 5.0), 1)
+                "rating": round(random.uniform(3.0, 5.0), 1),
+                **coordinates_in(city)
             }
             self.hotels.append(hotel)
         return self.hotels
@@ -43,16 +69,16 @@ class SAPMockGenerator:
         """Generate mock local events."""
         event_types = ["Conference", "Concert", "Festival", "Sports Event"]
         for _ in range(50):
-            today = datetime.now()
-            event_date = today + timedelta(days=random.randint(0, 6))  # 0-6 days from now
-            date_str = event_date.strftime("%Y-%m-%d")
-            # Create event with this date
+            # Events take place in the hotels' cities, somewhere around the centre
+            city = random.choice(self.hotels)["location"]
             event = {
-                "event_id": f"EVENT{random.randint(1000, 9999)}",
-                "name": f"{random.choice(event_types)} in {fake.city()}",
+                # Sequential, so ids stay unique across calls
+                "event_id": f"EVENT{len(self.events) + 1:04d}",
+                "name": f"{random.choice(event_types)} in {city}",
                 "date": fake.date_between(start_date="today", end_date="+30d").strftime("%Y-%m-%d"),
-                "location": fake.city(),
-                "expected_attendance": random.randint(500, 5000)
+                "location": city,
+                "expected_attendance": random.randint(500, 5000),
+                **coordinates_in(city)
             }
             self.events.append(event)
         return self.events
@@ -81,13 +107,223 @@ class SAPMockGenerator:
         with open(f"{base_path}/competitors.json", "w") as f:
             json.dump(self.competitors, f, indent=2)
 
+    def export_to_columnar(self, base_path="data"):
+        """Export bookings and competitors as memory-mappable column files."""
+        # NumPy is only needed for the columnar format
+        from store.bootstrap import source_version
+        from store.columnar import write_columnar
+        return write_columnar(base_path, self.hotels, self.bookings, self.competitors,
+                              source_version=source_version(base_path))
+
+def hotel_id_for(index, hotel_count):
+    """Hotel ids keep the HOTEL0001 style, widened for large portfolios."""
+    return f"HOTEL{index + 1:0{max(4, len(str(hotel_count)))}d}"
+
+def generate_shard(spec):
+    """
+    Generate one shard of hotels [first, last) and stream it to disk in
+    chunks. Runs in a worker process; every draw comes from generators seeded
+    by (seed, shard), so a shard's output does not depend on which worker or
+    in which order it runs. Returns row counts for the report.
+    """
+    shard = spec["shard"]
+    days = spec["days"]
+    shard_seed = f"{spec['seed']}:{shard}"
+    rng = random.Random(shard_seed)
+    shard_fake = Faker()
+    shard_fake.seed_instance(shard_seed)
+    
+    countries = ["USA", "France", "Germany", "Japan", "Australia"]
+    event_types = ["Conference", "Concert", "Festival", "Sports Event"]
+    start = date.fromisoformat(spec["start_date"])
+    date_strs = [(start + timedelta(days=d)).isoformat() for d in range(days)]
+    out_dir = spec["out_dir"]
+    columnar = spec["format"] == "columnar"
+    
+    hotels = []
+    for i in range(spec["first"], spec["last"]):
+        name = f"{shard_fake.company()} Hotel"
+        city = shard_fake.city()
+        hotels.append({
+            "hotel_id": hotel_id_for(i, spec["hotel_count"]),
+            "name": name,
+            "location": city,
+            "country": rng.choice(countries),
+            "rooms": rng.randint(50, 500),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            **coordinates_in(city, rng)
+        })
+    
+    # Events land in this shard's cities within the forecast horizon
+    events = []
+    for n in range(max(1, round(len(hotels) * spec["events_per_hotel"]))):
+        city = rng.choice(hotels)["location"]
+        events.append({
+            "event_id": f"EVENT{shard:04d}{n:04d}",
+            "name": f"{rng.choice(event_types)} in {city}",
+            "date": rng.choice(date_strs),
+            "location": city,
+            "expected_attendance": rng.randint(500, 5000),
+            **coordinates_in(city, rng)
+        })
+    competitors = [{"hotel_id": h["hotel_id"], "competitor_price": round(rng.uniform(80, 500), 2)} for h in hotels]
+    
+    shard_name = f"{shard:05d}"
+    write_jsonl(os.path.join(out_dir, f"hotels-{shard_name}.jsonl"), hotels)
+    write_jsonl(os.path.join(out_dir, f"events-{shard_name}.jsonl"), events)
+    
+    # One booking row per hotel per day, flushed every chunk_size rows
+    hotels_per_chunk = max(1, spec["chunk_size"] // days)
+    if columnar:
+        import numpy as np
+        from store.columnar import open_columns
+        columns = open_columns(out_dir)
+        day_offsets = np.datetime64(spec["start_date"]) + np.arange(days)
+        for chunk_start in range(0, len(hotels), hotels_per_chunk):
+            chunk = hotels[chunk_start:chunk_start + hotels_per_chunk]
+            first_code = spec["first"] + chunk_start
+            row_start, row_end = first_code * days, (first_code + len(chunk)) * days
+            columns["bookings_hotel"][row_start:row_end] = np.repeat(np.arange(first_code, first_code + len(chunk)), days)
+            columns["bookings_date"][row_start:row_end] = np.tile(day_offsets, len(chunk))
+            columns["bookings_count"][row_start:row_end] = [rng.randint(10, h["rooms"] // 2) for h in chunk for _ in range(days)]
+        columns["competitors_hotel"][spec["first"]:spec["last"]] = np.arange(spec["first"], spec["last"])
+        columns["competitors_price"][spec["first"]:spec["last"]] = [c["competitor_price"] for c in competitors]
+        for column in columns.values():
+            column.flush()
+    else:
+        write_jsonl(os.path.join(out_dir, f"competitors-{shard_name}.jsonl"), competitors)
+        with open(os.path.join(out_dir, f"bookings-{shard_name}.jsonl"), "w") as f:
+            for chunk_start in range(0, len(hotels), hotels_per_chunk):
+                lines = []
+                for h in hotels[chunk_start:chunk_start + hotels_per_chunk]:
+                    for date_str in date_strs:
+                        lines.append(json.dumps({
+                            "hotel_id": h["hotel_id"],
+                            "date": date_str,
+                            "bookings": rng.randint(10, h["rooms"] // 2)
+                        }))
+                f.write("\n".join(lines) + "\n")
+    
+    return {
+        "hotels": len(hotels),
+        "bookings": len(hotels) * days,
+        "events": len(events),
+        "competitors": len(competitors)
+    }
+
+def write_jsonl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+def merge_jsonl_to_json(paths, out_path):
+    """Stream JSONL shard files into one JSON array without loading them."""
+    with open(out_path, "w") as out:
+        out.write("[")
+        first = True
+        for path in paths:
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        out.write(line if first else "," + line)
+                        first = False
+        out.write("]")
+
+def stream_to_disk(out_dir, hotel_count=50000, days=365, seed=0, fmt="jsonl", workers=None,
+                   shard_size=1000, chunk_size=50000, events_per_hotel=50 / 300, start_date=None):
+    """
+    Generate a large mock dataset shard by shard, writing each chunk to disk
+    as it is produced so peak memory depends on shard_size and chunk_size,
+    not on the dataset size. Shards fan out across a process pool.
+    
+    fmt="jsonl" writes per-shard JSONL files. fmt="columnar" fills the
+    columnar bookings/competitors export directly and merges hotels and
+    events into hotels.json/events.json, so the result loads in the app.
+    Returns a report with row counts, elapsed time and rows per second.
+    """
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    start_date = start_date or datetime.now().strftime("%Y-%m-%d")
+    
+    if fmt == "columnar":
+        from store.columnar import allocate_columnar
+        hotel_ids = [hotel_id_for(i, hotel_count) for i in range(hotel_count)]
+        allocate_columnar(out_dir, hotel_ids, hotel_count * days, hotel_count)
+    
+    specs = [{
+        "shard": shard,
+        "first": first,
+        "last": min(first + shard_size, hotel_count),
+        "hotel_count": hotel_count,
+        "days": days,
+        "seed": seed,
+        "format": fmt,
+        "out_dir": out_dir,
+        "chunk_size": chunk_size,
+        "events_per_hotel": events_per_hotel,
+        "start_date": start_date
+    } for shard, first in enumerate(range(0, hotel_count, shard_size))]
+    
+    totals = {"hotels": 0, "bookings": 0, "events": 0, "competitors": 0}
+    
+    def record(shard_counts):
+        for key, value in shard_counts.items():
+            totals[key] += value
+        rows = sum(totals.values())
+        elapsed = time.perf_counter() - started
+        print(f"{totals['hotels']}/{hotel_count} hotels, {rows} rows, {rows / elapsed:,.0f} rows/sec")
+    
+    if workers == 1:
+        for spec in specs:
+            record(generate_shard(spec))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard_counts in pool.map(generate_shard, specs):
+                record(shard_counts)
+    
+    shard_names = [f"{spec['shard']:05d}" for spec in specs]
+    if fmt == "columnar":
+        from store.bootstrap import source_version
+        from store.columnar import write_meta
+        for name in ["hotels", "events"]:
+            paths = [os.path.join(out_dir, f"{name}-{shard}.jsonl") for shard in shard_names]
+            merge_jsonl_to_json(paths, os.path.join(out_dir, f"{name}.json"))
+            for path in paths:
+                os.remove(path)
+        write_meta(os.path.join(out_dir, "columnar"), hotel_count, totals["bookings"], totals["competitors"],
+                   source_version(out_dir))
+    
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    report = dict(totals, shards=len(specs), seconds=round(elapsed, 3), rows_per_sec=round(rows / elapsed))
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(dict(report, format=fmt, seed=seed, days=days, start_date=start_date), f)
+    return report
+
 # For standalone execution.
 if __name__ == "__main__":
-    generator = SAPMockGenerator()
-    generator.generate_hotels()
-    generator.generate_bookings()
-    generator.generate_events()
-    generator.generate_competitors()
-    generator.export_to_json()
-    print("Mock data generated successfully!")
+    parser = argparse.ArgumentParser(description="Generate mock SAP hotel data")
+    parser.add_argument("--stream", action="store_true", help="stream a large dataset to disk in shards")
+    parser.add_argument("--out", default="data")
+    parser.add_argument("--hotels", type=int, default=None)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["jsonl", "columnar"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    if args.stream:
+        report = stream_to_disk(args.out, args.hotels or 50000, args.days, args.seed, args.format,
+                                args.workers, args.shard_size)
+        print(f"Streamed {report['bookings']} bookings in {report['seconds']} s ({report['rows_per_sec']:,} rows/sec)")
+    else:
+        generator = SAPMockGenerator()
+        generator.generate_hotels(args.hotels or 300)
+        generator.generate_bookings()
+        generator.generate_events()
+        generator.generate_competitors()
+        generator.export_to_json(args.out)
+        print("Mock data generated successfully!")
 
@@ -0,0 +1,212 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    In-process LRU cache with a per-entry time-to-live and a size bound.
+    Thread-safe; counts hits, misses, evictions and expirations.
+    """
+    
+    def __init__(self, maxsize=1024, ttl=300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+    def get(self, key):
+        """Return (True, value) on a hit or (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+    
+    def set(self, key, value):
+        """Store a value, evicting least recently used entries past maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class SQLiteSharedStore:
+    """
+    Cache store in a local SQLite file so every worker process on the host
+    can reuse entries computed by the others. Values are stored as JSON.
+    """
+    
+    # Expired and overflow rows are pruned every this many writes
+    PRUNE_EVERY = 100
+    
+    def __init__(self, path, maxsize=10000, ttl=300):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        
+    def _connection(self):
+        # SQLite connections must not be shared across threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+    
+    def get(self, key):
+        """Return (True, value) on a hit or (False, None) on a miss."""
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, json.loads(row[0])
+    
+    def set(self, key, value):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + self.ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+    
+    def prune(self):
+        """Drop expired rows and trim the oldest rows beyond maxsize."""
+        connection = self._connection()
+        connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        overflow = connection.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+        self.evictions += max(overflow.rowcount, 0)
+    
+    def delete_prefix(self, prefix):
+        """Delete every entry whose key starts with prefix."""
+        self._connection().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+    
+    def clear(self):
+        self._connection().execute("DELETE FROM cache")
+    
+    def stats(self):
+        size = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            "path": self.path,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class ResponseCache:
+    """
+    Two-level cache for API responses: an in-process TTLCache in front of an
+    optional shared store. Keys include the data version, so entries computed
+    from older data are never served after a reload.
+    """
+    
+    def __init__(self, local, shared=None, version=""):
+        self.local = local
+        self.shared = shared
+        self.version = version
+        self.invalidations = 0
+        
+    def make_key(self, namespace, *parts, version=None):
+        return ":".join([version or self.version, namespace] + [str(p) for p in parts])
+    
+    def get_or_compute(self, namespace, parts, compute, version=None):
+        """
+        Return the cached value for (namespace, *parts) or compute and store
+        it. Pass the version of the data compute reads; otherwise a reload
+        between the lookup and the store would file old data under the new
+        version.
+        """
+        key = self.make_key(namespace, *parts, version=version)
+        
+        hit, value = self.local.get(key)
+        if hit:
+            return value
+        
+        if self.shared is not None:
+            hit, value = self.shared.get(key)
+            if hit:
+                self.local.set(key, value)
+                return value
+        
+        value = compute()
+        # None (e.g. unknown hotel) is not worth caching
+        if value is not None:
+            self.local.set(key, value)
+            if self.shared is not None:
+                self.shared.set(key, value)
+        return value
+    
+    def invalidate(self, version=None):
+        """Drop local entries and shared ones of the current version, switching to a new version if given."""
+        previous = self.version
+        if version is not None:
+            self.version = version
+        self.local.clear()
+        if self.shared is not None and self.version != previous:
+            # Only the version this worker leaves; other versions in use elsewhere expire by TTL
+            self.shared.delete_prefix(previous + ":")
+        self.invalidations += 1
+    
+    def stats(self):
+        stats = {
+            "version": self.version,
+            "invalidations": self.invalidations,
+            "local": self.local.stats()
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
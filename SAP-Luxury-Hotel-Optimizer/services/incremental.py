@@ -0,0 +1,241 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from store.records import Booking, Competitor, Event, as_records
+
+# Price forecast horizon of the materialized forecasts, as in the nightly job
+PRICE_DAYS = 30
+
+ENGINES = ("pricing", "staffing")
+
+# Hotels whose forecasts a MaterializedForecasts keeps, least recently used
+# first out; about 10 KB each. 0 keeps none, so every read computes.
+FORECAST_MEMO_SIZE = int(os.environ.get("HOTEL_OPTIMIZER_FORECAST_MEMO_SIZE", 4096))
+
+# Marks every date of a hotel as affected
+ALL_DATES = None
+
+def mark(cells, hotel_id, date=ALL_DATES):
+    """Add one (hotel_id, date) cell, or every cell of the hotel, to a cell map."""
+    if date is ALL_DATES:
+        cells[hotel_id] = ALL_DATES
+    elif cells.get(hotel_id, set()) is not ALL_DATES:
+        cells.setdefault(hotel_id, set()).add(date)
+
+def affected_cells(repository, bookings=(), events=(), competitors=()):
+    """
+    Map changed input rows to the forecast cells that read them. Returns
+    (pricing_cells, staffing_cells), each {hotel_id: set of dates or
+    ALL_DATES}. repository is the snapshot before the change.
+    
+    booking for a hotel         -> every cell of that hotel (booking aggregates)
+    event on a date             -> that date's cell of every hotel near the event
+    competitor row for a hotel  -> every pricing cell of that hotel
+    
+    An event replacing one with the same event_id also affects the cells
+    the old event fed.
+    """
+    bookings = as_records(Booking, list(bookings))
+    events = as_records(Event, list(events))
+    competitors = as_records(Competitor, list(competitors))
+    pricing, staffing = {}, {}
+    
+    for b in bookings:
+        mark(pricing, b.hotel_id)
+        mark(staffing, b.hotel_id)
+    
+    replaced_ids = {e.event_id for e in events if e.event_id}
+    replaced = [e for e in repository.events if e.event_id in replaced_ids] if replaced_ids else []
+    for e in events + replaced:
+        for hotel in repository.hotels_near(e):
+            mark(pricing, hotel.hotel_id, e.date)
+            mark(staffing, hotel.hotel_id, e.date)
+    
+    for c in competitors:
+        mark(pricing, c.hotel_id)
+    return pricing, staffing
+
+class ForecastCounters:
+    """
+    Cell counts shared by successive MaterializedForecasts: cells computed
+    on first read, recomputed after an input change, and reused unchanged
+    when a new snapshot was derived.
+    """
+    
+    def __init__(self):
+        self.cells = {engine: {"computed": 0, "recomputed": 0, "reused": 0} for engine in ENGINES}
+        self.updates = 0
+        self.last_update = None
+        self._lock = threading.Lock()
+    
+    def add(self, engine, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self.cells[engine][name] += count
+    
+    def record_update(self, report):
+        with self._lock:
+            for engine in ENGINES:
+                for name in ("recomputed", "reused"):
+                    self.cells[engine][name] += report[engine][name]
+            self.updates += 1
+            self.last_update = report
+    
+    def as_dict(self):
+        with self._lock:
+            return {
+                "cells": {engine: dict(counts) for engine, counts in self.cells.items()},
+                "updates": self.updates,
+                "last_update": self.last_update
+            }
+
+class MaterializedForecasts:
+    """
+    PricingEngine price forecasts and StaffingEngine staffing forecasts for
+    one start date, kept per hotel as (hotel, date) cells. A hotel's cells
+    are computed on first read and kept for the memo_size most recently
+    read hotels. A snapshot derived with deltas gets a new instance from
+    updated(), which carries every kept cell over and recomputes only the
+    cells affected_cells() maps the changes to.
+    
+    Readers get copies, so the kept cells cannot be changed from outside.
+    """
+    
+    def __init__(self, state, start_date, counters=None, price_days=PRICE_DAYS, memo_size=FORECAST_MEMO_SIZE):
+        self.state = state
+        self.start_date = start_date
+        self.price_days = price_days
+        self.memo_size = memo_size
+        self.counters = counters or ForecastCounters()
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        self.price_dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(price_days)]
+        self.context = state.staffing_engine.build_forecast_context(start_date)
+        # hotel_id -> price forecast days, hotel_id -> staffing forecast, least recently read first
+        self._prices = OrderedDict()
+        self._staffing = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _recall(self, memo, hotel_id):
+        with self._lock:
+            value = memo.get(hotel_id)
+            if value is not None:
+                memo.move_to_end(hotel_id)
+            return value
+    
+    def _remember(self, memo, hotel_id, value):
+        if self.memo_size <= 0:
+            return
+        with self._lock:
+            memo[hotel_id] = value
+            memo.move_to_end(hotel_id)
+            while len(memo) > self.memo_size:
+                memo.popitem(last=False)
+    
+    def _price_cells(self, hotel_id):
+        cells = self._recall(self._prices, hotel_id)
+        if cells is None:
+            hotel = self.state.repository.get_hotel_details(hotel_id)
+            if not hotel:
+                return None
+            engine = self.state.pricing_engine
+            cells = [engine.forecast_day(hotel_id, hotel.rating, date) for date in self.price_dates]
+            self._remember(self._prices, hotel_id, cells)
+            self.counters.add("pricing", computed=len(cells))
+        return cells
+    
+    def _staffing_forecast(self, hotel_id):
+        staffing = self._recall(self._staffing, hotel_id)
+        if staffing is None:
+            hotel = self.state.repository.get_hotel_details(hotel_id)
+            if not hotel:
+                return None
+            staffing = self.state.staffing_engine.build_staffing(hotel, self.context)
+            self._remember(self._staffing, hotel_id, staffing)
+            self.counters.add("staffing", computed=len(staffing["forecast"]))
+        return staffing
+    
+    def prices(self, hotel_id):
+        """A hotel's price forecast days, or None for an unknown hotel."""
+        return copy.deepcopy(self._price_cells(hotel_id))
+    
+    def staffing(self, hotel_id):
+        """A hotel's staffing forecast, as StaffingEngine.calculate_staffing returns it, or None."""
+        return copy.deepcopy(self._staffing_forecast(hotel_id))
+    
+    def forecast(self, hotel_id):
+        """Price and staffing forecast in the shape of PrecomputedForecast.get, or None."""
+        prices = self._price_cells(hotel_id)
+        staffing = self._staffing_forecast(hotel_id)
+        if prices is None or staffing is None:
+            return None
+        return {
+            "hotel_id": hotel_id,
+            "run_date": self.start_date,
+            "price_forecast": [{"date": day["date"], "price": day["price"]} for day in prices],
+            "staffing_forecast": [{
+                "date": day["date"],
+                "staffing": dict(day["staffing"]),
+                "total_staff": day["total_staff"],
+                "daily_cost": day["daily_cost"]
+            } for day in staffing["forecast"]],
+            "total_weekly_cost": staffing["total_weekly_cost"]
+        }
+    
+    def updated(self, state, pricing_cells, staffing_cells):
+        """
+        Materialized forecasts for state, derived from this one: cells
+        outside pricing_cells/staffing_cells are shared, affected cells of
+        hotels materialized so far are recomputed against state. Hotels not
+        materialized yet stay lazy.
+        """
+        forecasts = MaterializedForecasts(state, self.start_date, self.counters, self.price_days, self.memo_size)
+        with self._lock:
+            prices, staffing = OrderedDict(self._prices), OrderedDict(self._staffing)
+        pricing_engine, staffing_engine = state.pricing_engine, state.staffing_engine
+        
+        recomputed_prices = 0
+        for hotel_id, dates in pricing_cells.items():
+            cells = prices.get(hotel_id)
+            if cells is None:
+                continue
+            hotel = state.repository.get_hotel_details(hotel_id)
+            cells = list(cells)
+            for i, date in enumerate(forecasts.price_dates):
+                if dates is ALL_DATES or date in dates:
+                    cells[i] = pricing_engine.forecast_day(hotel_id, hotel.rating, date)
+                    recomputed_prices += 1
+            prices[hotel_id] = cells
+        
+        recomputed_staffing = 0
+        staffing_dates = forecasts.context["dates"]
+        for hotel_id, dates in staffing_cells.items():
+            if hotel_id not in staffing:
+                continue
+            hotel = state.repository.get_hotel_details(hotel_id)
+            if dates is ALL_DATES:
+                staffing[hotel_id] = staffing_engine.build_staffing(hotel, forecasts.context)
+                recomputed_staffing += len(staffing_dates)
+                continue
+            dates = [date for date in staffing_dates if date in dates]
+            if dates:
+                staffing[hotel_id] = staffing_engine.rebuild_staffing_days(hotel, staffing[hotel_id], dates,
+                                                                           forecasts.context)
+                recomputed_staffing += len(dates)
+        
+        forecasts._prices, forecasts._staffing = prices, staffing
+        self.counters.record_update({
+            "hotels_affected": len(set(pricing_cells) | set(staffing_cells)),
+            "pricing": {"recomputed": recomputed_prices,
+                        "reused": len(prices) * self.price_days - recomputed_prices},
+            "staffing": {"recomputed": recomputed_staffing,
+                         "reused": len(staffing) * len(staffing_dates) - recomputed_staffing}
+        })
+        return forecasts
+    
+    def stats(self):
+        return dict(self.counters.as_dict(),
+                    start_date=self.start_date,
+                    memo_size=self.memo_size,
+                    materialized_hotels={"pricing": len(self._prices), "staffing": len(self._staffing)})
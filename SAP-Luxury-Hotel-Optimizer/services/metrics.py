@@ -0,0 +1,137 @@
+import threading
+import time
+
+# Latency buckets in seconds, tuned for sub-millisecond engine stages
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def format_labels(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+class Counter:
+    """Monotonic counter with optional labels."""
+    
+    kind = "counter"
+    
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self):
+        lines = []
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [bucket counts..., count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+        
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+    
+    def render(self):
+        lines = []
+        for key, state in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, state):
+                labels = format_labels(self.labelnames + ("le",), key + (repr(bound),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {state[-2]}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {state[-2]}")
+            lines.append(f"{self.name}_sum{labels} {state[-1]}")
+        return lines
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+    
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+    
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+    
+    def register_collector(self, collect):
+        """Register a callable returning (name, help_text, kind, {labels: value}) tuples at scrape time."""
+        self._collectors.append(collect)
+        
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, help_text, kind, samples in collect():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples.items():
+                    lines.append(f"{name}{format_labels([k for k, _ in labels], [v for _, v in labels])} {value}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "hotel_optimizer_stage_seconds",
+    "Time spent in pricing/staffing engine stages",
+    ["engine", "stage"]
+)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "hotel_optimizer_request_seconds",
+    "HTTP request latency by endpoint",
+    ["endpoint"]
+)
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "hotel_optimizer_requests_total",
+    "HTTP requests by endpoint and status code",
+    ["endpoint", "status"]
+)
+
+def record_stage(engine, stage, started):
+    """
+    Record the time since started for an engine stage and return the current
+    time, so consecutive stages can be chained without re-indenting code.
+    """
+    now = time.perf_counter()
+    STAGE_SECONDS.observe(now - started, engine=engine, stage=stage)
+    return now
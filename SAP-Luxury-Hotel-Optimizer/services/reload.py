@@ -0,0 +1,240 @@
+import json
+import math
+import os
+import threading
+from datetime import datetime
+from genai.pricing import PricingEngine
+from genai.staffing import StaffingEngine
+from services.incremental import ForecastCounters, MaterializedForecasts, affected_cells
+from store.bootstrap import build_repository, data_version, load_data
+
+# Delta files dropped here are applied on the next poll, in file name order
+DELTA_DIR = "deltas"
+
+def is_text(value):
+    return isinstance(value, str) and bool(value)
+
+def is_date(value):
+    """An ISO YYYY-MM-DD date string; the indexes compare dates as strings."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d") == value
+    except (TypeError, ValueError):
+        return False
+
+def is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def is_amount(value):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value) and value >= 0)
+
+def is_latitude(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and -90 <= value <= 90
+
+def is_longitude(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and -180 <= value <= 180
+
+# field -> (required, check, expectation) for each kind of delta row
+BOOKING_FIELDS = {
+    "hotel_id": (True, is_text, "a non-empty string"),
+    "date": (True, is_date, "a YYYY-MM-DD date"),
+    "bookings": (True, is_count, "an integer >= 0")
+}
+EVENT_FIELDS = {
+    "event_id": (True, is_text, "a non-empty string"),
+    "name": (True, is_text, "a non-empty string"),
+    "date": (True, is_date, "a YYYY-MM-DD date"),
+    "location": (True, is_text, "a non-empty string"),
+    "expected_attendance": (False, is_count, "an integer >= 0"),
+    "latitude": (False, is_latitude, "a number between -90 and 90"),
+    "longitude": (False, is_longitude, "a number between -180 and 180")
+}
+COMPETITOR_FIELDS = {
+    "hotel_id": (True, is_text, "a non-empty string"),
+    "competitor_price": (True, is_amount, "a number >= 0")
+}
+
+def validate_delta(bookings, events, competitors=()):
+    """Raise ValueError if a delta row is missing a required field or has a field of the wrong type."""
+    for kind, rows, fields in (("booking", bookings, BOOKING_FIELDS), ("event", events, EVENT_FIELDS),
+                               ("competitor", competitors, COMPETITOR_FIELDS)):
+        for row in rows:
+            if not isinstance(row, dict):
+                raise ValueError(f"{kind} delta row must be an object")
+            missing = [f for f, (required, _, _) in fields.items() if required and f not in row]
+            if missing:
+                raise ValueError(f"{kind} delta row is missing {', '.join(missing)}")
+            for field, (required, check, expectation) in fields.items():
+                # Optional fields may be left out or null
+                if field in row and (required or row[field] is not None) and not check(row[field]):
+                    raise ValueError(f"{kind} delta field {field} must be {expectation}, got {row[field]!r}")
+
+class AppState:
+    """
+    One consistent view of the data: a repository snapshot and the engines
+    bound to it. The data is never mutated; a reload builds a new AppState
+    and swaps it in, so a request that grabbed the old one keeps a
+    consistent snapshot.
+    
+    The one thing that changes is the materialized forecasts for the
+    snapshot, created on first use each day under a lock. with_changes()
+    carries them into the next state, recomputing only the cells a delta
+    affects.
+    """
+    
+    def __init__(self, repository, forecast_counters=None):
+        self.repository = repository
+        self.version = repository.version
+        self.pricing_engine = PricingEngine(repository.bookings, repository.competitors, repository.events,
+                                            repository=repository)
+        self.staffing_engine = StaffingEngine(repository.bookings, repository.hotels, repository.events,
+                                              repository=repository)
+        self.forecast_counters = forecast_counters or ForecastCounters()
+        self.forecasts = None
+        self._forecasts_lock = threading.Lock()
+    
+    def current_forecasts(self):
+        """Materialized forecasts starting today; a new day starts from scratch."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        forecasts = self.forecasts
+        if forecasts is not None and forecasts.start_date == today:
+            return forecasts
+        # Concurrent first reads share one instance
+        with self._forecasts_lock:
+            if self.forecasts is None or self.forecasts.start_date != today:
+                self.forecasts = MaterializedForecasts(self, today, self.forecast_counters)
+            return self.forecasts
+    
+    def with_changes(self, bookings=(), events=(), competitors=()):
+        """
+        New state with the deltas merged in. Materialized forecasts are
+        derived from this state's, recomputing only the affected cells.
+        """
+        pricing_cells, staffing_cells = affected_cells(self.repository, bookings, events, competitors)
+        repository = self.repository.with_changes(bookings=bookings, events=events, competitors=competitors)
+        state = AppState(repository, self.forecast_counters)
+        with self._forecasts_lock:
+            forecasts = self.forecasts
+        if forecasts is not None and forecasts.start_date == datetime.now().strftime("%Y-%m-%d"):
+            state.forecasts = forecasts.updated(state, pricing_cells, staffing_cells)
+        return state
+
+class DataReloader:
+    """
+    Owns the current AppState and replaces it without restarting workers.
+    
+    Small changes arrive as deltas (new or changed bookings, new events,
+    competitor prices), either posted directly or as JSON files in
+    <data_dir>/deltas, and are applied to the in-memory indexes
+    copy-on-write. Only if the base data
+    files themselves change is everything re-read from disk.
+    """
+    
+    def __init__(self, data_dir, data_format, state, on_swap=None):
+        self.data_dir = data_dir
+        self.data_format = data_format
+        self.state = state
+        self.on_swap = on_swap
+        self.base_version = state.version.split("+")[0]
+        self.full_reloads = 0
+        self.deltas_applied = 0
+        self._applied_files = set()
+        # Delta files that could not be read or applied: name -> error; skipped by later polls
+        self._failed_files = {}
+        self._lock = threading.RLock()
+        self._watcher = None
+        
+    def _swap(self, state):
+        # A single attribute assignment, so readers see the old or new state, never a mix
+        self.state = state
+        if self.on_swap:
+            self.on_swap(state)
+    
+    def apply_delta(self, bookings=(), events=(), competitors=()):
+        """Apply booking/event/competitor deltas and swap in the new state."""
+        validate_delta(bookings, events, competitors)
+        with self._lock:
+            self._swap(self.state.with_changes(bookings, events, competitors))
+            self.deltas_applied += 1
+            return self.state
+    
+    def reload(self):
+        """Re-read every data file from disk and swap in the new state."""
+        with self._lock:
+            dataset = load_data(self.data_dir, self.data_format)
+            self._swap(AppState(build_repository(dataset), self.state.forecast_counters))
+            self.base_version = dataset["version"]
+            self._applied_files = set()
+            self._failed_files = {}
+            self.full_reloads += 1
+            return self.state
+    
+    def pending_delta_files(self):
+        delta_dir = os.path.join(self.data_dir, DELTA_DIR)
+        if not os.path.isdir(delta_dir):
+            return []
+        names = sorted(n for n in os.listdir(delta_dir) if n.endswith(".json"))
+        return [os.path.join(delta_dir, n) for n in names
+                if n not in self._applied_files and n not in self._failed_files]
+    
+    def apply_delta_file(self, path):
+        with open(path) as f:
+            delta = json.load(f)
+        if not isinstance(delta, dict):
+            raise ValueError("delta file must hold a JSON object")
+        rows = [delta.get(kind, []) for kind in ("bookings", "events", "competitors")]
+        if not all(isinstance(r, list) for r in rows):
+            raise ValueError("bookings, events and competitors must be lists")
+        self.apply_delta(*rows)
+    
+    def poll(self):
+        """
+        Check the data directory: fully reload if the base files changed, then
+        apply any delta files not applied yet. A file that cannot be applied is
+        set aside so the files after it still are. Returns what was done.
+        """
+        with self._lock:
+            full_reload = data_version(self.data_dir) != self.base_version
+            if full_reload:
+                self.reload()
+            
+            applied = []
+            failed = {}
+            for path in self.pending_delta_files():
+                name = os.path.basename(path)
+                try:
+                    self.apply_delta_file(path)
+                except (ValueError, AttributeError, OSError) as e:
+                    failed[name] = self._failed_files[name] = str(e)
+                    continue
+                self._applied_files.add(name)
+                applied.append(name)
+            return {"full_reload": full_reload, "delta_files": applied, "delta_files_failed": failed,
+                    "version": self.state.version}
+    
+    def watch(self, interval):
+        """Poll the data directory every interval seconds on a daemon thread."""
+        if self._watcher is not None:
+            return
+        stop = threading.Event()
+        
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Data reload failed: {e}")
+        
+        self._watcher = threading.Thread(target=run, name="data-reloader", daemon=True)
+        self._watcher.stop = stop
+        self._watcher.start()
+    
+    def stats(self):
+        return {
+            "version": self.state.version,
+            "base_version": self.base_version,
+            "full_reloads": self.full_reloads,
+            "deltas_applied": self.deltas_applied,
+            "delta_files_applied": sorted(self._applied_files),
+            "delta_files_failed": dict(sorted(self._failed_files.items()))
+        }
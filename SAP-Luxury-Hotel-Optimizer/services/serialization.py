@@ -0,0 +1,181 @@
+import gzip
+import json
+import os
+from flask.json.provider import JSONProvider
+
+# Preferred fast backends, tried in order; HOTEL_OPTIMIZER_JSON_BACKEND forces one
+JSON_BACKENDS = ["orjson", "ujson", "json"]
+
+def to_builtin(value):
+    """Fallback for types the encoders do not know, e.g. records and NumPy scalars and arrays."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def load_backend(name=None):
+    """
+    Return (name, dumps, loads) for the first importable backend. dumps
+    returns compact UTF-8 bytes. orjson and ujson are optional; the
+    standard library is always available.
+    """
+    names = [name] if name else JSON_BACKENDS
+    for candidate in names:
+        if candidate == "orjson":
+            try:
+                import orjson
+            except ImportError:
+                continue
+            # Records are slotted dataclasses; pass them to to_builtin so they
+            # serialize through to_dict (which drops unset optional fields)
+            options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+            
+            def dumps(obj):
+                return orjson.dumps(obj, default=to_builtin, option=options)
+            return "orjson", dumps, orjson.loads
+        
+        if candidate == "ujson":
+            try:
+                import ujson
+            except ImportError:
+                continue
+            
+            def dumps(obj):
+                # Older ujson releases have no default hook; NumPy values go through the stdlib path
+                try:
+                    return ujson.dumps(obj, ensure_ascii=False).encode()
+                except (TypeError, OverflowError):
+                    return json.dumps(obj, default=to_builtin, ensure_ascii=False, separators=(",", ":")).encode()
+            return "ujson", dumps, ujson.loads
+        
+        if candidate == "json":
+            def dumps(obj):
+                return json.dumps(obj, default=to_builtin, ensure_ascii=False, separators=(",", ":")).encode()
+            return "json", dumps, json.loads
+    raise ValueError(f"Unknown or unavailable JSON backend {name!r}")
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by the fastest available encoder, so every
+    jsonify() call in the app uses it. Output is compact; key order is the
+    dict's insertion order, which is deterministic for a given response.
+    """
+    
+    mimetype = "application/json"
+    
+    def __init__(self, app, backend=None):
+        super().__init__(app)
+        self.backend, self._dumps, self._loads = load_backend(backend)
+    
+    def dumps(self, obj, **kwargs):
+        return self._dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return self._loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj), mimetype=self.mimetype)
+
+def columns(rows):
+    """
+    Turn a list of dicts sharing the same keys into a dict of lists, so each
+    key appears once instead of once per row. Nested dicts with shared keys
+    are turned into columns too.
+    """
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return rows
+    keys = list(rows[0])
+    if any(list(row) != keys for row in rows):
+        return rows
+    result = {}
+    for key in keys:
+        values = [row[key] for row in rows]
+        result[key] = columns(values) if isinstance(values[0], dict) else values
+    return result
+
+def compact_pricing(pricing):
+    """Compact pricing response: price_forecast as columns."""
+    return dict(pricing, price_forecast=columns(pricing["price_forecast"]))
+
+def compact_staffing(staffing, shared=None):
+    """
+    Compact staffing response: forecast as columns. With shared (a dict
+    collecting values common to a batch) hourly_rates is moved there once
+    instead of being repeated for every hotel.
+    """
+    compact = dict(staffing, forecast=columns(staffing["forecast"]))
+    if shared is not None:
+        shared.setdefault("hourly_rates", compact.pop("hourly_rates"))
+    return compact
+
+class Compressor:
+    """
+    Negotiates response compression from Accept-Encoding: brotli when the
+    optional brotli module is installed and accepted, otherwise gzip.
+    Bodies smaller than min_size are sent as-is.
+    """
+    
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self._brotli = brotli
+    
+    def encodings(self):
+        return (["br"] if self._brotli else []) + ["gzip"]
+    
+    def choose(self, accept_encoding):
+        """Pick the best supported encoding the client accepts, or None."""
+        for encoding in self.encodings():
+            if accept_encoding[encoding] > 0:
+                return encoding
+        return None
+    
+    def compress(self, data, encoding):
+        if encoding == "br":
+            return self._brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level)
+    
+    def negotiate(self, request, response):
+        """
+        Add Vary and pick the encoding for a buffered 200 response, or None if
+        it is sent as-is. When it will be compressed its ETag is weakened, so
+        run this before make_conditional to give a 304 the same headers.
+        """
+        if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+                or "Content-Encoding" in response.headers):
+            return None
+        response.vary.add("Accept-Encoding")
+        if len(response.get_data()) < self.min_size:
+            return None
+        encoding = self.choose(request.accept_encodings)
+        if encoding is None:
+            return None
+        # The body differs per encoding, so only a weak validator still holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return encoding
+    
+    def apply(self, request, response):
+        """Compress a buffered response in place if worthwhile and accepted."""
+        encoding = self.negotiate(request, response)
+        if encoding is None:
+            return response
+        response.set_data(self.compress(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+def compressor_from_env():
+    """Compressor configured from HOTEL_OPTIMIZER_* variables, or None if disabled."""
+    if os.environ.get("HOTEL_OPTIMIZER_COMPRESSION", "1") == "0":
+        return None
+    return Compressor(min_size=int(os.environ.get("HOTEL_OPTIMIZER_COMPRESS_MIN_BYTES", 1024)))
@@ -0,0 +1,112 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as ComputeTimeout
+
+class PoolSaturated(Exception):
+    """Raised when the compute pool already has max_pending computations queued."""
+
+class ComputePool:
+    """
+    Bounded worker pool for engine computations with request coalescing.
+    
+    Identical concurrent requests (same key) share one in-flight
+    computation instead of each running it. At most max_pending distinct
+    computations are queued or running; beyond that requests are rejected
+    with PoolSaturated so the server sheds load instead of queueing forever.
+    With workers=0 computations run inline on the request thread.
+    """
+    
+    def __init__(self, workers=4, max_pending=64, timeout=30.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compute") if workers > 0 else None
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timeouts = 0
+        
+    def run(self, key, compute):
+        """Run compute() on the pool, or join an identical in-flight computation, and return its result."""
+        if self._executor is None:
+            return compute()
+        
+        submitted = False
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                if len(self._in_flight) >= self.max_pending:
+                    self.rejected += 1
+                    raise PoolSaturated(f"{len(self._in_flight)} computations pending")
+                future = self._executor.submit(compute)
+                self._in_flight[key] = future
+                self.submitted += 1
+                submitted = True
+        # Outside the lock: the callback runs immediately if compute already finished
+        if submitted:
+            future.add_done_callback(lambda done: self._finish(key, done))
+        
+        try:
+            return future.result(timeout=self.timeout)
+        except ComputeTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise
+    
+    def _finish(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+    
+    def stats(self):
+        with self._lock:
+            pending = len(self._in_flight)
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "timeout": self.timeout,
+            "pending": pending,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts
+        }
+
+def serve(app, host="127.0.0.1", port=5000, threads=8, connection_limit=100):
+    """
+    Production server: waitress when installed, otherwise the threaded
+    Werkzeug server without the debugger and reloader. threads bounds how
+    many requests are handled at once; engine work is bounded separately
+    by the ComputePool.
+    """
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+    
+    if waitress_serve is not None:
+        print(f"Serving on http://{host}:{port} with waitress ({threads} threads)")
+        waitress_serve(app, host=host, port=port, threads=threads, connection_limit=connection_limit)
+        return
+    
+    from werkzeug.serving import run_simple
+    print(f"waitress not installed; serving on http://{host}:{port} with the threaded Werkzeug server")
+    run_simple(host, port, app, threaded=True, use_reloader=False, use_debugger=False)
+
+def serving_config():
+    """Server and compute pool settings from HOTEL_OPTIMIZER_* environment variables."""
+    return {
+        "host": os.environ.get("HOTEL_OPTIMIZER_HOST", "127.0.0.1"),
+        "port": int(os.environ.get("HOTEL_OPTIMIZER_PORT", 5000)),
+        "threads": int(os.environ.get("HOTEL_OPTIMIZER_HTTP_THREADS", 8)),
+        "connection_limit": int(os.environ.get("HOTEL_OPTIMIZER_CONNECTION_LIMIT", 100))
+    }
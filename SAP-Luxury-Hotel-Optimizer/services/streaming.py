@@ -0,0 +1,67 @@
+import json
+
+# Media type per stream format
+STREAM_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+def stream_format(request):
+    """
+    Pick the stream format from ?format=ndjson|sse, otherwise from the
+    Accept header (EventSource sends text/event-stream). NDJSON by default.
+    """
+    requested = request.args.get("format")
+    if requested:
+        if requested not in STREAM_MIMETYPES:
+            raise ValueError(f"Unknown stream format {requested!r}")
+        return requested
+    accept = request.accept_mimetypes
+    if accept[STREAM_MIMETYPES["sse"]] > accept[STREAM_MIMETYPES["ndjson"]]:
+        return "sse"
+    return "ndjson"
+
+def last_event_position(request):
+    """Position to resume after from an SSE reconnect's Last-Event-ID, or -1."""
+    last_event_id = request.headers.get("Last-Event-ID")
+    if not last_event_id:
+        return -1
+    try:
+        return int(last_event_id)
+    except ValueError:
+        raise ValueError("Last-Event-ID must be a stream position") from None
+
+def ndjson_stream(results, dumps=json.dumps, errors=()):
+    """
+    One JSON document per line for each (position, result). If producing a
+    result raises one of errors, a final {"error": ...} line ends the stream.
+    """
+    try:
+        for _, result in results:
+            yield dumps(result) + "\n"
+    except errors as e:
+        yield dumps({"error": str(e) or type(e).__name__}) + "\n"
+
+def sse_stream(results, event, dumps=json.dumps, errors=()):
+    """
+    One Server-Sent Event per (position, result). The position is the event
+    id, so a reconnecting EventSource resumes after the last result it got.
+    An end event with the count marks a complete stream; if producing a
+    result raises one of errors, an error event ends it instead.
+    """
+    count = 0
+    try:
+        for position, result in results:
+            count += 1
+            # Compact JSON has no raw newlines, so it fits on one data: line
+            yield f"id: {position}\nevent: {event}\ndata: {dumps(result)}\n\n"
+    except errors as e:
+        yield f"event: error\ndata: {dumps({'error': str(e) or type(e).__name__, 'count': count})}\n\n"
+        return
+    yield f"event: end\ndata: {dumps({'count': count})}\n\n"
+
+def encode_stream(results, fmt, event, dumps=json.dumps, errors=()):
+    """Lazily encode (position, result) pairs in the given stream format."""
+    if fmt == "sse":
+        return sse_stream(results, event, dumps, errors)
+    return ndjson_stream(results, dumps, errors)
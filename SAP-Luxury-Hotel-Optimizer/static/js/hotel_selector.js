@@ -0,0 +1,72 @@
+// Lazily loaded hotel selector backed by the paginated /api/hotels endpoint.
+// The page renders only the current hotel; options are fetched a page at a
+// time when the selector is first used, and the search box filters by prefix.
+const HOTEL_PAGE_SIZE = 50;
+const LOAD_MORE_VALUE = '__load_more__';
+
+function initHotelSelector(selectId, searchId) {
+    const select = document.getElementById(selectId);
+    const search = document.getElementById(searchId);
+    const current = select.options[0] ? {value: select.options[0].value, text: select.options[0].text} : null;
+    let nextCursor = null;
+    let loaded = false;
+    let searchTimer = null;
+    
+    function hotelLabel(h) {
+        return `${h.name} (${h.location}, ${h.country})`;
+    }
+    
+    function loadPage(reset) {
+        const params = new URLSearchParams({limit: HOTEL_PAGE_SIZE});
+        const query = search ? search.value.trim() : '';
+        if (query) params.set('q', query);
+        if (!reset && nextCursor) params.set('cursor', nextCursor);
+        
+        return fetch(`/api/hotels?${params}`)
+            .then(response => response.json())
+            .then(data => {
+                const selected = select.value;
+                const moreOption = select.querySelector(`option[value="${LOAD_MORE_VALUE}"]`);
+                if (moreOption) moreOption.remove();
+                
+                if (reset) {
+                    select.innerHTML = '';
+                    // Keep the hotel being viewed selectable while browsing without a query
+                    if (current && !query) select.add(new Option(current.text, current.value));
+                }
+                
+                data.hotels.forEach(h => {
+                    if (!select.querySelector(`option[value="${h.hotel_id}"]`)) {
+                        select.add(new Option(hotelLabel(h), h.hotel_id));
+                    }
+                });
+                
+                nextCursor = data.next_cursor;
+                if (nextCursor) select.add(new Option('Load more hotels…', LOAD_MORE_VALUE));
+                
+                if (select.querySelector(`option[value="${selected}"]`) && selected !== LOAD_MORE_VALUE) {
+                    select.value = selected;
+                }
+                loaded = true;
+            })
+            .catch(error => console.error('Error loading hotels:', error));
+    }
+    
+    // First interaction loads the first page
+    select.addEventListener('focus', function() {
+        if (!loaded) loadPage(true);
+    });
+    
+    select.addEventListener('change', function() {
+        if (select.value === LOAD_MORE_VALUE) {
+            loadPage(false);
+        }
+    });
+    
+    if (search) {
+        search.addEventListener('input', function() {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => loadPage(true), 200);
+        });
+    }
+}
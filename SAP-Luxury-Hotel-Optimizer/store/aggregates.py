@@ -0,0 +1,151 @@
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+class HotelBookingStats:
+    """
+    Running booking aggregates for one hotel: row count, booking total and
+    per-date (rows, bookings) totals. Rolling windows are answered from
+    prefix sums over the sorted dates, built on first use.
+    
+    Per-date totals can be supplied lazily through load_dates, so a
+    columnar repository only materializes them for hotels that need them.
+    """
+    
+    def __init__(self, count=0, total=0, by_date=None, load_dates=None):
+        self.count = count
+        self.total = total
+        self._by_date = by_date
+        self._load_dates = load_dates
+        self._window_index = None
+    
+    @property
+    def average(self):
+        """Average bookings per row, or None without bookings."""
+        if not self.count:
+            return None
+        return self.total / self.count
+    
+    @property
+    def by_date(self):
+        """date -> (rows, bookings) for this hotel."""
+        if self._by_date is None:
+            self._by_date = dates_from_rows(self._load_dates()) if self._load_dates else {}
+        return self._by_date
+    
+    def with_rows(self, rows):
+        """
+        Return new stats with rows upserted: rows replace whatever was
+        recorded for their dates, matching HotelRepository.with_changes().
+        """
+        by_date = dict(self.by_date)
+        count, total = self.count, self.total
+        for date, (date_rows, date_total) in dates_from_rows(rows).items():
+            old_rows, old_total = by_date.get(date, (0, 0))
+            count += date_rows - old_rows
+            total += date_total - old_total
+            by_date[date] = (date_rows, date_total)
+        return HotelBookingStats(count, total, by_date)
+    
+    def window(self, start, end):
+        """(rows, bookings) for dates with start <= date < end (ISO strings)."""
+        if self._window_index is None:
+            dates = sorted(self.by_date)
+            row_sums = [0, *accumulate(self.by_date[d][0] for d in dates)]
+            booking_sums = [0, *accumulate(self.by_date[d][1] for d in dates)]
+            self._window_index = (dates, row_sums, booking_sums)
+        dates, row_sums, booking_sums = self._window_index
+        lo, hi = bisect_left(dates, start), bisect_left(dates, end)
+        return row_sums[hi] - row_sums[lo], booking_sums[hi] - booking_sums[lo]
+    
+    def window_average(self, start, end):
+        """Average bookings per row between start and end, or None if no rows fall inside."""
+        rows, total = self.window(start, end)
+        return total / rows if rows else None
+    
+    def as_dict(self):
+        return {"count": self.count, "total": self.total, "average": self.average}
+
+def dates_from_rows(rows):
+    """Group booking rows into date -> (rows, bookings)."""
+    by_date = {}
+    for b in rows:
+        date_rows, date_total = by_date.get(b.date, (0, 0))
+        by_date[b.date] = (date_rows + 1, date_total + b.bookings)
+    return by_date
+
+class BookingAggregates:
+    """
+    Per-hotel HotelBookingStats, computed once at load and updated
+    copy-on-write as bookings arrive, so demand and occupancy factors are
+    an O(1) lookup instead of a re-sum of the booking history.
+    """
+    
+    def __init__(self, stats=None):
+        self._stats = stats or {}
+    
+    @classmethod
+    def from_bookings(cls, bookings):
+        """Build aggregates for every hotel in one pass over booking rows."""
+        rows_by_hotel = defaultdict(list)
+        for b in bookings:
+            rows_by_hotel[b.hotel_id].append(b)
+        stats = {}
+        for hotel_id, rows in rows_by_hotel.items():
+            by_date = dates_from_rows(rows)
+            stats[hotel_id] = HotelBookingStats(len(rows), sum(b.bookings for b in rows), by_date)
+        return cls(stats)
+    
+    def __len__(self):
+        return len(self._stats)
+    
+    def get(self, hotel_id):
+        """Stats for a hotel, or None if it has no bookings."""
+        return self._stats.get(hotel_id)
+    
+    def with_bookings(self, bookings):
+        """Return new aggregates with booking rows upserted; untouched hotels are shared."""
+        rows_by_hotel = defaultdict(list)
+        for b in bookings:
+            rows_by_hotel[b.hotel_id].append(b)
+        stats = dict(self._stats)
+        for hotel_id, rows in rows_by_hotel.items():
+            stats[hotel_id] = stats.get(hotel_id, HotelBookingStats()).with_rows(rows)
+        return BookingAggregates(stats)
+
+class PortfolioStats:
+    """
+    Dashboard totals for the hotel portfolio, computed once per data load
+    so the dashboard does not scan every hotel on each request. Hotels only
+    change on a full reload, which rebuilds them.
+    """
+    
+    def __init__(self, hotels):
+        by_country = defaultdict(lambda: {"hotels": 0, "rooms": 0, "rating_total": 0.0})
+        for h in hotels:
+            country = by_country[h.country]
+            country["hotels"] += 1
+            country["rooms"] += h.rooms
+            country["rating_total"] += h.rating
+        
+        self.hotel_count = len(hotels)
+        self.total_rooms = sum(country["rooms"] for country in by_country.values())
+        # Largest countries by rooms first
+        self.by_country = [{
+            "country": name,
+            "hotels": country["hotels"],
+            "rooms": country["rooms"],
+            "average_rating": round(country["rating_total"] / country["hotels"], 2)
+        } for name, country in sorted(by_country.items(), key=lambda item: (-item[1]["rooms"], item[0]))]
+    
+    @property
+    def country_count(self):
+        return len(self.by_country)
+    
+    def as_dict(self):
+        return {
+            "hotel_count": self.hotel_count,
+            "country_count": self.country_count,
+            "total_rooms": self.total_rooms,
+            "by_country": self.by_country
+        }
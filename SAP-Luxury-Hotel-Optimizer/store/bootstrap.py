@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from store.records import Booking, Competitor, Event, Hotel
+from store.repository import HotelRepository
+
+DATA_FILES = ["hotels", "bookings", "events", "competitors"]
+
+class StartupReport:
+    """Records how long each startup phase took."""
+    
+    def __init__(self):
+        self.phases = []
+        self.started = time.perf_counter()
+        
+    @contextmanager
+    def phase(self, name):
+        """Time a named startup phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+    
+    def total_seconds(self):
+        return sum(seconds for _, seconds in self.phases)
+    
+    def as_dict(self):
+        return {
+            "phases": {name: round(seconds * 1000, 2) for name, seconds in self.phases},
+            "total_ms": round(self.total_seconds() * 1000, 2)
+        }
+    
+    def summary(self):
+        parts = ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases)
+        return f"Startup took {self.total_seconds() * 1000:.1f} ms ({parts})"
+
+def data_path(data_dir, name):
+    return os.path.join(data_dir, f"{name}.json")
+
+def read_json(data_dir, name):
+    """Read one data file, returning an empty list if it is missing or broken."""
+    try:
+        with open(data_path(data_dir, name)) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {name}.json: {e}")
+        return []
+
+def read_records(data_dir, name, record_class):
+    """
+    Read one data file straight into records. The object_hook converts each
+    row as it is parsed, so the intermediate dicts are freed immediately
+    instead of the whole file being held twice.
+    """
+    try:
+        with open(data_path(data_dir, name)) as f:
+            return json.load(f, object_hook=record_class.from_dict)
+    except Exception as e:
+        print(f"Error loading {name}.json: {e}")
+        return []
+
+def write_json_atomic(data_dir, name, rows):
+    """Write a data file via a temp file and rename so readers never see a partial file."""
+    path = data_path(data_dir, name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(rows, f, indent=2)
+    os.replace(tmp_path, path)
+
+def has_hotels(data_dir):
+    """Check if hotels.json exists AND has data."""
+    path = data_path(data_dir, "hotels")
+    # More content than just "[]"
+    return os.path.exists(path) and os.path.getsize(path) > 2
+
+def align_hotel_locations(hotels, events):
+    """
+    Ensure some hotels share locations with events so matches exist, for
+    data generated without coordinates, where events match hotels by
+    location name only. Hotels with coordinates are never moved.
+    Deterministic and idempotent: returns the number of hotels changed,
+    which is 0 once every event location already has a hotel.
+    """
+    hotel_locations = set(h["location"] for h in hotels)
+    missing = sorted(set(e["location"] for e in events if "latitude" not in e) - hotel_locations)
+    if not missing:
+        return 0
+    
+    # Only reassign hotels whose location has no events, in hotel order
+    event_locations = set(e["location"] for e in events)
+    candidates = [h for h in hotels if h["location"] not in event_locations and "latitude" not in h]
+    changed = 0
+    for hotel, location in zip(candidates, missing):
+        hotel["location"] = location
+        changed += 1
+    return changed
+
+def fingerprint(paths):
+    """Hash the name, size and modification time of each existing file."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+def source_version(data_dir):
+    """Fingerprint of the JSON data files only; exports record it to detect when they are stale."""
+    return fingerprint([data_path(data_dir, name) for name in DATA_FILES])
+
+def data_version(data_dir):
+    """
+    Fingerprint the data files by name, size and modification time. Workers
+    reading the same files agree on the version without coordinating.
+    """
+    paths = [data_path(data_dir, name) for name in DATA_FILES]
+    paths.append(os.path.join(data_dir, "columnar", "meta.json"))
+    paths.append(os.path.join(data_dir, "hotels.db"))
+    return fingerprint(paths)
+
+def export_is_current(data_dir, data_format):
+    """Whether the columnar export or SQLite database exists and was built from the current JSON files."""
+    if data_format == "columnar":
+        from store.columnar import columnar_source_version, has_columnar
+        if not has_columnar(data_dir):
+            return False
+        # An export streamed without bookings.json is itself the source of the bookings
+        if not os.path.exists(data_path(data_dir, "bookings")):
+            return True
+        return columnar_source_version(data_dir) == source_version(data_dir)
+    if data_format == "sqlite":
+        from store.sqlite import has_sqlite, sqlite_source_version
+        return has_sqlite(data_dir) and sqlite_source_version(data_dir) == source_version(data_dir)
+    return True
+
+def prepare_data(data_dir, data_format="json", hotel_count=300, report=None):
+    """
+    Idempotent data-preparation step: generate mock data if missing, align
+    hotel locations with event locations in data without coordinates, and
+    build the columnar export or SQLite database when requested, rebuilding
+    it when the JSON files changed since. Running it again on prepared data
+    writes nothing.
+    """
+    report = report or StartupReport()
+    os.makedirs(data_dir, exist_ok=True)
+    
+    if not has_hotels(data_dir):
+        with report.phase("generate"):
+            # Imported here so the read-only load path never needs Faker
+            from mock.sap_mock import SAPMockGenerator
+            print("Generating mock hotel data...")
+            generator = SAPMockGenerator()
+            generator.generate_hotels(hotel_count)
+            generator.generate_bookings()
+            generator.generate_events()
+            generator.generate_competitors()
+            generator.export_to_json(data_dir)
+            print("Mock data generation complete!")
+    
+    with report.phase("align_locations"):
+        hotels = read_json(data_dir, "hotels")
+        events = read_json(data_dir, "events")
+        changed = align_hotel_locations(hotels, events)
+        if changed:
+            write_json_atomic(data_dir, "hotels", hotels)
+            print(f"Updated {changed} hotels to match event locations")
+    
+    if data_format == "columnar":
+        from store.columnar import write_columnar
+        if not export_is_current(data_dir, "columnar"):
+            with report.phase("export_columnar"):
+                write_columnar(data_dir, hotels, read_json(data_dir, "bookings"), read_json(data_dir, "competitors"),
+                               source_version=source_version(data_dir))
+    
+    if data_format == "sqlite":
+        from store.sqlite import write_sqlite
+        if not export_is_current(data_dir, "sqlite"):
+            with report.phase("import_sqlite"):
+                write_sqlite(data_dir, hotels, read_json(data_dir, "bookings"), events,
+                             read_json(data_dir, "competitors"), source_version=source_version(data_dir))
+    return report
+
+def load_data(data_dir, data_format="json", report=None):
+    """
+    Read-only fast load path used by every worker at boot. Never writes to
+    data_dir. Returns a dict with hotels, bookings, events, competitors, the
+    data version and whether the columnar export or SQLite database was used.
+    """
+    report = report or StartupReport()
+    dataset = {"columnar": False, "sqlite": False, "version": data_version(data_dir)}
+    
+    # Everything but the hotel list stays in the SQLite database
+    if data_format == "sqlite":
+        from store.sqlite import load_sqlite
+        if export_is_current(data_dir, "sqlite"):
+            with report.phase("load_sqlite"):
+                dataset["hotels"], dataset["bookings"], dataset["events"], dataset["competitors"] = load_sqlite(data_dir)
+            dataset["sqlite"] = True
+            return dataset
+        print("No current SQLite database found, falling back to JSON")
+    
+    with report.phase("load_hotels"):
+        dataset["hotels"] = read_records(data_dir, "hotels", Hotel)
+    with report.phase("load_events"):
+        dataset["events"] = read_records(data_dir, "events", Event)
+    
+    # Bookings and competitors can come from the columnar export instead of JSON
+    if data_format == "columnar":
+        from store.columnar import load_columnar
+        if export_is_current(data_dir, "columnar"):
+            with report.phase("load_columnar"):
+                dataset["bookings"], dataset["competitors"] = load_columnar(data_dir)
+            dataset["columnar"] = True
+        else:
+            print("No current columnar export found, falling back to JSON")
+    
+    if not dataset["columnar"]:
+        with report.phase("load_bookings"):
+            dataset["bookings"] = read_records(data_dir, "bookings", Booking)
+        with report.phase("load_competitors"):
+            dataset["competitors"] = read_records(data_dir, "competitors", Competitor)
+    return dataset
+
+def build_repository(dataset):
+    """Build the indexed repository matching how the dataset was loaded."""
+    if dataset["sqlite"]:
+        from store.sqlite import SQLiteHotelRepository
+        repository_class = SQLiteHotelRepository
+    elif dataset["columnar"]:
+        from store.columnar import ColumnarHotelRepository
+        repository_class = ColumnarHotelRepository
+    else:
+        repository_class = HotelRepository
+    return repository_class(dataset["hotels"], dataset["bookings"], dataset["events"], dataset["competitors"],
+                            version=dataset["version"])
+
+# Prepare a data directory ahead of starting workers.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare hotel optimizer data files")
+    parser.add_argument("data_dir", nargs="?", default="data")
+    parser.add_argument("--format", choices=["json", "columnar", "sqlite"], default="json")
+    parser.add_argument("--hotels", type=int, default=300)
+    args = parser.parse_args()
+    
+    report = prepare_data(args.data_dir, args.format, args.hotels)
+    print(report.summary())
@@ -0,0 +1,168 @@
+import copy
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from store.geo import PointGrid, coordinates
+
+def event_date(e):
+    return e.date
+
+def grid_entries(events, first_seq=0):
+    """PointGrid entries for the events that have coordinates, keyed by (date, load order)."""
+    return [((e.date, seq), e.latitude, e.longitude, e)
+            for seq, e in enumerate(events, first_seq) if coordinates(e) is not None]
+
+def match_events(calendar, hotel, radius_km, date_range=None):
+    """
+    Events near a hotel, optionally only those with start <= date < end for
+    date_range=(start, end). Where the hotel and an event both have
+    coordinates, the event is near within radius_km; where either has none,
+    they match by location name as before. A hotel without coordinates gets
+    exactly the location lookup (at/between), otherwise results are in date
+    order.
+    """
+    if date_range:
+        at_location = calendar.between(hotel.location, *date_range)
+    else:
+        at_location = calendar.at(hotel.location)
+    point = coordinates(hotel)
+    if point is None:
+        return at_location
+    
+    events = calendar.near(point[0], point[1], radius_km, date_range)
+    unplaced = [e for e in at_location if coordinates(e) is None]
+    if unplaced:
+        events = sorted(events + unplaced, key=event_date)
+    return events
+
+class EventCalendar:
+    """
+    Event index built once per data load: location -> sorted dates -> events,
+    one global date-sorted list for portfolio-wide range queries, and a
+    spatial grid over the events that have coordinates. Dates are ISO
+    "YYYY-MM-DD" strings, so string order is date order.
+    """
+    
+    def __init__(self, events):
+        by_location = defaultdict(list)
+        for e in events:
+            by_location[e.location].append(e)
+            
+        # location -> events in their original order
+        self._by_location = {}
+        # location -> {date: events} and location -> sorted dates
+        self._by_location_date = {}
+        self._dates = {}
+        for location, rows in by_location.items():
+            self._set_location(location, rows)
+        
+        # All events sorted by date for range queries across locations
+        self._all = sorted(events, key=event_date)
+        self._all_dates = [e.date for e in self._all]
+        
+        # Grid keys are (date, load order): date range queries bisect each cell
+        self._grid = PointGrid(grid_entries(events))
+        self._next_seq = len(events)
+        
+    def _set_location(self, location, rows):
+        if not rows:
+            self._by_location.pop(location, None)
+            self._by_location_date.pop(location, None)
+            self._dates.pop(location, None)
+            return
+        days = defaultdict(list)
+        for e in rows:
+            days[e.date].append(e)
+        self._by_location[location] = rows
+        self._by_location_date[location] = dict(days)
+        self._dates[location] = sorted(days)
+        
+    def with_events(self, events):
+        """
+        Return a new calendar with events added, replacing existing events
+        that have the same event_id. Only the affected locations are rebuilt;
+        the rest are shared with this calendar, which is left unchanged.
+        """
+        new_ids = {e.event_id for e in events if e.event_id}
+        
+        def kept(e):
+            return e.event_id not in new_ids
+        
+        replaced = [e for e in self._all if not kept(e)] if new_ids else []
+        affected = {e.location for e in events} | {e.location for e in replaced}
+        
+        calendar = copy.copy(self)
+        calendar._by_location = dict(self._by_location)
+        calendar._by_location_date = dict(self._by_location_date)
+        calendar._dates = dict(self._dates)
+        for location in affected:
+            rows = [e for e in self._by_location.get(location, []) if kept(e)]
+            rows.extend(e for e in events if e.location == location)
+            calendar._set_location(location, rows)
+        
+        remaining = [e for e in self._all if kept(e)] if new_ids else self._all
+        calendar._all = list(heapq.merge(remaining, sorted(events, key=event_date), key=event_date))
+        calendar._all_dates = [e.date for e in calendar._all]
+        
+        calendar._grid = self._grid.with_entries(grid_entries(events, self._next_seq), grid_entries(replaced))
+        calendar._next_seq = self._next_seq + len(events)
+        return calendar
+        
+    def __len__(self):
+        return len(self._all)
+    
+    def all_events(self):
+        """Every event, in date order."""
+        return self._all
+    
+    def locations(self):
+        return self._by_location.keys()
+    
+    def location_dates(self):
+        """Number of distinct (location, date) pairs."""
+        return sum(len(dates) for dates in self._dates.values())
+    
+    def at(self, location):
+        """All events at a location, in their original order."""
+        return self._by_location.get(location, [])
+    
+    def on(self, location, date):
+        """Events at a location on one date."""
+        days = self._by_location_date.get(location)
+        return days.get(date, []) if days else []
+    
+    def between(self, location, start, end):
+        """Events at a location with start <= date < end, in date order."""
+        dates = self._dates.get(location)
+        if not dates:
+            return []
+        days = self._by_location_date[location]
+        matches = []
+        for i in range(bisect_left(dates, start), bisect_left(dates, end)):
+            matches.extend(days[dates[i]])
+        return matches
+    
+    def near(self, latitude, longitude, radius_km, date_range=None):
+        """Events with coordinates within radius_km of a point, in date order."""
+        if date_range:
+            return self._grid.within(latitude, longitude, radius_km, (date_range[0],), (date_range[1],))
+        return self._grid.within(latitude, longitude, radius_km)
+    
+    def within(self, hotel, radius_km, date_range=None):
+        """Events near a hotel, in date order; see match_events."""
+        return match_events(self, hotel, radius_km, date_range)
+    
+    def placed(self):
+        """Number of events with coordinates."""
+        return len(self._grid)
+    
+    def events_between(self, start, end):
+        """
+        Events at every location with start <= date < end, grouped as
+        {location: events in date order}. Cost scales with the matches.
+        """
+        grouped = defaultdict(list)
+        for i in range(bisect_left(self._all_dates, start), bisect_left(self._all_dates, end)):
+            e = self._all[i]
+            grouped[e.location].append(e)
+        return dict(grouped)
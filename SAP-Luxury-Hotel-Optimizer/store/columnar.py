@@ -0,0 +1,257 @@
+import json
+import os
+import shutil
+import sys
+import numpy as np
+from store.aggregates import BookingAggregates, HotelBookingStats
+from store.records import Booking, Competitor
+from store.repository import HotelRepository
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+COLUMNAR_DIR = "columnar"
+
+class ColumnarBookings:
+    """
+    Bookings held as parallel column arrays instead of one dict per row.
+    Rows are sorted by dictionary-encoded hotel code, so each hotel's bookings
+    are one contiguous slice. Arrays may be read-only memory maps.
+    """
+    
+    def __init__(self, hotel_ids, hotel_codes, dates, counts):
+        self.hotel_ids = hotel_ids
+        self.hotel_codes = hotel_codes
+        self.dates = dates
+        self.counts = counts
+        
+        # Slice bounds per hotel code: rows of code c are offsets[c]:offsets[c + 1]
+        self.offsets = np.searchsorted(hotel_codes, np.arange(len(hotel_ids) + 1))
+        self._code_by_id = {hotel_id: code for code, hotel_id in enumerate(hotel_ids.tolist())}
+        
+    def __len__(self):
+        return len(self.counts)
+    
+    def __iter__(self):
+        for code, hotel_id in enumerate(self.hotel_ids.tolist()):
+            yield from self._rows(hotel_id, self.offsets[code], self.offsets[code + 1])
+    
+    def slice_for(self, hotel_id):
+        """Get the (start, end) row range of a hotel, or None if unknown."""
+        code = self._code_by_id.get(hotel_id)
+        if code is None:
+            return None
+        return self.offsets[code], self.offsets[code + 1]
+    
+    def rows_for(self, hotel_id):
+        """Materialize one hotel's bookings as Booking records."""
+        bounds = self.slice_for(hotel_id)
+        if bounds is None:
+            return []
+        return self._rows(hotel_id, *bounds)
+    
+    def _rows(self, hotel_id, start, end):
+        dates = np.datetime_as_string(self.dates[start:end], unit="D").tolist()
+        counts = self.counts[start:end].tolist()
+        return [Booking(hotel_id, d, c) for d, c in zip(dates, counts)]
+
+class ColumnarCompetitors:
+    """Competitor prices as a dictionary-encoded hotel code column and a price column."""
+    
+    def __init__(self, hotel_ids, hotel_codes, prices):
+        self.hotel_ids = hotel_ids
+        self.hotel_codes = hotel_codes
+        self.prices = prices
+        
+    def __len__(self):
+        return len(self.prices)
+    
+    def __iter__(self):
+        hotel_ids = self.hotel_ids.tolist()
+        for code, price in zip(self.hotel_codes.tolist(), self.prices.tolist()):
+            yield Competitor(hotel_ids[code], price)
+
+class ColumnarHotelRepository(HotelRepository):
+    """HotelRepository over columnar bookings and competitors."""
+    
+    def index_bookings(self):
+        """Bookings are already grouped by hotel; only start an empty delta overlay."""
+        # hotel_id -> bookings for hotels changed by with_changes()
+        self._bookings_by_hotel = {}
+        
+    def index_booking_aggregates(self):
+        """Per-hotel counts and totals straight from the column slices; per-date totals load lazily."""
+        offsets = self.loaded_bookings.offsets
+        counts = np.diff(offsets).tolist()
+        # Totals per contiguous hotel slice; int64 so large histories cannot overflow
+        cumulative = np.concatenate(([0], np.cumsum(self.loaded_bookings.counts, dtype=np.int64)))
+        totals = (cumulative[offsets[1:]] - cumulative[offsets[:-1]]).tolist()
+        stats = {}
+        for hotel_id, count, total in zip(self.loaded_bookings.hotel_ids.tolist(), counts, totals):
+            if count:
+                load_dates = lambda hotel_id=hotel_id: self.loaded_bookings.rows_for(hotel_id)
+                stats[hotel_id] = HotelBookingStats(count, total, load_dates=load_dates)
+        self.booking_aggregates = BookingAggregates(stats)
+        
+    def index_competitors(self):
+        """Index hotel_id -> competitor price from the columns (first row wins)."""
+        hotel_ids = self.competitors.hotel_ids.tolist()
+        self._competitor_price = {}
+        for code, price in zip(self.competitors.hotel_codes.tolist(), self.competitors.prices.tolist()):
+            self._competitor_price.setdefault(hotel_ids[code], price)
+    
+    def hotels_with_bookings(self):
+        """Number of hotels that have at least one booking row."""
+        base = int(np.count_nonzero(np.diff(self.loaded_bookings.offsets)))
+        added = sum(1 for hotel_id in self._bookings_by_hotel if not self.loaded_bookings.rows_for(hotel_id))
+        return base + added
+    
+    def get_hotel_bookings(self, hotel_id):
+        """Get all bookings for a specific hotel."""
+        overlay = self._bookings_by_hotel.get(hotel_id)
+        if overlay is not None:
+            return overlay
+        return self.loaded_bookings.rows_for(hotel_id)
+
+def encode_hotel_ids(hotels, *tables):
+    """Build the hotel_id dictionary: hotel order first, then ids only seen in tables."""
+    code_by_id = {}
+    for hotel_id in (h["hotel_id"] for h in hotels):
+        code_by_id.setdefault(hotel_id, len(code_by_id))
+    for table in tables:
+        for row in table:
+            code_by_id.setdefault(row["hotel_id"], len(code_by_id))
+    return code_by_id
+
+def write_columnar(base_path, hotels, bookings, competitors, source_version=None):
+    """
+    Write bookings and competitors as .npy columns under base_path/columnar.
+    The export is written to a temporary directory and swapped into place,
+    so readers never see new columns next to an old meta.json; workers still
+    mapping the old files keep them until they reload.
+    """
+    final_dir = os.path.join(base_path, COLUMNAR_DIR)
+    out_dir = f"{final_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+    
+    code_by_id = encode_hotel_ids(hotels, bookings, competitors)
+    hotel_ids = np.array(list(code_by_id), dtype=np.str_)
+    
+    booking_codes = np.fromiter((code_by_id[b["hotel_id"]] for b in bookings), dtype=np.int32, count=len(bookings))
+    booking_dates = np.array([b["date"] for b in bookings], dtype="datetime64[D]")
+    booking_counts = np.fromiter((b["bookings"] for b in bookings), dtype=np.int32, count=len(bookings))
+    
+    # Stable sort keeps each hotel's rows in their original order
+    order = np.argsort(booking_codes, kind="stable")
+    
+    columns = {
+        "hotel_ids": hotel_ids,
+        "bookings_hotel": booking_codes[order],
+        "bookings_date": booking_dates[order],
+        "bookings_count": booking_counts[order],
+        "competitors_hotel": np.fromiter((code_by_id[c["hotel_id"]] for c in competitors), dtype=np.int32, count=len(competitors)),
+        "competitors_price": np.fromiter((c["competitor_price"] for c in competitors), dtype=np.float64, count=len(competitors))
+    }
+    for name, column in columns.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), column, allow_pickle=False)
+    
+    write_meta(out_dir, len(hotel_ids), len(bookings), len(competitors), source_version)
+    
+    # A directory cannot be replaced while it has files, so move the old one aside first
+    old_dir = f"{final_dir}.{os.getpid()}.old"
+    if os.path.exists(final_dir):
+        os.replace(final_dir, old_dir)
+    os.replace(out_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return final_dir
+
+def write_meta(out_dir, hotel_ids, bookings, competitors, source_version=None):
+    """Write meta.json; source_version is the source_version() of the JSON files the export was built from."""
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({
+            "format_version": FORMAT_VERSION,
+            "hotel_ids": hotel_ids,
+            "bookings": bookings,
+            "competitors": competitors,
+            "source_version": source_version
+        }, f)
+
+def allocate_columnar(base_path, hotel_ids, booking_rows, competitor_rows):
+    """
+    Preallocate the column files for a streaming export whose rows are
+    already in hotel order. Writers then fill disjoint slices through
+    open_columns(); finish with write_meta().
+    """
+    out_dir = os.path.join(base_path, COLUMNAR_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    # An export without meta.json is incomplete and will not be loaded
+    meta_path = os.path.join(out_dir, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    
+    np.save(os.path.join(out_dir, "hotel_ids.npy"), np.array(hotel_ids, dtype=np.str_), allow_pickle=False)
+    shapes = {
+        "bookings_hotel": (booking_rows, np.int32),
+        "bookings_date": (booking_rows, "datetime64[D]"),
+        "bookings_count": (booking_rows, np.int32),
+        "competitors_hotel": (competitor_rows, np.int32),
+        "competitors_price": (competitor_rows, np.float64)
+    }
+    for name, (rows, dtype) in shapes.items():
+        column = np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=(rows,))
+        del column
+    return out_dir
+
+def open_columns(base_path, mode="r+"):
+    """Open every preallocated column of a streaming export as a memory map."""
+    out_dir = os.path.join(base_path, COLUMNAR_DIR)
+    names = ["bookings_hotel", "bookings_date", "bookings_count", "competitors_hotel", "competitors_price"]
+    return {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode) for name in names}
+
+def has_columnar(base_path):
+    """Check whether a columnar export exists under base_path."""
+    return os.path.exists(os.path.join(base_path, COLUMNAR_DIR, "meta.json"))
+
+def columnar_source_version(base_path):
+    """The source version recorded in the columnar export, or None."""
+    try:
+        with open(os.path.join(base_path, COLUMNAR_DIR, "meta.json")) as f:
+            return json.load(f).get("source_version")
+    except (OSError, ValueError):
+        return None
+
+def load_columnar(base_path, mmap=True):
+    """
+    Load bookings and competitors from base_path/columnar. With mmap=True the
+    columns are memory-mapped read-only, so pages are shared between worker
+    processes and only touched rows are read from disk.
+    """
+    in_dir = os.path.join(base_path, COLUMNAR_DIR)
+    with open(os.path.join(in_dir, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {meta['format_version']}")
+    
+    mmap_mode = "r" if mmap else None
+    
+    def column(name):
+        return np.load(os.path.join(in_dir, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+    
+    hotel_ids = column("hotel_ids")
+    bookings = ColumnarBookings(hotel_ids, column("bookings_hotel"), column("bookings_date"), column("bookings_count"))
+    competitors = ColumnarCompetitors(hotel_ids, column("competitors_hotel"), column("competitors_price"))
+    return bookings, competitors
+
+# Convert an existing JSON data directory in place.
+if __name__ == "__main__":
+    from store.bootstrap import source_version
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "data"
+    with open(os.path.join(base_path, "hotels.json")) as f:
+        hotels = json.load(f)
+    with open(os.path.join(base_path, "bookings.json")) as f:
+        bookings = json.load(f)
+    with open(os.path.join(base_path, "competitors.json")) as f:
+        competitors = json.load(f)
+    out_dir = write_columnar(base_path, hotels, bookings, competitors, source_version=source_version(base_path))
+    print(f"Wrote {len(bookings)} bookings and {len(competitors)} competitors to {out_dir}")
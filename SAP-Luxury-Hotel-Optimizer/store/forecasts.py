@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import numpy as np
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+FORECASTS_DIR = "forecasts"
+
+# Pointer to the published run; replaced atomically when a run finishes
+LATEST_FILE = "latest.json"
+
+# Keep the previous run so readers holding its memory maps are not cut off
+KEEP_RUNS = 2
+
+def forecasts_path(data_dir, *parts):
+    return os.path.join(data_dir, FORECASTS_DIR, *parts)
+
+def allocate_forecast(data_dir, run_id, hotel_ids, price_days, staffing_days, departments):
+    """
+    Preallocate the result arrays of a forecast run. Shard workers fill
+    disjoint hotel rows through open_forecast_arrays(); finish with
+    publish_forecast().
+    
+    prices:        float32 (hotels, price_days), rounded to cents
+    staffing:      int16   (hotels, staffing_days, departments)
+    staffing_cost: int32   (hotels, staffing_days)
+    """
+    run_dir = forecasts_path(data_dir, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    
+    np.save(os.path.join(run_dir, "hotel_ids.npy"), np.array(hotel_ids, dtype=np.str_), allow_pickle=False)
+    n_hotels = len(hotel_ids)
+    shapes = {
+        "prices": ((n_hotels, price_days), np.float32),
+        "staffing": ((n_hotels, staffing_days, len(departments)), np.int16),
+        "staffing_cost": ((n_hotels, staffing_days), np.int32)
+    }
+    for name, (shape, dtype) in shapes.items():
+        array = np.lib.format.open_memmap(os.path.join(run_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+        del array
+    return run_dir
+
+def open_forecast_arrays(run_dir, mode="r"):
+    """Open a run's result arrays as memory maps."""
+    return {name: np.load(os.path.join(run_dir, f"{name}.npy"), mmap_mode=mode)
+            for name in ["prices", "staffing", "staffing_cost"]}
+
+def publish_forecast(data_dir, run_id, meta):
+    """Write the run's meta.json, point latest.json at it and prune older runs."""
+    run_dir = forecasts_path(data_dir, run_id)
+    with open(os.path.join(run_dir, "meta.json"), "w") as f:
+        json.dump(dict(meta, format_version=FORMAT_VERSION, run_id=run_id), f)
+    
+    latest_path = forecasts_path(data_dir, LATEST_FILE)
+    tmp_path = f"{latest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"run_id": run_id}, f)
+    os.replace(tmp_path, latest_path)
+    
+    # Run ids do not sort by publication (a backfill names an older date), so
+    # order published runs by when their meta.json was written. Runs without
+    # one may still be filling in another process and are left alone
+    runs = []
+    for name in os.listdir(forecasts_path(data_dir)):
+        meta_path = forecasts_path(data_dir, name, "meta.json")
+        if name != run_id and os.path.isfile(meta_path):
+            runs.append((os.stat(meta_path).st_mtime_ns, name))
+    runs.sort()
+    for _, name in runs[:max(0, len(runs) - (KEEP_RUNS - 1))]:
+        shutil.rmtree(forecasts_path(data_dir, name), ignore_errors=True)
+    return run_dir
+
+class PrecomputedForecast:
+    """One published forecast run, memory-mapped read-only."""
+    
+    def __init__(self, run_dir):
+        with open(os.path.join(run_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forecast format version {self.meta['format_version']}")
+        self.arrays = open_forecast_arrays(run_dir)
+        hotel_ids = np.load(os.path.join(run_dir, "hotel_ids.npy"), allow_pickle=False).tolist()
+        self._row = {hotel_id: i for i, hotel_id in enumerate(hotel_ids)}
+    
+    @property
+    def data_version(self):
+        return self.meta["data_version"]
+    
+    @property
+    def run_date(self):
+        return self.meta["run_date"]
+    
+    def __len__(self):
+        return len(self._row)
+    
+    def get(self, hotel_id):
+        """One hotel's precomputed price and staffing forecast, or None."""
+        h = self._row.get(hotel_id)
+        if h is None:
+            return None
+        
+        prices = self.arrays["prices"][h].tolist()
+        staffing = self.arrays["staffing"][h].tolist()
+        staffing_cost = self.arrays["staffing_cost"][h].tolist()
+        departments = self.meta["departments"]
+        
+        return {
+            "hotel_id": hotel_id,
+            "run_date": self.run_date,
+            "price_forecast": [{"date": date, "price": round(price, 2)}
+                               for date, price in zip(self.meta["price_dates"], prices)],
+            "staffing_forecast": [{
+                "date": date,
+                "staffing": dict(zip(departments, staff)),
+                "total_staff": sum(staff),
+                "daily_cost": cost
+            } for date, staff, cost in zip(self.meta["staffing_dates"], staffing, staffing_cost)],
+            "total_weekly_cost": sum(staffing_cost)
+        }
+
+class ForecastStore:
+    """
+    Serves the latest published forecast run. The run is reopened when
+    latest.json changes, so the API picks up a new nightly run without a
+    restart. Only checks a file's mtime per lookup.
+    """
+    
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._forecast = None
+        self._latest_mtime = None
+    
+    def current(self):
+        """The latest published PrecomputedForecast, or None if no run exists."""
+        try:
+            mtime = os.stat(forecasts_path(self.data_dir, LATEST_FILE)).st_mtime_ns
+        except OSError:
+            return None
+        
+        if mtime != self._latest_mtime:
+            try:
+                with open(forecasts_path(self.data_dir, LATEST_FILE)) as f:
+                    run_id = json.load(f)["run_id"]
+                self._forecast = PrecomputedForecast(forecasts_path(self.data_dir, run_id))
+            except Exception as e:
+                print(f"Error loading precomputed forecast: {e}")
+                self._forecast = None
+            self._latest_mtime = mtime
+        return self._forecast
+    
+    def stats(self):
+        forecast = self.current()
+        if forecast is None:
+            return {"available": False}
+        return dict(forecast.meta, available=True, hotels=len(forecast))
@@ -0,0 +1,163 @@
+import copy
+import math
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Mean Earth radius and the length of one degree of latitude
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Events within this distance of a hotel count as nearby
+EVENT_RADIUS_KM = float(os.environ.get("HOTEL_OPTIMIZER_EVENT_RADIUS_KM", 25))
+
+# Grid cell edge; about the event radius, so a query touches a 3x3 block of cells
+GRID_CELL_KM = 25.0
+
+def coordinates(row):
+    """(latitude, longitude) of a hotel or event record, or None if it has none."""
+    if row.latitude is None or row.longitude is None:
+        return None
+    return row.latitude, row.longitude
+
+def place_key(row):
+    """Hotels with the same key have the same nearby events."""
+    return row.location, row.latitude, row.longitude
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in km."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def day_range(date_str):
+    """Half-open (start, end) date range covering one ISO date."""
+    next_day = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)
+    return date_str, next_day.strftime("%Y-%m-%d")
+
+class GridGeometry:
+    """
+    Uniform latitude/longitude grid: cells are cell_km tall and span the
+    same number of degrees of longitude. Columns wrap at the antimeridian.
+    """
+    
+    def __init__(self, cell_km=GRID_CELL_KM):
+        self.cell_km = cell_km
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.columns = math.ceil(360 / self.cell_deg)
+    
+    def cell(self, latitude, longitude):
+        """(row, column) of the cell holding a point."""
+        return math.floor(latitude / self.cell_deg), math.floor((longitude + 180) / self.cell_deg) % self.columns
+    
+    def cell_id(self, latitude, longitude):
+        """The cell as a single integer, for storage."""
+        row, column = self.cell(latitude, longitude)
+        return row * self.columns + column
+    
+    def _column_span(self, west, east):
+        # west and east in degrees east of the antimeridian, 0 <= west <= east <= 360
+        return range(math.floor(west / self.cell_deg), min(math.floor(east / self.cell_deg), self.columns - 1) + 1)
+    
+    def cells_within(self, latitude, longitude, radius_km):
+        """Every cell that can hold a point within radius_km of (latitude, longitude)."""
+        dlat = radius_km / KM_PER_DEGREE
+        rows = range(math.floor((latitude - dlat) / self.cell_deg), math.floor((latitude + dlat) / self.cell_deg) + 1)
+        
+        # A degree of longitude shrinks toward the poles; size the span for the band's poleward edge
+        cos_lat = math.cos(math.radians(min(90.0, abs(latitude) + dlat)))
+        if cos_lat * 180 * KM_PER_DEGREE <= radius_km:
+            columns = range(self.columns)
+        else:
+            dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+            west, east = longitude + 180 - dlon, longitude + 180 + dlon
+            if east - west >= 360:
+                columns = range(self.columns)
+            else:
+                columns = set()
+                if west < 0:
+                    columns.update(self._column_span(west + 360, 360))
+                if east > 360:
+                    columns.update(self._column_span(0, east - 360))
+                columns.update(self._column_span(max(west, 0), min(east, 360)))
+        return [(row, column) for row in rows for column in columns]
+    
+    def cell_id_ranges(self, latitude, longitude, radius_km):
+        """cells_within as inclusive (first, last) runs of consecutive cell ids, for range scans."""
+        ranges = []
+        for cell_id in sorted(row * self.columns + column
+                              for row, column in self.cells_within(latitude, longitude, radius_km)):
+            if ranges and cell_id == ranges[-1][1] + 1:
+                ranges[-1][1] = cell_id
+            else:
+                ranges.append([cell_id, cell_id])
+        return ranges
+
+class PointGrid:
+    """
+    Spatial index over (key, latitude, longitude, item) entries. Each grid
+    cell keeps its entries sorted by key (a date, a portfolio position), so
+    a radius query visits only the cells the circle overlaps, bisects each
+    to the key range and checks the exact distance of what is left. Cost
+    depends on the points near the query, not on the size of the index.
+    """
+    
+    def __init__(self, entries=(), geometry=None):
+        self.geometry = geometry or GridGeometry()
+        cells = defaultdict(list)
+        for entry in entries:
+            cells[self.geometry.cell(entry[1], entry[2])].append(entry)
+        # cell -> (sorted keys, entries in key order)
+        self._cells = {}
+        for cell, rows in cells.items():
+            self._set_cell(cell, rows)
+    
+    def _set_cell(self, cell, rows):
+        if not rows:
+            self._cells.pop(cell, None)
+            return
+        rows.sort(key=lambda entry: entry[0])
+        self._cells[cell] = ([entry[0] for entry in rows], rows)
+    
+    def with_entries(self, added=(), removed=()):
+        """
+        Return a new grid with entries added and the items of removed
+        entries dropped. Only the affected cells are rebuilt; the rest are
+        shared with this grid, which is left unchanged.
+        """
+        removed_items = {id(entry[3]) for entry in removed}
+        by_cell = defaultdict(list)
+        for entry in removed:
+            by_cell[self.geometry.cell(entry[1], entry[2])]
+        for entry in added:
+            by_cell[self.geometry.cell(entry[1], entry[2])].append(entry)
+        
+        grid = copy.copy(self)
+        grid._cells = dict(self._cells)
+        for cell, rows in by_cell.items():
+            _, existing = self._cells.get(cell, ((), ()))
+            grid._set_cell(cell, [entry for entry in existing if id(entry[3]) not in removed_items] + rows)
+        return grid
+    
+    def __len__(self):
+        return sum(len(keys) for keys, _ in self._cells.values())
+    
+    def cell_count(self):
+        return len(self._cells)
+    
+    def within(self, latitude, longitude, radius_km, low=None, high=None):
+        """Items within radius_km of the point with low <= key < high, in key order."""
+        matches = []
+        for cell in self.geometry.cells_within(latitude, longitude, radius_km):
+            found = self._cells.get(cell)
+            if not found:
+                continue
+            keys, rows = found
+            first = 0 if low is None else bisect_left(keys, low)
+            last = len(keys) if high is None else bisect_left(keys, high)
+            for key, lat, lon, item in rows[first:last]:
+                if haversine_km(latitude, longitude, lat, lon) <= radius_km:
+                    matches.append((key, item))
+        matches.sort(key=lambda match: match[0])
+        return [item for _, item in matches]
@@ -0,0 +1,168 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from itertools import accumulate
+
+# A prefix matching up to this many distinct words is answered by merging
+# their position lists lazily; broader prefixes (e.g. "h", matching every
+# hotel id) are merged once and the result kept for later pages
+MERGE_WORDS_MAX = 64
+PREFIX_MEMO_SIZE = 128
+
+def query_words(text):
+    """Lower-cased words of a search query or hotel text."""
+    return re.findall(r"\w+", text.lower())
+
+def search_words(hotel):
+    """Lower-cased words a hotel can be found by, in order: its id, then the words of its name and location."""
+    return query_words(f"{hotel.hotel_id} {hotel.name} {hotel.location}")
+
+def search_terms(hotel):
+    """Distinct search words of a hotel."""
+    return set(search_words(hotel))
+
+def matches_phrase(words, prefixes):
+    """Whether consecutive words start with each of prefixes in turn."""
+    n = len(prefixes)
+    return any(all(word.startswith(prefix) for word, prefix in zip(words[i:i + n], prefixes))
+               for i in range(len(words) - n + 1))
+
+def positions_after(positions, after):
+    """Lazily iterate the sorted positions greater than `after`, without copying the list."""
+    return (positions[i] for i in range(bisect_right(positions, after), len(positions)))
+
+class HotelSearchIndex:
+    """
+    Hotel listing index built once per data load. Hotels are addressed by
+    their position in portfolio order, and every filter yields sorted
+    positions: country and location are hash indexes, prefix search is a
+    bisect over the sorted word list plus a merge of the matching words'
+    position lists. Pagination resumes after a position, so each page
+    costs O(page size) rather than O(portfolio size); a broad prefix pays
+    for its merge once and is memoized.
+    """
+    
+    def __init__(self, hotels):
+        self.hotels = hotels
+        
+        by_country = defaultdict(list)
+        by_location = defaultdict(list)
+        by_word = defaultdict(list)
+        for position, hotel in enumerate(hotels):
+            by_country[hotel.country.lower()].append(position)
+            by_location[hotel.location.lower()].append(position)
+            for term in search_terms(hotel):
+                by_word[term].append(position)
+        self._by_country = dict(by_country)
+        self._by_location = dict(by_location)
+        
+        # Distinct words in sorted order, so a prefix is one contiguous range,
+        # each with its sorted positions; offsets count positions up to a word
+        self._words = sorted(by_word)
+        self._word_positions = [by_word[word] for word in self._words]
+        self._word_offsets = [0, *accumulate(len(positions) for positions in self._word_positions)]
+        self._prefix_memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+    
+    def _prefix_range(self, prefix):
+        lo = bisect_left(self._words, prefix)
+        return lo, bisect_left(self._words, prefix + "\uffff", lo)
+    
+    def prefix_size(self, prefix):
+        """Upper bound on the hotels matching a prefix: the positions of its words."""
+        lo, hi = self._prefix_range(prefix.lower())
+        return self._word_offsets[hi] - self._word_offsets[lo]
+    
+    def prefix_positions(self, prefix, after=-1):
+        """Iterate, in order, the positions after `after` of hotels with any word starting with prefix."""
+        prefix = prefix.lower()
+        lo, hi = self._prefix_range(prefix)
+        if hi - lo > MERGE_WORDS_MAX:
+            return positions_after(self._merged_positions(prefix, lo, hi), after)
+        return self._merge(lo, hi, after)
+    
+    def _merge(self, lo, hi, after=-1):
+        # Each word's positions start after `after`; a hotel with several matching words is yielded once
+        runs = [positions_after(positions, after) for positions in self._word_positions[lo:hi]]
+        last = after
+        for position in heapq.merge(*runs):
+            if position != last:
+                last = position
+                yield position
+    
+    def _merged_positions(self, prefix, lo, hi):
+        with self._memo_lock:
+            positions = self._prefix_memo.get(prefix)
+            if positions is not None:
+                self._prefix_memo.move_to_end(prefix)
+                return positions
+        positions = list(self._merge(lo, hi))
+        with self._memo_lock:
+            self._prefix_memo[prefix] = positions
+            while len(self._prefix_memo) > PREFIX_MEMO_SIZE:
+                self._prefix_memo.popitem(last=False)
+        return positions
+    
+    def search(self, country=None, location=None, prefix=None, min_rating=None, max_rating=None,
+               after=-1, limit=50):
+        """
+        Return (hotels, last_position) for up to limit hotels after position
+        `after` that match every given filter, in portfolio order.
+        last_position is None when there are no further matches.
+        """
+        country = country.lower() if country else None
+        location = location.lower() if location else None
+        # A multi-word prefix ("grand hot") walks the index of its most selective word
+        # and is checked as a phrase per hotel
+        phrase = query_words(prefix) if prefix else []
+        if prefix and not phrase:
+            return [], None
+        prefix = min(phrase, key=self.prefix_size) if phrase else None
+        
+        # Walk the most selective index; the other filters are checked per hotel.
+        # Candidates are (size, index name) so only the chosen one is iterated
+        candidates = []
+        if country:
+            candidates.append((len(self._by_country.get(country, [])), "country"))
+        if location:
+            candidates.append((len(self._by_location.get(location, [])), "location"))
+        if prefix:
+            candidates.append((self.prefix_size(prefix), "prefix"))
+        if candidates:
+            _, chosen = min(candidates)
+            if chosen == "prefix":
+                positions = self.prefix_positions(prefix, after)
+            else:
+                index = self._by_country.get(country, []) if chosen == "country" else self._by_location.get(location, [])
+                positions = positions_after(index, after)
+        else:
+            positions = range(after + 1, len(self.hotels))
+        
+        def matches(hotel):
+            if country and hotel.country.lower() != country:
+                return False
+            if location and hotel.location.lower() != location:
+                return False
+            if phrase and not matches_phrase(search_words(hotel), phrase):
+                return False
+            if min_rating is not None and hotel.rating < min_rating:
+                return False
+            if max_rating is not None and hotel.rating > max_rating:
+                return False
+            return True
+        
+        page = []
+        last_position = None
+        for position in positions:
+            hotel = self.hotels[position]
+            if not matches(hotel):
+                continue
+            if len(page) == limit:
+                # Another match exists, so there is a next page after the last hotel returned
+                last_position = page_last
+                break
+            page.append(hotel)
+            page_last = position
+        return page, last_position
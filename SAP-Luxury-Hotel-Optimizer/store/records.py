@@ -0,0 +1,103 @@
+import sys
+from dataclasses import dataclass
+
+class Record:
+    """
+    Base for the compact domain records. Fields live in __slots__, so a row
+    costs one small object instead of a dict. Mapping-style access
+    (record["hotel_id"], .get(), .keys(), dict(record)) is kept so callers
+    written against dict rows, templates and the API boundary keep working.
+    """
+    
+    __slots__ = ()
+    
+    # Field values repeated across many rows; interned so rows share one string
+    interned = ()
+    
+    # Fields that may be missing from a row; left out of to_dict() while unset
+    optional = ()
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __contains__(self, key):
+        return key in self.__slots__
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def keys(self):
+        return self.__slots__
+    
+    def to_dict(self):
+        row = {name: getattr(self, name) for name in self.__slots__}
+        for name in self.optional:
+            if row[name] is None:
+                del row[name]
+        return row
+    
+    @classmethod
+    def from_dict(cls, row):
+        """Build a record from a dict row, ignoring unknown keys."""
+        values = {name: row[name] for name in cls.__slots__ if name in row}
+        for name in cls.interned:
+            if name in values:
+                values[name] = sys.intern(values[name])
+        return cls(**values)
+
+@dataclass(slots=True)
+class Hotel(Record):
+    hotel_id: str
+    name: str
+    location: str
+    country: str
+    rooms: int
+    rating: float
+    # Optional; rows without coordinates match events by location name
+    latitude: float = None
+    longitude: float = None
+    
+    interned = ("hotel_id", "location", "country")
+    optional = ("latitude", "longitude")
+
+@dataclass(slots=True)
+class Booking(Record):
+    hotel_id: str
+    date: str
+    bookings: int
+    
+    interned = ("hotel_id", "date")
+
+@dataclass(slots=True)
+class Event(Record):
+    event_id: str
+    name: str
+    date: str
+    location: str
+    expected_attendance: int = 0
+    latitude: float = None
+    longitude: float = None
+    
+    interned = ("date", "location")
+    optional = ("latitude", "longitude")
+
+@dataclass(slots=True)
+class Competitor(Record):
+    hotel_id: str
+    competitor_price: float
+    
+    interned = ("hotel_id",)
+
+def as_records(record_class, rows):
+    """
+    Convert dict rows to records. Lists that already hold records and
+    non-list row containers (e.g. columnar stores) are returned unchanged.
+    """
+    if isinstance(rows, list) and any(isinstance(row, dict) for row in rows):
+        return [row if isinstance(row, Record) else record_class.from_dict(row) for row in rows]
+    if isinstance(rows, tuple):
+        return as_records(record_class, list(rows))
+    return rows
@@ -0,0 +1,246 @@
+import copy
+import hashlib
+import json
+import time
+from collections import defaultdict
+from store.aggregates import BookingAggregates, PortfolioStats
+from store.calendar import EventCalendar
+from store.geo import EVENT_RADIUS_KM, PointGrid, coordinates
+from store.hotel_index import HotelSearchIndex
+from store.records import Booking, Competitor, Event, Hotel, as_records
+
+def delta_digest(version, bookings, events, competitors):
+    """
+    Short digest of a delta chained onto the version it was applied to.
+    Workers that apply different deltas to the same data end up with
+    different versions, so they never share cache entries.
+    """
+    payload = json.dumps([version] + [[row.to_dict() for row in rows] for rows in (bookings, events, competitors)],
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=6).hexdigest()
+
+class BookingRows:
+    """
+    The booking rows of a snapshot: the rows as loaded, with the rows of
+    hotels changed by with_changes() laid over them. Iterating yields a
+    changed hotel's current rows where its first loaded row was (or at the
+    end for a hotel that had none), so callers see post-delta data.
+    """
+    
+    def __init__(self, loaded, changed=None, size_change=0):
+        self.loaded = loaded
+        self.changed = changed or {}
+        self.size_change = size_change
+    
+    def __len__(self):
+        return len(self.loaded) + self.size_change
+    
+    def __iter__(self):
+        if not self.changed:
+            yield from self.loaded
+            return
+        emitted = set()
+        for b in self.loaded:
+            if b.hotel_id not in self.changed:
+                yield b
+            elif b.hotel_id not in emitted:
+                emitted.add(b.hotel_id)
+                yield from self.changed[b.hotel_id]
+        for hotel_id, rows in self.changed.items():
+            if hotel_id not in emitted:
+                yield from rows
+
+class HotelRepository:
+    """
+    Shared in-memory data access layer for the pricing and staffing engines
+    and the Flask routes. Hash indexes are built once at load time so that
+    every lookup is O(1) instead of a scan over the module-level lists.
+    """
+    
+    def __init__(self, hotels, bookings, events, competitors, version=""):
+        # Dict rows are converted to compact records; record lists and columnar stores pass through
+        self.hotels = as_records(Hotel, hotels)
+        # Rows as loaded; the indexes are built from these
+        self.loaded_bookings = as_records(Booking, bookings)
+        # hotel_id -> current rows for hotels changed by with_changes(), and the row count change
+        self._changed_bookings = {}
+        self._booking_size_change = 0
+        self.events = as_records(Event, events)
+        self.competitors = as_records(Competitor, competitors)
+        self.version = version
+        self.index_build_seconds = 0.0
+        self.build_indexes()
+        
+    def build_indexes(self):
+        """Build hotel, booking, event and competitor indexes."""
+        started = time.perf_counter()
+        self.index_hotels()
+        self.index_bookings()
+        self.index_booking_aggregates()
+        self.index_events()
+        self.index_competitors()
+        self.index_build_seconds = time.perf_counter() - started
+        return self.index_build_seconds
+    
+    def index_hotels(self):
+        """Index hotel_id -> hotel, location -> hotels and hotel coordinates, plus the dashboard totals."""
+        self._hotels_by_id = {h.hotel_id: h for h in self.hotels}
+        self._hotel_position = {h.hotel_id: i for i, h in enumerate(self.hotels)}
+        hotels_by_location = defaultdict(list)
+        for h in self.hotels:
+            hotels_by_location[h.location].append(h)
+        self._hotels_by_location = dict(hotels_by_location)
+        # Keyed by portfolio position, so radius queries return hotels in portfolio order
+        self.hotel_grid = PointGrid((i, h.latitude, h.longitude, h)
+                                    for i, h in enumerate(self.hotels) if coordinates(h) is not None)
+        self.hotel_index = HotelSearchIndex(self.hotels)
+        self.portfolio_stats = PortfolioStats(self.hotels)
+        
+    def index_bookings(self):
+        """Index hotel_id -> bookings (keeps the original row order)."""
+        bookings_by_hotel = defaultdict(list)
+        for b in self.loaded_bookings:
+            bookings_by_hotel[b.hotel_id].append(b)
+        self._bookings_by_hotel = dict(bookings_by_hotel)
+        
+    def index_booking_aggregates(self):
+        """Precompute per-hotel booking counts, totals and per-date totals."""
+        self.booking_aggregates = BookingAggregates.from_bookings(self.loaded_bookings)
+        
+    def index_events(self):
+        """Index events by location and date."""
+        self.event_calendar = EventCalendar(self.events)
+        
+    def index_competitors(self):
+        """Index hotel_id -> competitor price (first row wins, like the old scan)."""
+        self._competitor_price = {}
+        for c in self.competitors:
+            self._competitor_price.setdefault(c.hotel_id, c.competitor_price)
+    
+    @property
+    def bookings(self):
+        """Every booking row of this snapshot, deltas included."""
+        return BookingRows(self.loaded_bookings, self._changed_bookings, self._booking_size_change)
+    
+    def with_changes(self, bookings=(), events=(), competitors=()):
+        """
+        Return a new repository snapshot with booking, event and competitor
+        deltas applied. A booking replaces existing rows for the same
+        (hotel_id, date); an event replaces the existing event with the same
+        event_id; a competitor row replaces the hotel's competitor price.
+        Indexes are copied on write, so only the affected hotels and
+        locations are touched and this snapshot stays valid for readers
+        still using it.
+        """
+        bookings = as_records(Booking, list(bookings))
+        events = as_records(Event, list(events))
+        competitors = as_records(Competitor, list(competitors))
+        snapshot = copy.copy(self)
+        snapshot.version = f"{self.version.split('+')[0]}+{delta_digest(self.version, bookings, events, competitors)}"
+        
+        if bookings:
+            by_hotel = defaultdict(list)
+            for b in bookings:
+                by_hotel[b.hotel_id].append(b)
+            snapshot._bookings_by_hotel = dict(self._bookings_by_hotel)
+            snapshot._changed_bookings = dict(self._changed_bookings)
+            for hotel_id, rows in by_hotel.items():
+                new_dates = {b.date for b in rows}
+                existing = self.get_hotel_bookings(hotel_id)
+                merged = [b for b in existing if b.date not in new_dates]
+                merged.extend(rows)
+                snapshot._bookings_by_hotel[hotel_id] = merged
+                snapshot._changed_bookings[hotel_id] = merged
+                snapshot._booking_size_change += len(merged) - len(existing)
+            snapshot.booking_aggregates = self.booking_aggregates.with_bookings(bookings)
+        
+        if events:
+            snapshot.event_calendar = self.event_calendar.with_events(events)
+            snapshot.events = snapshot.event_calendar.all_events()
+        
+        if competitors:
+            snapshot._competitor_price = dict(self._competitor_price)
+            for c in competitors:
+                snapshot._competitor_price[c.hotel_id] = c.competitor_price
+        return snapshot
+    
+    def get_hotel_details(self, hotel_id):
+        """Get details for a specific hotel."""
+        return self._hotels_by_id.get(hotel_id)
+    
+    def get_hotel_bookings(self, hotel_id):
+        """Get all bookings for a specific hotel."""
+        return self._bookings_by_hotel.get(hotel_id, [])
+    
+    def get_booking_stats(self, hotel_id):
+        """Get precomputed booking aggregates for a hotel, or None without bookings."""
+        return self.booking_aggregates.get(hotel_id)
+    
+    def hotels_with_bookings(self):
+        """Number of hotels that have at least one booking row."""
+        return len(self._bookings_by_hotel)
+    
+    def hotels_with_competitors(self):
+        """Number of hotels that have a competitor price."""
+        return len(self._competitor_price)
+    
+    def get_hotels_at(self, location):
+        """Get hotels at a location, in portfolio order."""
+        return self._hotels_by_location.get(location, [])
+    
+    def search_hotels(self, country=None, location=None, prefix=None, min_rating=None, max_rating=None,
+                      after=-1, limit=50):
+        """Filtered, paginated hotel listing; see HotelSearchIndex.search."""
+        return self.hotel_index.search(country, location, prefix, min_rating, max_rating, after, limit)
+    
+    def hotel_position(self, hotel_id):
+        """Position of a hotel in the portfolio order."""
+        return self._hotel_position[hotel_id]
+    
+    def get_nearby_events(self, location, date=None):
+        """Get events near a specific location and optionally on a specific date."""
+        if date:
+            return self.event_calendar.on(location, date)
+        return self.event_calendar.at(location)
+    
+    def get_events_between(self, location, start, end):
+        """Get events at a location with start <= date < end."""
+        return self.event_calendar.between(location, start, end)
+    
+    def events_within(self, hotel, radius_km=EVENT_RADIUS_KM, date_range=None):
+        """
+        Get events within radius_km of a hotel, optionally only those with
+        start <= date < end for date_range=(start, end). Rows without
+        coordinates match by location name instead.
+        """
+        return self.event_calendar.within(hotel, radius_km, date_range)
+    
+    def hotels_near(self, event, radius_km=EVENT_RADIUS_KM):
+        """Get the hotels an event is within radius_km of, in portfolio order; the inverse of events_within."""
+        at_location = self.get_hotels_at(event.location)
+        point = coordinates(event)
+        if point is None:
+            return at_location
+        hotels = self.hotel_grid.within(point[0], point[1], radius_km)
+        unplaced = [h for h in at_location if coordinates(h) is None]
+        if unplaced:
+            hotels = sorted(hotels + unplaced, key=lambda h: self._hotel_position[h.hotel_id])
+        return hotels
+    
+    def get_competitor_price(self, hotel_id):
+        """Get competitor price for a specific hotel."""
+        return self._competitor_price.get(hotel_id)
+    
+    def index_stats(self):
+        """Summarize index sizes and build time for diagnostics."""
+        return {
+            "hotels": len(self._hotels_by_id),
+            "hotels_with_bookings": self.hotels_with_bookings(),
+            "booking_aggregates": len(self.booking_aggregates),
+            "event_locations": len(self.event_calendar.locations()),
+            "event_location_dates": self.event_calendar.location_dates(),
+            "hotels_with_coordinates": len(self.hotel_grid),
+            "events_with_coordinates": self.event_calendar.placed(),
+            "competitors": self.hotels_with_competitors(),
+            "index_build_ms": round(self.index_build_seconds * 1000, 2)
+        }
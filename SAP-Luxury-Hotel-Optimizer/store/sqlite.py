@@ -0,0 +1,419 @@
+import heapq
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+from store.aggregates import BookingAggregates, HotelBookingStats
+from store.calendar import EventCalendar, event_date, match_events
+from store.geo import GridGeometry, coordinates, haversine_km
+from store.records import Booking, Competitor, Event, Hotel
+from store.repository import HotelRepository
+
+# Bump when the schema changes
+FORMAT_VERSION = 2
+
+SQLITE_FILE = "hotels.db"
+
+# Tables mirror the record types, columns in record field order
+TABLES = [Hotel, Booking, Event, Competitor]
+
+INDEXES = [
+    "CREATE INDEX hotels_hotel_id ON hotels (hotel_id)",
+    # Covers the per-hotel booking lookups and the aggregate scan
+    "CREATE INDEX bookings_hotel_date ON bookings (hotel_id, date, bookings)",
+    "CREATE INDEX events_location_date ON events (location, date)",
+    "CREATE INDEX events_date ON events (date)",
+    # Spatial lookups scan a few runs of grid cells, each narrowed by date
+    "CREATE INDEX events_grid_cell_date ON events (grid_cell, date)",
+    "CREATE INDEX competitors_hotel_id ON competitors (hotel_id)"
+]
+
+COLUMN_TYPES = {str: "TEXT", int: "INTEGER", float: "REAL"}
+
+# Lookup queries; sqlite3 keeps each one prepared in the connection's statement cache
+BOOKINGS_FOR_HOTEL = "SELECT hotel_id, date, bookings FROM bookings WHERE hotel_id = ? ORDER BY rowid"
+BOOKING_TOTALS = "SELECT hotel_id, COUNT(*), SUM(bookings) FROM bookings GROUP BY hotel_id"
+EVENT_COLUMNS = "SELECT event_id, name, date, location, expected_attendance, latitude, longitude FROM events"
+EVENTS_AT = f"{EVENT_COLUMNS} WHERE location = ? ORDER BY rowid"
+EVENTS_ON = f"{EVENT_COLUMNS} WHERE location = ? AND date = ? ORDER BY rowid"
+EVENTS_AT_BETWEEN = f"{EVENT_COLUMNS} WHERE location = ? AND date >= ? AND date < ? ORDER BY date, rowid"
+EVENTS_BETWEEN = f"{EVENT_COLUMNS} WHERE date >= ? AND date < ? ORDER BY date, rowid"
+COMPETITOR_PRICE = "SELECT competitor_price FROM competitors WHERE hotel_id = ? ORDER BY rowid LIMIT 1"
+
+def sqlite_path(base_path):
+    return os.path.join(base_path, SQLITE_FILE)
+
+def table_name(record_class):
+    return f"{record_class.__name__.lower()}s"
+
+def create_table(record_class):
+    # Optional fields (default None) are nullable
+    columns = ", ".join(f"{field.name} {COLUMN_TYPES[field.type]}{'' if field.default is None else ' NOT NULL'}"
+                        for field in record_class.__dataclass_fields__.values())
+    return f"CREATE TABLE {table_name(record_class)} ({columns})"
+
+def row_values(record_class, rows):
+    """Yield each dict row or record as a tuple in the table's column order."""
+    fields = record_class.__slots__
+    for row in rows:
+        if isinstance(row, dict):
+            row = record_class.from_dict(row)
+        yield tuple(getattr(row, name) for name in fields)
+
+def write_sqlite(base_path, hotels, bookings, events, competitors, source_version=None):
+    """
+    Bulk-import the dataset into base_path/hotels.db. All rows go in one
+    transaction with journaling off, indexes are built after the load, and
+    the file is written under a temporary name and renamed into place, so
+    readers never open a partial database. Events with coordinates get their
+    spatial grid cell stored alongside. source_version, the source_version()
+    of the JSON files, is kept in the meta table.
+    """
+    geometry = GridGeometry()
+    path = sqlite_path(base_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    connection = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("BEGIN")
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for record_class, rows in zip(TABLES, [hotels, bookings, events, competitors]):
+            connection.execute(create_table(record_class))
+            placeholders = ", ".join("?" * len(record_class.__slots__))
+            connection.executemany(f"INSERT INTO {table_name(record_class)} VALUES ({placeholders})",
+                                   row_values(record_class, rows))
+        connection.create_function("grid_cell", 2, geometry.cell_id, deterministic=True)
+        connection.execute("ALTER TABLE events ADD COLUMN grid_cell INTEGER")
+        connection.execute("UPDATE events SET grid_cell = grid_cell(latitude, longitude) "
+                           "WHERE latitude IS NOT NULL AND longitude IS NOT NULL")
+        for statement in INDEXES:
+            connection.execute(statement)
+        connection.execute("INSERT INTO meta VALUES ('format_version', ?)", (str(FORMAT_VERSION),))
+        connection.execute("INSERT INTO meta VALUES ('grid_cell_km', ?)", (str(geometry.cell_km),))
+        if source_version is not None:
+            connection.execute("INSERT INTO meta VALUES ('source_version', ?)", (source_version,))
+        connection.execute("COMMIT")
+        connection.execute("ANALYZE")
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    return path
+
+def sqlite_meta(base_path):
+    """The meta table of base_path/hotels.db as a dict, or None if it cannot be read."""
+    uri = f"file:{quote(os.path.abspath(sqlite_path(base_path)))}?mode=ro"
+    try:
+        connection = sqlite3.connect(uri, uri=True)
+        try:
+            return dict(connection.execute("SELECT key, value FROM meta"))
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+
+def has_sqlite(base_path):
+    """Check whether a SQLite database in the current format exists under base_path."""
+    if not os.path.exists(sqlite_path(base_path)):
+        return False
+    meta = sqlite_meta(base_path)
+    return meta is not None and meta.get("format_version") == str(FORMAT_VERSION)
+
+def sqlite_source_version(base_path):
+    """The source version recorded in base_path/hotels.db, or None."""
+    return (sqlite_meta(base_path) or {}).get("source_version")
+
+class SQLiteConnectionPool:
+    """
+    Read-only connections to one database file, shared by request threads.
+    A query checks a connection out and returns it when done, so threads
+    reuse open connections (and their statement caches) instead of opening
+    one each. Up to size idle connections are kept; connections opened
+    beyond that when every one is busy are closed on return. The pool is
+    reset after a fork, so worker processes never share a connection. The
+    file is memory-mapped, so workers on one host share its pages through
+    the OS page cache instead of each holding a copy of the data.
+    """
+    
+    def __init__(self, path, mmap_size=256 * 1024 * 1024, size=8):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.size = size
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.closed = 0
+        self.in_use = 0
+    
+    def _open(self):
+        uri = f"file:{quote(os.path.abspath(self.path))}?mode=ro"
+        # Used by one thread at a time, but not always the thread that opened it
+        connection = sqlite3.connect(uri, uri=True, cached_statements=64, check_same_thread=False)
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return connection
+    
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the with block."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Connections inherited from the parent process are left alone
+                self._idle, self._pid, self.in_use = [], os.getpid(), 0
+            connection = self._idle.pop() if self._idle else None
+            self.in_use += 1
+        if connection is None:
+            try:
+                connection = self._open()
+            except BaseException:
+                with self._lock:
+                    self.in_use -= 1
+                raise
+            with self._lock:
+                self.opened += 1
+        try:
+            yield connection
+        finally:
+            with self._lock:
+                self.in_use -= 1
+                keep = len(self._idle) < self.size and self._pid == os.getpid()
+                if keep:
+                    self._idle.append(connection)
+                else:
+                    self.closed += 1
+            if not keep:
+                connection.close()
+    
+    def query(self, sql, params=()):
+        with self.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+    
+    def scalar(self, sql, params=()):
+        with self.connection() as connection:
+            row = connection.execute(sql, params).fetchone()
+        return row[0] if row else None
+    
+    def stream(self, sql, params=()):
+        """Iterate over a query's rows without fetching them all at once; holds a connection until done."""
+        with self.connection() as connection:
+            yield from connection.execute(sql, params)
+    
+    def stats(self):
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "in_use": self.in_use,
+                    "opened": self.opened, "closed": self.closed}
+
+class SQLiteBookings:
+    """Bookings table; rows are read per hotel instead of being held in memory."""
+    
+    def __init__(self, pool):
+        self.pool = pool
+    
+    def __len__(self):
+        return self.pool.scalar("SELECT COUNT(*) FROM bookings")
+    
+    def __iter__(self):
+        for row in self.pool.stream("SELECT hotel_id, date, bookings FROM bookings ORDER BY rowid"):
+            yield Booking(*row)
+    
+    def rows_for(self, hotel_id):
+        """One hotel's bookings as Booking records, in their original order."""
+        return [Booking(*row) for row in self.pool.query(BOOKINGS_FOR_HOTEL, (hotel_id,))]
+    
+    def totals(self):
+        """(hotel_id, rows, bookings) for every hotel with bookings."""
+        return self.pool.query(BOOKING_TOTALS)
+    
+    def hotel_ids(self):
+        return {row[0] for row in self.pool.query("SELECT DISTINCT hotel_id FROM bookings")}
+
+class SQLiteCompetitors:
+    """Competitors table; prices are looked up per hotel."""
+    
+    def __init__(self, pool):
+        self.pool = pool
+    
+    def __len__(self):
+        return self.pool.scalar("SELECT COUNT(*) FROM competitors")
+    
+    def __iter__(self):
+        for row in self.pool.stream("SELECT hotel_id, competitor_price FROM competitors ORDER BY rowid"):
+            yield Competitor(*row)
+    
+    def price_for(self, hotel_id):
+        """Competitor price of a hotel (first row wins), or None."""
+        return self.pool.scalar(COMPETITOR_PRICE, (hotel_id,))
+    
+    def hotel_ids(self):
+        return {row[0] for row in self.pool.query("SELECT DISTINCT hotel_id FROM competitors")}
+
+class SQLiteEventCalendar:
+    """
+    EventCalendar over the events table. Event deltas are kept in an
+    in-memory EventCalendar overlay; table rows whose event_id a delta
+    replaced are skipped. Iterating yields every event in date order.
+    Spatial lookups read the grid cells stored with each event.
+    """
+    
+    def __init__(self, pool, geometry=None, overlay=None, replaced=frozenset()):
+        self.pool = pool
+        self.geometry = geometry or GridGeometry()
+        self.overlay = overlay or EventCalendar([])
+        self.replaced = replaced
+    
+    def _events(self, sql, params=()):
+        events = [Event(*row) for row in self.pool.query(sql, params)]
+        if self.replaced:
+            events = [e for e in events if e.event_id not in self.replaced]
+        return events
+    
+    def with_events(self, events):
+        """Return a new calendar with events added, replacing events with the same event_id."""
+        new_ids = {e.event_id for e in events if e.event_id}
+        return SQLiteEventCalendar(self.pool, self.geometry, self.overlay.with_events(events), self.replaced | new_ids)
+    
+    def __len__(self):
+        if not self.replaced:
+            return self.pool.scalar("SELECT COUNT(*) FROM events") + len(self.overlay)
+        return sum(1 for _ in self)
+    
+    def __iter__(self):
+        rows = (Event(*row) for row in self.pool.stream(f"{EVENT_COLUMNS} ORDER BY date, rowid"))
+        kept = (e for e in rows if e.event_id not in self.replaced)
+        return heapq.merge(kept, self.overlay.all_events(), key=event_date)
+    
+    def all_events(self):
+        """Every event, in date order; streamed from the table when iterated."""
+        return self
+    
+    def locations(self):
+        if not self.replaced and not len(self.overlay):
+            return {row[0] for row in self.pool.query("SELECT DISTINCT location FROM events")}
+        return {e.location for e in self}
+    
+    def location_dates(self):
+        """Number of distinct (location, date) pairs."""
+        if not self.replaced and not len(self.overlay):
+            return self.pool.scalar("SELECT COUNT(*) FROM (SELECT DISTINCT location, date FROM events)")
+        return len({(e.location, e.date) for e in self})
+    
+    def at(self, location):
+        """All events at a location, in their original order."""
+        return self._events(EVENTS_AT, (location,)) + self.overlay.at(location)
+    
+    def on(self, location, date):
+        """Events at a location on one date."""
+        return self._events(EVENTS_ON, (location, date)) + self.overlay.on(location, date)
+    
+    def between(self, location, start, end):
+        """Events at a location with start <= date < end, in date order."""
+        events = self._events(EVENTS_AT_BETWEEN, (location, start, end))
+        return list(heapq.merge(events, self.overlay.between(location, start, end), key=event_date))
+    
+    def near(self, latitude, longitude, radius_km, date_range=None):
+        """Events with coordinates within radius_km of a point, in date order."""
+        ranges = self.geometry.cell_id_ranges(latitude, longitude, radius_km)
+        sql = f"{EVENT_COLUMNS} WHERE ({' OR '.join(['grid_cell BETWEEN ? AND ?'] * len(ranges))})"
+        params = [cell_id for cell_range in ranges for cell_id in cell_range]
+        if date_range:
+            sql += " AND date >= ? AND date < ?"
+            params.extend(date_range)
+        events = [e for e in self._events(sql + " ORDER BY date, rowid", params)
+                  if haversine_km(latitude, longitude, e.latitude, e.longitude) <= radius_km]
+        return list(heapq.merge(events, self.overlay.near(latitude, longitude, radius_km, date_range), key=event_date))
+    
+    def within(self, hotel, radius_km, date_range=None):
+        """Events near a hotel, in date order; see match_events."""
+        return match_events(self, hotel, radius_km, date_range)
+    
+    def placed(self):
+        """Number of events with coordinates."""
+        if not self.replaced and not len(self.overlay):
+            return self.pool.scalar("SELECT COUNT(*) FROM events WHERE grid_cell IS NOT NULL")
+        return sum(1 for e in self if coordinates(e) is not None)
+    
+    def events_between(self, start, end):
+        """Events at every location with start <= date < end, grouped as {location: events in date order}."""
+        grouped = {}
+        for e in self._events(EVENTS_BETWEEN, (start, end)):
+            grouped.setdefault(e.location, []).append(e)
+        for location, events in self.overlay.events_between(start, end).items():
+            grouped[location] = list(heapq.merge(grouped.get(location, []), events, key=event_date))
+        return grouped
+
+def load_sqlite(base_path):
+    """
+    Open base_path/hotels.db. Hotels are read into memory (one row per
+    property, needed by the listing index and dashboard); bookings, events
+    and competitors stay in the database and are queried per lookup.
+    Returns (hotels, bookings, events, competitors).
+    """
+    pool = SQLiteConnectionPool(sqlite_path(base_path))
+    version = pool.scalar("SELECT value FROM meta WHERE key = 'format_version'")
+    if version != str(FORMAT_VERSION):
+        raise ValueError(f"Unsupported SQLite format version {version}")
+    
+    hotels = [Hotel(*row) for row in pool.query("SELECT * FROM hotels ORDER BY rowid")]
+    geometry = GridGeometry(float(pool.scalar("SELECT value FROM meta WHERE key = 'grid_cell_km'")))
+    return hotels, SQLiteBookings(pool), SQLiteEventCalendar(pool, geometry), SQLiteCompetitors(pool)
+
+class SQLiteHotelRepository(HotelRepository):
+    """HotelRepository whose bookings, events and competitors are queried from SQLite."""
+    
+    def index_bookings(self):
+        """Bookings stay in the database; only start an empty delta overlay."""
+        # hotel_id -> bookings for hotels changed by with_changes()
+        self._bookings_by_hotel = {}
+    
+    def index_booking_aggregates(self):
+        """Per-hotel counts and totals from one grouped query; per-date totals load lazily."""
+        stats = {}
+        for hotel_id, count, total in self.loaded_bookings.totals():
+            load_dates = lambda hotel_id=hotel_id: self.loaded_bookings.rows_for(hotel_id)
+            stats[hotel_id] = HotelBookingStats(count, total, load_dates=load_dates)
+        self.booking_aggregates = BookingAggregates(stats)
+    
+    def index_events(self):
+        """The events table is the calendar."""
+        self.event_calendar = self.events
+    
+    def index_competitors(self):
+        """Competitor prices are looked up per hotel; only start an empty delta overlay."""
+        # hotel_id -> competitor price for hotels changed by with_changes()
+        self._competitor_price = {}
+    
+    def hotels_with_bookings(self):
+        """Number of hotels that have at least one booking row."""
+        return len(self.loaded_bookings.hotel_ids() | set(self._bookings_by_hotel))
+    
+    def hotels_with_competitors(self):
+        return len(self.competitors.hotel_ids() | set(self._competitor_price))
+    
+    def get_hotel_bookings(self, hotel_id):
+        """Get all bookings for a specific hotel."""
+        overlay = self._bookings_by_hotel.get(hotel_id)
+        if overlay is not None:
+            return overlay
+        return self.loaded_bookings.rows_for(hotel_id)
+    
+    def get_competitor_price(self, hotel_id):
+        """Get competitor price for a specific hotel."""
+        if hotel_id in self._competitor_price:
+            return self._competitor_price[hotel_id]
+        return self.competitors.price_for(hotel_id)
+    
+    def index_stats(self):
+        return dict(super().index_stats(), sqlite_connections=self.loaded_bookings.pool.stats())
+
+# Bulk-import an existing JSON data directory.
+if __name__ == "__main__":
+    from store.bootstrap import read_records, source_version
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "data"
+    path = write_sqlite(base_path, *(read_records(base_path, table_name(record_class), record_class)
+                                     for record_class in TABLES), source_version=source_version(base_path))
+    print(f"Wrote {path}")
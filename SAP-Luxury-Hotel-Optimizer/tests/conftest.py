@@ -0,0 +1,90 @@
+import importlib
+import json
+import os
+import sys
+import pytest
+
+# Tests import the app packages (genai, services, store) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store.bootstrap import build_repository, load_data, prepare_data
+
+START_DATE = "2026-07-01"
+
+# A small fixed portfolio: two hotels in Paris, two in Lyon and one without coordinates
+HOTELS = [
+    {"hotel_id": "HOTEL0001", "name": "Seine Palace Hotel", "location": "Paris", "country": "France",
+     "rooms": 200, "rating": 4.5, "latitude": 48.8600, "longitude": 2.3500},
+    {"hotel_id": "HOTEL0002", "name": "Marais House Hotel", "location": "Paris", "country": "France",
+     "rooms": 120, "rating": 3.8, "latitude": 48.8500, "longitude": 2.3600},
+    {"hotel_id": "HOTEL0003", "name": "Rhone Grand Hotel", "location": "Lyon", "country": "France",
+     "rooms": 300, "rating": 5.0, "latitude": 45.7640, "longitude": 4.8357},
+    {"hotel_id": "HOTEL0004", "name": "Harbor Inn Hotel", "location": "Nowhere", "country": "USA",
+     "rooms": 80, "rating": 3.2},
+    {"hotel_id": "HOTEL0005", "name": "Croix Rousse Hotel", "location": "Lyon", "country": "France",
+     "rooms": 60, "rating": 4.0, "latitude": 45.7740, "longitude": 4.8300}
+]
+
+BOOKINGS = [
+    {"hotel_id": f"HOTEL000{h}", "date": f"2026-07-{day:02d}", "bookings": 10 + (h * 7 + day * 3) % 60}
+    for h in range(1, 5) for day in range(1, 11)
+]
+
+EVENTS = [
+    {"event_id": "EVENT1001", "name": "Conference in Paris", "date": "2026-07-02", "location": "Paris",
+     "expected_attendance": 5000, "latitude": 48.8700, "longitude": 2.3400},
+    {"event_id": "EVENT1002", "name": "Festival in Lyon", "date": "2026-07-03", "location": "Lyon",
+     "expected_attendance": 8000, "latitude": 45.7600, "longitude": 4.8400},
+    {"event_id": "EVENT1003", "name": "Concert in Nowhere", "date": "2026-07-04", "location": "Nowhere",
+     "expected_attendance": 2000},
+    # Named after Paris but about 100 km north of it
+    {"event_id": "EVENT1004", "name": "Sports Event in Paris", "date": "2026-07-05", "location": "Paris",
+     "expected_attendance": 3000, "latitude": 49.7600, "longitude": 2.3500}
+]
+
+COMPETITORS = [
+    {"hotel_id": "HOTEL0001", "competitor_price": 400.0},
+    {"hotel_id": "HOTEL0003", "competitor_price": 250.0}
+]
+
+DATA_FORMATS = ["json", "columnar", "sqlite"]
+
+def write_dataset(data_dir):
+    for name, rows in (("hotels", HOTELS), ("bookings", BOOKINGS), ("events", EVENTS),
+                       ("competitors", COMPETITORS)):
+        with open(os.path.join(data_dir, f"{name}.json"), "w") as f:
+            json.dump(rows, f)
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("data"))
+    write_dataset(path)
+    for data_format in DATA_FORMATS:
+        prepare_data(path, data_format)
+    return path
+
+@pytest.fixture(params=DATA_FORMATS)
+def repository(request, data_dir):
+    """A freshly loaded repository for each storage backend."""
+    dataset = load_data(data_dir, request.param)
+    assert request.param == "json" or dataset[request.param]
+    return build_repository(dataset)
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """The Flask app module, loaded from its own copy of the dataset."""
+    path = str(tmp_path_factory.mktemp("app_data"))
+    write_dataset(path)
+    os.environ["HOTEL_OPTIMIZER_DATA_DIR"] = path
+    os.environ["HOTEL_OPTIMIZER_COMPUTE_WORKERS"] = "0"
+    return importlib.import_module("app")
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+@pytest.fixture
+def restore_app_state(app_module):
+    """For tests that apply deltas to the app: reload its data from disk afterwards."""
+    yield app_module.reloader
+    app_module.reloader.reload()
@@ -0,0 +1,77 @@
+from datetime import datetime
+from services.cache import ResponseCache, SQLiteSharedStore, TTLCache
+
+def test_entry_is_stored_under_the_version_it_was_computed_from():
+    cache = ResponseCache(TTLCache(), version="v1")
+    
+    def compute_during_reload():
+        # A reload swaps in new data while the old snapshot is being rendered
+        cache.invalidate("v2")
+        return "old data"
+    
+    assert cache.get_or_compute("page", ["a"], compute_during_reload, version="v1") == "old data"
+    assert cache.get_or_compute("page", ["a"], lambda: "new data") == "new data"
+    assert cache.get_or_compute("page", ["a"], lambda: "recomputed", version="v2") == "new data"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)
+    # "b" was the least recently used
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    clock.now = 10
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 1
+
+def test_size_zero_disables_the_cache():
+    cache = TTLCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") == (False, None)
+
+def test_invalidate_switches_version(tmp_path):
+    shared = SQLiteSharedStore(str(tmp_path / "cache.sqlite"))
+    cache = ResponseCache(TTLCache(), shared, version="v1")
+    other_worker = ResponseCache(TTLCache(), shared, version="v1")
+    lagging_worker = ResponseCache(TTLCache(), shared, version="v0")
+    assert cache.get_or_compute("pricing", ["HOTEL0001"], lambda: {"price": 1}) == {"price": 1}
+    assert lagging_worker.get_or_compute("pricing", ["HOTEL0001"], lambda: {"price": 0}) == {"price": 0}
+    # Another worker on the same version is served from the shared store
+    assert other_worker.get_or_compute("pricing", ["HOTEL0001"], lambda: {"price": -1}) == {"price": 1}
+    
+    cache.invalidate("v2")
+    assert cache.get_or_compute("pricing", ["HOTEL0001"], lambda: {"price": 2}) == {"price": 2}
+    assert cache.stats()["version"] == "v2" and cache.stats()["invalidations"] == 1
+    # Entries of the version left are gone from the shared store as well, other versions are kept
+    assert shared.get(other_worker.make_key("pricing", "HOTEL0001")) == (False, None)
+    assert shared.get(lagging_worker.make_key("pricing", "HOTEL0001")) == (True, {"price": 0})
+    cache.invalidate()
+    assert shared.get(cache.make_key("pricing", "HOTEL0001")) == (True, {"price": 2})
+    other_worker.invalidate("v2")
+    assert other_worker.get_or_compute("pricing", ["HOTEL0001"], lambda: {"price": -1}) == {"price": 2}
+
+def test_reload_invalidates_cached_responses(client, app_module, restore_app_state):
+    url = '/api/pricing/HOTEL0005'
+    before = client.get(url).get_json()
+    hits = app_module.response_cache.local.hits
+    assert client.get(url).get_json() == before
+    assert app_module.response_cache.local.hits == hits + 1
+    
+    # An event next to the hotel today raises its prices
+    event = {"event_id": "EVENT9001", "name": "Fair in Lyon", "date": datetime.now().strftime("%Y-%m-%d"),
+             "location": "Lyon", "expected_attendance": 4000, "latitude": 45.7745, "longitude": 4.8305}
+    response = client.post('/admin/reload', json={"events": [event]})
+    assert response.status_code == 200
+    assert app_module.response_cache.version == response.get_json()["version"]
+    # Recomputed from the new events, not served from the cache
+    assert client.get(url).get_json() != before
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from jobs.nightly_forecast import run_nightly_forecast
+from store.forecasts import FORECASTS_DIR, KEEP_RUNS, LATEST_FILE, allocate_forecast, forecasts_path, publish_forecast
+
+def publish(data_dir, run_id):
+    allocate_forecast(data_dir, run_id, ["HOTEL0001"], 2, 7, ["front_desk"])
+    publish_forecast(data_dir, run_id, {})
+
+def test_runs_in_the_same_second_get_distinct_ids(data_dir, tmp_path):
+    path = str(tmp_path / "data")
+    shutil.copytree(data_dir, path)
+    first = run_nightly_forecast(path, days=2, workers=1, run_date="2026-07-01")
+    second = run_nightly_forecast(path, days=2, workers=1, run_date="2026-07-01")
+    assert first["run_id"] != second["run_id"]
+    with open(forecasts_path(path, LATEST_FILE)) as f:
+        assert json.load(f)["run_id"] == second["run_id"]
+    assert os.path.isdir(forecasts_path(path, first["run_id"]))
+
+def test_publish_prunes_by_publication_order(tmp_path):
+    data_dir = str(tmp_path)
+    # A backfill publishes an earlier run date after later ones
+    for run_id in ["2026-07-02-010000-b", "2026-07-03-010000-c", "2026-07-01-230000-a"]:
+        publish(data_dir, run_id)
+    # Allocated but not yet published, e.g. by a job still running
+    allocate_forecast(data_dir, "2026-06-30-000000-x", ["HOTEL0001"], 2, 7, ["front_desk"])
+    publish(data_dir, "2026-07-01-230500-d")
+    
+    runs = sorted(name for name in os.listdir(forecasts_path(data_dir)) if name != LATEST_FILE)
+    assert len(runs) == KEEP_RUNS + 1
+    assert runs == ["2026-06-30-000000-x", "2026-07-01-230000-a", "2026-07-01-230500-d"]
+
+def test_forecast_endpoint_serves_only_todays_run(client, app_module, restore_app_state):
+    today = datetime.now()
+    try:
+        run_nightly_forecast(app_module.data_dir, days=2, workers=1,
+                             run_date=(today - timedelta(days=1)).strftime("%Y-%m-%d"))
+        # The run builds the columnar export first, which workers pick up as a new data version
+        restore_app_state.reload()
+        stale = client.get("/api/forecast/HOTEL0001")
+        assert stale.headers["X-Forecast-Source"] == "incremental"
+        assert stale.get_json()["price_forecast"][0]["date"] == today.strftime("%Y-%m-%d")
+        
+        run_nightly_forecast(app_module.data_dir, days=2, workers=1, run_date=today.strftime("%Y-%m-%d"))
+        assert client.get("/api/forecast/HOTEL0001").headers["X-Forecast-Source"] == "nightly"
+    finally:
+        for name in [FORECASTS_DIR, "columnar"]:
+            shutil.rmtree(os.path.join(app_module.data_dir, name), ignore_errors=True)
@@ -0,0 +1,73 @@
+import random
+import pytest
+from genai.pricing import PricingEngine
+from store.geo import PointGrid, haversine_km
+
+def random_points(rng, count):
+    # Spread over the globe, with clusters near a pole and across the antimeridian
+    points = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.2:
+            points.append((rng.uniform(85, 90), rng.uniform(-180, 180)))
+        elif kind < 0.4:
+            points.append((rng.uniform(-10, 10), rng.choice((-1, 1)) * rng.uniform(179, 180)))
+        else:
+            points.append((rng.uniform(-90, 90), rng.uniform(-180, 180)))
+    return points
+
+@pytest.mark.parametrize("radius_km", [1, 25, 150, 400])
+def test_grid_matches_brute_force(radius_km):
+    rng = random.Random(radius_km)
+    points = random_points(rng, 2000)
+    grid = PointGrid((key % 30, lat, lon, key) for key, (lat, lon) in enumerate(points))
+    for latitude, longitude in random_points(rng, 50) + points[:50]:
+        expected = [key for key, (lat, lon) in enumerate(points)
+                    if haversine_km(latitude, longitude, lat, lon) <= radius_km]
+        found = grid.within(latitude, longitude, radius_km)
+        assert sorted(found) == expected
+        # Ordered by key, and a key range keeps only low <= key < high
+        assert [key % 30 for key in found] == sorted(key % 30 for key in found)
+        assert sorted(grid.within(latitude, longitude, radius_km, low=10, high=20)) == \
+            [key for key in expected if 10 <= key % 30 < 20]
+
+def test_grid_with_entries_matches_rebuild():
+    rng = random.Random(7)
+    entries = [(key, lat, lon, key) for key, (lat, lon) in enumerate(random_points(rng, 500))]
+    removed, added = entries[:100], [(key, lat, lon, key) for key, (lat, lon) in
+                                     enumerate(random_points(rng, 100), start=500)]
+    updated = PointGrid(entries).with_entries(added=added, removed=removed)
+    rebuilt = PointGrid(entries[100:] + added)
+    assert len(updated) == len(rebuilt)
+    for latitude, longitude in random_points(rng, 50):
+        assert updated.within(latitude, longitude, 200) == rebuilt.within(latitude, longitude, 200)
+
+@pytest.mark.parametrize("hotel_id, event_ids", [
+    ("HOTEL0001", ["EVENT1001"]),
+    ("HOTEL0002", ["EVENT1001"]),
+    ("HOTEL0003", ["EVENT1002"]),
+    ("HOTEL0005", ["EVENT1002"]),
+    # Without coordinates the hotel matches events by location name
+    ("HOTEL0004", ["EVENT1003"])
+])
+def test_events_within_radius(repository, hotel_id, event_ids):
+    hotel = repository.get_hotel_details(hotel_id)
+    assert [e.event_id for e in repository.events_within(hotel)] == event_ids
+    # EVENT1004 is about 100 km north of Paris
+    assert [e.event_id for e in repository.events_within(hotel, radius_km=150)
+            if e.event_id == "EVENT1004"] == (["EVENT1004"] if hotel.location == "Paris" else [])
+
+def test_hotels_near_event(repository):
+    events = {e.event_id: e for e in repository.events}
+    assert [h.hotel_id for h in repository.hotels_near(events["EVENT1001"])] == ["HOTEL0001", "HOTEL0002"]
+    assert [h.hotel_id for h in repository.hotels_near(events["EVENT1003"])] == ["HOTEL0004"]
+    assert repository.hotels_near(events["EVENT1004"]) == []
+
+def test_engine_keeps_location_lookup(repository):
+    engine = PricingEngine([], [], [], repository=repository)
+    # get_nearby_events still takes a location name; events_near_hotel is the radius query
+    assert sorted(e.event_id for e in engine.get_nearby_events("Paris")) == ["EVENT1001", "EVENT1004"]
+    assert [e.event_id for e in engine.get_nearby_events("Paris", "2026-07-05")] == ["EVENT1004"]
+    hotel = repository.get_hotel_details("HOTEL0001")
+    assert [e.event_id for e in engine.events_near_hotel(hotel)] == ["EVENT1001"]
+    assert engine.events_near_hotel(hotel, "2026-07-05") == []
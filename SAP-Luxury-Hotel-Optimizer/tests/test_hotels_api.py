@@ -0,0 +1,66 @@
+import pytest
+from store import hotel_index
+from store.hotel_index import search_terms
+
+def collect_pages(client, limit, **params):
+    """Follow next_cursor to the end; returns the hotel ids of every page."""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, limit=limit, **({"cursor": cursor} if cursor else {}))
+        response = client.get('/api/hotels', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["count"] == len(body["hotels"]) <= limit
+        pages.append([h["hotel_id"] for h in body["hotels"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("params, expected", [
+    ({}, ["HOTEL0001", "HOTEL0002", "HOTEL0003", "HOTEL0004", "HOTEL0005"]),
+    ({"country": "france"}, ["HOTEL0001", "HOTEL0002", "HOTEL0003", "HOTEL0005"]),
+    ({"location": "Lyon"}, ["HOTEL0003", "HOTEL0005"]),
+    ({"q": "h"}, ["HOTEL0001", "HOTEL0002", "HOTEL0003", "HOTEL0004", "HOTEL0005"]),
+    ({"q": "r"}, ["HOTEL0003", "HOTEL0005"]),
+    ({"q": "hotel", "country": "France", "min_rating": "4"}, ["HOTEL0001", "HOTEL0003", "HOTEL0005"]),
+    ({"q": "zzz"}, []),
+    # Several words match as a phrase, each word a prefix
+    ({"q": "grand hotel"}, ["HOTEL0003"]),
+    ({"q": "Hotel Par"}, ["HOTEL0001", "HOTEL0002"]),
+    ({"q": "paris hotel"}, []),
+    ({"q": "-"}, [])
+])
+@pytest.mark.parametrize("limit", [1, 2, 50])
+def test_cursor_round_trip(client, params, expected, limit):
+    pages = collect_pages(client, limit, **params)
+    assert [hotel_id for page in pages for hotel_id in page] == expected
+    # Every page but the last is full, and the last is only empty when nothing matched
+    assert all(len(page) == limit for page in pages[:-1])
+    assert pages[-1] or not expected
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get('/api/hotels', query_string={"cursor": "not-a-cursor"}).status_code == 400
+
+@pytest.mark.parametrize("params, error", [
+    ({"min_rating": "high"}, "min_rating must be a number"),
+    ({"max_rating": "4,5"}, "max_rating must be a number"),
+    ({"limit": "ten"}, "limit must be an integer")
+])
+def test_bad_filters_are_rejected(client, params, error):
+    response = client.get('/api/hotels', query_string=params)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+@pytest.mark.parametrize("merge_words_max", [0, 64])
+@pytest.mark.parametrize("prefix", ["h", "hotel000", "hotel0003", "paris", "s", "x"])
+def test_prefix_positions_match_brute_force(repository, monkeypatch, merge_words_max, prefix):
+    # 0 sends every prefix through the memoized merge, 64 through the lazy one
+    monkeypatch.setattr(hotel_index, "MERGE_WORDS_MAX", merge_words_max)
+    index = repository.hotel_index
+    hotels = repository.hotels
+    expected = [position for position, hotel in enumerate(hotels)
+                if any(term.startswith(prefix) for term in search_terms(hotel))]
+    for after in range(-1, len(hotels)):
+        assert list(index.prefix_positions(prefix, after)) == [p for p in expected if p > after]
+    assert index.prefix_size(prefix) >= len(expected)
@@ -0,0 +1,87 @@
+import threading
+from conftest import START_DATE
+from services.incremental import ALL_DATES, MaterializedForecasts, affected_cells
+from services.reload import AppState
+
+def materialize(state, hotel_ids, memo_size=100):
+    forecasts = MaterializedForecasts(state, START_DATE, memo_size=memo_size)
+    for hotel_id in hotel_ids:
+        forecasts.prices(hotel_id)
+        forecasts.staffing(hotel_id)
+    return forecasts
+
+def test_affected_cells(repository):
+    pricing, staffing = affected_cells(
+        repository,
+        bookings=[{"hotel_id": "HOTEL0003", "date": "2026-07-02", "bookings": 5}],
+        events=[{"event_id": "EVENT2001", "name": "Fair", "date": "2026-07-06", "location": "Paris",
+                 "expected_attendance": 100, "latitude": 48.861, "longitude": 2.351}],
+        competitors=[{"hotel_id": "HOTEL0005", "competitor_price": 200.0}]
+    )
+    assert pricing == {"HOTEL0003": ALL_DATES, "HOTEL0001": {"2026-07-06"}, "HOTEL0002": {"2026-07-06"},
+                       "HOTEL0005": ALL_DATES}
+    assert staffing == {"HOTEL0003": ALL_DATES, "HOTEL0001": {"2026-07-06"}, "HOTEL0002": {"2026-07-06"}}
+
+def test_moved_event_affects_old_and_new_cells(repository):
+    # EVENT1001 moves from Paris on 07-02 to Lyon on 07-03
+    pricing, _ = affected_cells(repository, events=[{
+        "event_id": "EVENT1001", "name": "Conference", "date": "2026-07-03", "location": "Lyon",
+        "expected_attendance": 5000, "latitude": 45.764, "longitude": 4.836}])
+    assert pricing == {"HOTEL0001": {"2026-07-02"}, "HOTEL0002": {"2026-07-02"},
+                       "HOTEL0003": {"2026-07-03"}, "HOTEL0005": {"2026-07-03"}}
+
+def test_update_recomputes_only_affected_cells(repository):
+    state = AppState(repository)
+    hotel_ids = [h.hotel_id for h in repository.hotels]
+    forecasts = materialize(state, hotel_ids)
+    delta = {"events": [{"event_id": "EVENT2001", "name": "Fair", "date": "2026-07-03", "location": "Paris",
+                         "expected_attendance": 4000, "latitude": 48.861, "longitude": 2.351}]}
+    
+    cells = affected_cells(repository, **delta)
+    new_state = AppState(repository.with_changes(**delta))
+    updated = forecasts.updated(new_state, *cells)
+    
+    report = forecasts.counters.last_update
+    price_cells = len(hotel_ids) * forecasts.price_days
+    staffing_cells = len(hotel_ids) * len(forecasts.context["dates"])
+    assert report["pricing"] == {"recomputed": 2, "reused": price_cells - 2}
+    assert report["staffing"] == {"recomputed": 2, "reused": staffing_cells - 2}
+    
+    # Same result as computing everything from scratch
+    fresh = materialize(new_state, hotel_ids)
+    for hotel_id in hotel_ids:
+        assert updated.forecast(hotel_id) == fresh.forecast(hotel_id)
+
+def test_memo_is_bounded(repository):
+    state = AppState(repository)
+    forecasts = materialize(state, ["HOTEL0001", "HOTEL0002", "HOTEL0003"], memo_size=2)
+    assert forecasts.stats()["materialized_hotels"] == {"pricing": 2, "staffing": 2}
+    
+    uncached = materialize(state, ["HOTEL0001"], memo_size=0)
+    uncached.staffing("HOTEL0001")
+    assert uncached.stats()["materialized_hotels"] == {"pricing": 0, "staffing": 0}
+    assert uncached.counters.cells["staffing"]["computed"] == 2 * len(uncached.context["dates"])
+
+def test_readers_get_copies(repository):
+    forecasts = materialize(AppState(repository), ["HOTEL0001"])
+    staffing = forecasts.staffing("HOTEL0001")
+    staffing["forecast"][0]["staffing"]["front_desk"] = -1
+    forecasts.prices("HOTEL0001")[0]["price"] = -1
+    assert forecasts.staffing("HOTEL0001")["forecast"][0]["staffing"]["front_desk"] != -1
+    assert forecasts.prices("HOTEL0001")[0]["price"] != -1
+
+def test_concurrent_first_reads_share_forecasts(repository):
+    state = AppState(repository)
+    seen = []
+    barrier = threading.Barrier(8)
+    
+    def read():
+        barrier.wait()
+        seen.append(state.current_forecasts())
+    
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(forecasts) for forecasts in seen}) == 1
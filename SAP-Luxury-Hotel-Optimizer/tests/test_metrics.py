@@ -0,0 +1,19 @@
+import pytest
+from conftest import START_DATE
+from services.metrics import STAGE_SECONDS
+from services.reload import AppState
+
+def stage_counts(engine):
+    return {key[1]: state[-2] for key, state in STAGE_SECONDS._values.items() if key[0] == engine}
+
+@pytest.mark.parametrize("hotel_id", ["HOTEL0001", "HOTEL9999"])
+def test_each_pricing_stage_is_recorded_once_per_call(repository, hotel_id):
+    engine = AppState(repository).pricing_engine
+    before = stage_counts("pricing")
+    engine.calculate_price(hotel_id, 4.5, START_DATE)
+    after = stage_counts("pricing")
+    recorded = {stage: count - before.get(stage, 0) for stage, count in after.items() if count != before.get(stage, 0)}
+    expected = {"get_booking_stats", "season_demand", "factors"}
+    if hotel_id == "HOTEL0001":
+        expected.add("get_nearby_events")
+    assert recorded == dict.fromkeys(expected, 1)
@@ -0,0 +1,10 @@
+from mock.sap_mock import SAPMockGenerator
+
+def test_event_ids_are_unique_across_calls():
+    generator = SAPMockGenerator()
+    generator.generate_hotels(3)
+    generator.generate_events()
+    events = generator.generate_events()
+    assert len(events) == 100
+    assert len({event["event_id"] for event in events}) == 100
+    assert events[0]["event_id"] == "EVENT0001" and events[-1]["event_id"] == "EVENT0100"
@@ -0,0 +1,37 @@
+import json
+import os
+import shutil
+import pytest
+from conftest import BOOKINGS
+from store.bootstrap import build_repository, load_data, prepare_data
+
+NEW_BOOKING = {"hotel_id": "HOTEL0005", "date": "2026-07-01", "bookings": 42}
+
+@pytest.mark.parametrize("data_format", ["columnar", "sqlite"])
+def test_export_is_rebuilt_when_json_changes(data_dir, tmp_path, data_format):
+    path = str(tmp_path / "data")
+    shutil.copytree(data_dir, path)
+    assert load_data(path, data_format)[data_format]
+    
+    with open(os.path.join(path, "bookings.json"), "w") as f:
+        json.dump(BOOKINGS + [NEW_BOOKING], f)
+    # A stale export is not loaded; the JSON files are read instead
+    dataset = load_data(path, data_format)
+    assert not dataset[data_format]
+    assert len(dataset["bookings"]) == len(BOOKINGS) + 1
+    
+    prepare_data(path, data_format)
+    dataset = load_data(path, data_format)
+    assert dataset[data_format]
+    repository = build_repository(dataset)
+    assert [b.to_dict() for b in repository.get_hotel_bookings("HOTEL0005")] == [NEW_BOOKING]
+    # Only the export itself is left behind, no temporary copies
+    assert sorted(name for name in os.listdir(path) if ".tmp" in name or ".old" in name) == []
+
+def test_prepared_export_is_not_rewritten(data_dir, tmp_path):
+    path = str(tmp_path / "data")
+    shutil.copytree(data_dir, path)
+    meta_path = os.path.join(path, "columnar", "meta.json")
+    before = os.stat(meta_path).st_mtime_ns
+    prepare_data(path, "columnar")
+    assert os.stat(meta_path).st_mtime_ns == before
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+import numpy as np
+from conftest import START_DATE
+from genai.rng import stream_for, stream_seed
+from services.reload import AppState
+
+def draws(stream, count=5):
+    return [stream.random() for _ in range(count)]
+
+def test_same_key_gives_same_stream():
+    assert draws(stream_for("HOTEL0001", START_DATE, "price")) == draws(stream_for("HOTEL0001", START_DATE, "price"))
+
+def test_key_parts_and_seed_select_independent_streams():
+    base = draws(stream_for("HOTEL0001", START_DATE, "price"))
+    assert draws(stream_for("HOTEL0002", START_DATE, "price")) != base
+    assert draws(stream_for("HOTEL0001", "2026-07-02", "price")) != base
+    assert draws(stream_for("HOTEL0001", START_DATE, "competitor")) != base
+    assert draws(stream_for("HOTEL0001", START_DATE, "price", seed=1)) != base
+
+def test_stream_is_stable_across_processes():
+    code = ("from genai.rng import stream_for, stream_seed; "
+            "print(stream_seed('HOTEL0001', '2026-07-01'), stream_for('HOTEL0001', '2026-07-01').random())")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = set()
+    for hash_seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        outputs.add(subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True,
+                                   text=True, check=True).stdout)
+    assert outputs == {f"{stream_seed('HOTEL0001', START_DATE)} {stream_for('HOTEL0001', START_DATE).random()}\n"}
+
+def test_prices_do_not_depend_on_call_order(repository):
+    first = AppState(repository).pricing_engine
+    second = AppState(repository).pricing_engine
+    # Draws for other hotels and dates in between must not shift this hotel's stream
+    expected = first.calculate_price("HOTEL0001", 4.5, START_DATE)
+    for hotel_id in ("HOTEL0003", "HOTEL0002", "HOTEL0001"):
+        second.calculate_price(hotel_id, 4.0, "2026-07-02")
+    assert second.calculate_price("HOTEL0001", 4.5, START_DATE) == expected
+    start = datetime.strptime(START_DATE, "%Y-%m-%d")
+    assert first.generate_price_forecast("HOTEL0002", 3.8, 5, start) == \
+        second.generate_price_forecast("HOTEL0002", 3.8, 5, start)
+
+def test_staffing_is_reproducible(repository):
+    first = AppState(repository).staffing_engine.calculate_staffing("HOTEL0003", START_DATE)
+    second = AppState(repository).staffing_engine.calculate_staffing("HOTEL0003", START_DATE)
+    assert first == second
+
+def test_price_matrix_is_reproducible_for_a_seed(repository):
+    engine = AppState(repository).pricing_engine
+    hotel_ids = ["HOTEL0001", "HOTEL0002", "HOTEL0003"]
+    first = engine.generate_price_forecast_matrix(hotel_ids, days=10, seed=42)
+    assert np.array_equal(first.prices, engine.generate_price_forecast_matrix(hotel_ids, days=10, seed=42).prices)
+    assert not np.array_equal(first.prices, engine.generate_price_forecast_matrix(hotel_ids, days=10, seed=43).prices)
@@ -0,0 +1,13 @@
+import pytest
+
+def test_dashboard_renders(client):
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b"HOTEL000" in response.data
+
+@pytest.mark.parametrize("page", ['/pricing', '/staffing'])
+def test_hotel_pages_render(client, page):
+    response = client.get(page, query_string={"hotel_id": "HOTEL0003"})
+    assert response.status_code == 200
+    assert b"Rhone Grand Hotel" in response.data
+    assert client.get(page, query_string={"hotel_id": "HOTEL9999"}).status_code == 404
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from conftest import START_DATE
+from genai.scenarios import parse_adjustments, parse_multiplier, simulate_scenarios
+from services.reload import AppState
+
+def simulate(repository, hotel_id="HOTEL0001", samples=500, **adjustments):
+    state = AppState(repository)
+    hotel = repository.get_hotel_details(hotel_id)
+    return simulate_scenarios(state.pricing_engine, state.staffing_engine, hotel, samples,
+                              parse_adjustments(adjustments), date_str=START_DATE)
+
+@pytest.mark.parametrize("value, expected", [
+    ("+50%", 1.5), ("-20%", 0.8), (" 1.5 ", 1.5), ("0", 0.0), (2, 2.0), (0.5, 0.5)
+])
+def test_parse_multiplier(value, expected):
+    assert parse_multiplier("attendance", value) == pytest.approx(expected)
+
+@pytest.mark.parametrize("value", ["lots", "fifty", "%", True, None, [1.5], "-150%", -1, "inf", float("nan")])
+def test_parse_multiplier_rejects_bad_values(value):
+    with pytest.raises(ValueError):
+        parse_multiplier("attendance", value)
+
+def test_identical_requests_draw_the_same_scenarios(repository):
+    first = simulate(repository, attendance="+50%")
+    second = simulate(repository, attendance="+50%")
+    assert np.array_equal(first.prices, second.prices)
+    assert np.array_equal(first.daily_cost, second.daily_cost)
+    assert first.summary() == second.summary()
+
+def test_percentiles_bracket_the_mean(repository):
+    summary = simulate(repository, samples=2000).summary([5, 50, 95])
+    for day in summary["dynamic_price"]:
+        assert day["percentiles"]["p5"] <= day["mean"] <= day["percentiles"]["p95"]
+        assert day["percentiles"]["p5"] <= day["percentiles"]["p50"] <= day["percentiles"]["p95"]
+    cost = summary["total_weekly_cost"]
+    assert cost["percentiles"]["p5"] <= cost["mean"] <= cost["percentiles"]["p95"]
+
+def test_more_attendance_does_not_lower_the_mean_price(repository):
+    # HOTEL0001 is next to the conference on 2026-07-02
+    means = [[day["mean"] for day in simulate(repository, attendance=change).summary()["dynamic_price"]]
+             for change in ["-50%", "+0%", "+50%"]]
+    for lower, higher in zip(means, means[1:]):
+        assert all(a <= b for a, b in zip(lower, higher))
+    assert means[0][1] < means[1][1]
+    # Days without events are unaffected, on the same draws
+    assert means[0][0] == means[1][0] == means[2][0]
+
+def test_scenarios_endpoint(client):
+    url = '/api/scenarios/HOTEL0001'
+    body = {"adjustments": {"attendance": "+50%"}, "samples": 500, "date": START_DATE}
+    first = client.post(url, json=body)
+    assert first.status_code == 200
+    assert first.get_json()["adjustments"] == {"attendance": 1.5}
+    assert client.post(url, json=body).get_json() == first.get_json()
+    # The same what-if as query parameters
+    query = {"attendance": "+50%", "samples": 500, "date": START_DATE}
+    assert client.get(url, query_string=query).get_json() == first.get_json()
+    assert client.get('/api/scenarios/HOTEL9999').status_code == 404
+
+@pytest.mark.parametrize("body, error", [
+    ({"adjustments": {"attendance": "lots"}}, "attendance must be a multiplier or a change such as +50%"),
+    ({"adjustments": {"weather": 2}}, "Unknown adjustment 'weather'"),
+    ({"uncertainty": {"demand": 2}}, "uncertainty of demand must be between 0 and 1"),
+    ({"samples": 0}, "samples must be between 1 and"),
+    ({"percentiles": [50, 101]}, "percentiles must be between 0 and 100"),
+    ({"date": "July 1st"}, "date must be YYYY-MM-DD")
+])
+def test_scenarios_endpoint_rejects_bad_input(client, body, error):
+    response = client.post('/api/scenarios/HOTEL0001', json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith(error)
@@ -0,0 +1,47 @@
+import json
+import pytest
+from genai.staffing import generate_staffing_explanation
+from services.serialization import JSON_BACKENDS, load_backend
+from store.records import Hotel
+
+def available_backends():
+    backends = []
+    for name in JSON_BACKENDS:
+        try:
+            load_backend(name)
+        except ValueError:
+            continue
+        backends.append(name)
+    return backends
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_records_serialize_through_to_dict(backend):
+    _, dumps, loads = load_backend(backend)
+    placed = Hotel("HOTEL0001", "Seine Palace Hotel", "Paris", "France", 200, 4.5, 48.86, 2.35)
+    unplaced = Hotel("HOTEL0004", "Harbor Inn Hotel", "Nowhere", "USA", 80, 3.2)
+    encoded = loads(dumps({"hotels": [placed, unplaced]}))
+    # Unset coordinates are left out, as in to_dict, rather than sent as null
+    assert encoded == {"hotels": [placed.to_dict(), unplaced.to_dict()]}
+    assert "latitude" not in encoded["hotels"][1]
+    assert encoded == json.loads(json.dumps({"hotels": [placed.to_dict(), unplaced.to_dict()]}))
+
+def test_staffing_explanation_accepts_dict_hotels():
+    hotel = {"hotel_id": "HOTEL0001", "name": "Seine Palace Hotel", "location": "Paris", "rooms": 200}
+    record = Hotel.from_dict(dict(hotel, country="France", rating=4.5))
+    explanation = generate_staffing_explanation(hotel, 1.2, 1.2, 1.1)
+    assert explanation.startswith("Staffing recommendations for Seine Palace Hotel")
+    assert explanation == generate_staffing_explanation(record, 1.2, 1.2, 1.1)
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "identity"])
+def test_not_modified_carries_the_same_validators(client, app_module, monkeypatch, accept_encoding):
+    monkeypatch.setattr(app_module.compressor, "min_size", 0)
+    headers = {"Accept-Encoding": accept_encoding}
+    first = client.get("/api/pricing/HOTEL0001", headers=headers)
+    assert first.status_code == 200
+    assert first.headers["Vary"] == "Accept-Encoding"
+    assert first.headers.get("Content-Encoding") == (None if accept_encoding == "identity" else "gzip")
+    
+    again = client.get("/api/pricing/HOTEL0001", headers=dict(headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.headers["Vary"] == "Accept-Encoding"
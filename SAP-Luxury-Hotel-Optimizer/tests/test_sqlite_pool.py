@@ -0,0 +1,39 @@
+import threading
+from store.sqlite import SQLiteConnectionPool, sqlite_path
+
+def test_connections_are_reused_across_threads(data_dir):
+    pool = SQLiteConnectionPool(sqlite_path(data_dir))
+    counts = []
+    # Like the threaded dev server: a new thread per request
+    for _ in range(20):
+        thread = threading.Thread(target=lambda: counts.append(pool.scalar("SELECT COUNT(*) FROM hotels")))
+        thread.start()
+        thread.join()
+    assert counts == [5] * 20
+    assert pool.stats()["opened"] == 1
+
+def test_idle_connections_are_bounded(data_dir):
+    pool = SQLiteConnectionPool(sqlite_path(data_dir), size=2)
+    barrier = threading.Barrier(6)
+    
+    def hold():
+        with pool.connection() as connection:
+            barrier.wait()
+            connection.execute("SELECT COUNT(*) FROM events").fetchone()
+    
+    threads = [threading.Thread(target=hold) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert stats["opened"] == 6
+    assert stats["idle"] == 2 and stats["closed"] == 4 and stats["in_use"] == 0
+
+def test_unfinished_stream_returns_its_connection(data_dir):
+    pool = SQLiteConnectionPool(sqlite_path(data_dir))
+    rows = pool.stream("SELECT hotel_id FROM hotels ORDER BY rowid")
+    assert next(rows) == ("HOTEL0001",)
+    assert pool.stats()["in_use"] == 1
+    rows.close()
+    assert pool.stats()["in_use"] == 0
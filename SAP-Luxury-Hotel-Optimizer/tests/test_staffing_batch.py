@@ -0,0 +1,19 @@
+import pytest
+
+def test_batch_returns_found_and_not_found(client):
+    response = client.post('/api/staffing/batch', json={"hotel_ids": ["HOTEL0001", "HOTEL9999"]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 1
+    assert list(data["results"]) == ["HOTEL0001"]
+    assert data["not_found"] == ["HOTEL9999"]
+
+@pytest.mark.parametrize("hotel_ids", ["HOTEL0001", [1, {}], [["HOTEL0001"]], [None]])
+def test_batch_rejects_non_string_ids(client, hotel_ids):
+    response = client.post('/api/staffing/batch', json={"hotel_ids": hotel_ids})
+    assert response.status_code == 400
+
+def test_batch_caps_list_length(client, app_module):
+    hotel_ids = [f"HOTEL{i:05d}" for i in range(app_module.STAFFING_BATCH_MAX + 1)]
+    response = client.post('/api/staffing/batch', json={"hotel_ids": hotel_ids})
+    assert response.status_code == 400
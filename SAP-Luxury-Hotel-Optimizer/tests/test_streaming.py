@@ -0,0 +1,55 @@
+import json
+import pytest
+from services.serving import ComputePool, PoolSaturated
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+@pytest.mark.parametrize("kind", ["pricing", "staffing"])
+def test_stream_matches_per_hotel_endpoint_after_delta(client, restore_app_state, kind):
+    response = client.post('/admin/reload', json={"bookings": [
+        {"hotel_id": "HOTEL0001", "date": "2026-07-03", "bookings": 190},
+        {"hotel_id": "HOTEL0005", "date": "2026-07-04", "bookings": 55}
+    ]})
+    assert response.status_code == 200
+    
+    streamed = read_ndjson(client.get(f'/api/{kind}/stream'))
+    assert [r["hotel_id"] for r in streamed] == ["HOTEL0001", "HOTEL0002", "HOTEL0003", "HOTEL0004", "HOTEL0005"]
+    for result in streamed:
+        assert result == client.get(f'/api/{kind}/{result["hotel_id"]}').get_json()
+
+def test_sse_stream_ends_with_count(client):
+    body = client.get('/api/staffing/stream?format=sse&country=France').get_data(as_text=True)
+    assert body.count("event: staffing") == 4
+    assert body.endswith('event: end\ndata: {"count":4}\n\n')
+
+def test_stream_is_rejected_when_pool_is_saturated(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "compute_pool", ComputePool(workers=1, max_pending=0))
+    response = client.get('/api/staffing/stream')
+    assert response.status_code == 503
+    app_module.compute_pool.shutdown()
+
+class FailingPool:
+    """Runs the first n computations, then reports saturation."""
+    
+    def __init__(self, n):
+        self.n = n
+    
+    def run(self, key, compute):
+        if self.n == 0:
+            raise PoolSaturated("1 computations pending")
+        self.n -= 1
+        return compute()
+
+@pytest.mark.parametrize("fmt", ["ndjson", "sse"])
+def test_stream_reports_saturation_mid_stream(client, app_module, monkeypatch, fmt):
+    monkeypatch.setattr(app_module, "compute_pool", FailingPool(2))
+    response = client.get(f'/api/staffing/stream?format={fmt}')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    if fmt == "ndjson":
+        lines = read_ndjson(response)
+        assert len(lines) == 3 and lines[-1] == {"error": "1 computations pending"}
+    else:
+        assert body.count("event: staffing") == 2
+        assert "event: error" in body and "event: end" not in body
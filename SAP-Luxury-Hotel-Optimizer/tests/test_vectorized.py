@@ -0,0 +1,35 @@
+import pytest
+from conftest import START_DATE
+from genai.vectorized import base_staffing_matrix, occupancy_factor_vector
+from services.reload import AppState
+
+@pytest.mark.parametrize("date_str", [START_DATE, "2026-12-20", "2027-02-01"])
+def test_vectorized_staffing_matches_scalar(repository, date_str):
+    engine = AppState(repository).staffing_engine
+    hotel_ids = [h.hotel_id for h in repository.hotels] + ["HOTEL9999"]
+    scalar = engine.calculate_staffing_batch(hotel_ids, date_str)
+    vectorized = engine.calculate_staffing_batch(hotel_ids, date_str, vectorized=True)
+    assert list(vectorized) == list(scalar)
+    assert vectorized == scalar
+    assert vectorized["HOTEL9999"] is None
+    # Same value types too, so both serialize identically
+    forecast = vectorized["HOTEL0001"]["forecast"][0]
+    assert type(forecast["daily_cost"]) is type(scalar["HOTEL0001"]["forecast"][0]["daily_cost"])
+    assert all(type(v) is int for v in forecast["staffing"].values())
+
+def test_base_staffing_matrix_matches_scalar(repository):
+    engine = AppState(repository).staffing_engine
+    # Includes rooms / divisor landing exactly on .5, where rounding must be half to even
+    rooms = list(range(0, 1001, 5)) + [75, 150, 250, 375, 625]
+    matrix = base_staffing_matrix(rooms).tolist()
+    for row, count in zip(matrix, rooms):
+        assert row == list(engine.calculate_base_staffing({"rooms": count}).values())
+
+def test_occupancy_factor_vector_matches_scalar(repository):
+    engine = AppState(repository).staffing_engine
+    rooms = [hotel.rooms for hotel in repository.hotels]
+    stats = [engine.get_booking_stats(hotel.hotel_id) for hotel in repository.hotels]
+    counts = [s.count if s else 0 for s in stats]
+    totals = [s.total if s else 0 for s in stats]
+    expected = [engine.calculate_occupancy_factor(s, r) for s, r in zip(stats, rooms)]
+    assert occupancy_factor_vector(counts, totals, rooms).tolist() == expected